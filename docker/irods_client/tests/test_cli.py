@@ -247,3 +247,25 @@ def test_rm(pass_opts, testdata, session, irods_env_file):
     assert IrodsPath(session, "rm_test").exists()
     subprocess.run(["ibridges", "rm", "-r", "rm_test"], **pass_opts)
     assert not IrodsPath(session, "rm_test").exists()
+
+    subprocess.run(["ibridges", "upload", str(testdata), "irods:rm_test"], **pass_opts)
+    ipaths = [ipath for ipath in IrodsPath(session, "rm_test").walk() if ipath.dataobject_exists()]
+    subprocess.run(["ibridges", "rm", "-f", *[f"irods:{ipath}" for ipath in ipaths]], **pass_opts)
+    assert not any(ipath.exists() for ipath in ipaths)
+    IrodsPath(session, "rm_test").remove()
+
+
+def test_du(pass_opts, testdata, session, irods_env_file):
+    ipath = IrodsPath(session, "du_test")
+    ipath.create_collection()
+    subprocess.run(["ibridges", "init", irods_env_file], **pass_opts, capture_output=True)
+    subprocess.run(["ibridges", "upload", str(testdata), "irods:du_test"], **pass_opts)
+    local_files = [p for p in testdata.rglob("*") if p.is_file()]
+    usage = ipath.disk_usage(depth=1)
+    assert usage[str(ipath.absolute())].count == len(local_files)
+    assert usage[str(ipath.absolute())].size == sum(p.stat().st_size for p in local_files)
+    assert ipath.size == sum(p.stat().st_size for p in local_files)
+    ret = subprocess.run(["ibridges", "du", "irods:du_test", "--depth", "2"], **pass_opts,
+                         capture_output=True)
+    assert len(ret.stdout.strip("\n").split("\n")) == len(usage) + 1
+    ipath.remove()
@@ -1,5 +1,7 @@
 import hashlib
+import io
 import json
+import tarfile
 from contextlib import redirect_stdout
 from io import StringIO
 from pathlib import Path
@@ -7,10 +9,20 @@ from pathlib import Path
 import irods.keywords as kw
 import pytest
 
-from ibridges.data_operations import add_meta_from_archive, create_meta_archive, download, sync, upload
+from ibridges.data_operations import (
+    add_meta_from_archive,
+    copy,
+    create_meta_archive,
+    download,
+    download_archive,
+    sync,
+    upload,
+    upload_archive,
+)
 from ibridges.exception import DataObjectExistsError, NotACollectionError, NotADataObjectError
 from ibridges.path import IrodsPath
-from ibridges.util import is_collection, is_dataobject
+from ibridges.util import checksums_equal, is_collection, is_dataobject
+from ibridges.verification import verify
 
 
 def _get_digest(obj_or_file):
@@ -259,3 +271,166 @@ def test_ignored_keyword(session, tmpdir, dataobject):
         ipath = IrodsPath(session, "~", "tmp.rtf")
         upload(str(tmpdir/"bunny.rtf"), ipath, options={kw.NUM_THREADS_KW: 3})
     IrodsPath(session, "~/tmp.rtf").remove()
+
+
+@pytest.mark.parametrize("placement", ["round-robin", "free-space", "least-in-flight"])
+def test_upload_placement(session, testdata, placement):
+    ipath = IrodsPath(session, "~", "test_placement")
+    ipath.remove(missing_ok=True)
+    ops = upload(testdata, ipath, placement=placement)
+    resc_names = [record.resource for record in ops.report.records]
+    assert all(resc_name is not None for resc_name in resc_names)
+    assert sum(ops.upload_resources.values()) == len(ops.upload)
+    for record in ops.report.records:
+        obj = session.irods_session.data_objects.get(record.destination)
+        assert record.resource in [replica.resc_hier.split(";")[0] for replica in obj.replicas]
+    with pytest.raises(ValueError):
+        upload(testdata, ipath, placement=placement, resc_name="demoResc")
+    ipath.remove()
+
+
+def test_download_select_replica(session, testdata, tmpdir, dataobject):
+    ipath = IrodsPath(session, dataobject.path)
+    resc_name = dataobject.replicas[0].resc_hier.split(";")[0]
+    ops = download(ipath, tmpdir, overwrite=True, select_replica=[resc_name])
+    assert [record.resource for record in ops.report.records] == [resc_name]
+    assert resc_name in session.resource_throughput
+    assert _check_files_equal(Path(tmpdir) / ipath.name, testdata / "bunny.rtf")
+    with pytest.raises(ValueError):
+        download(ipath, tmpdir, overwrite=True, select_replica=True, resc_name=resc_name)
+
+
+def test_copy(session, testdata):
+    source = IrodsPath(session, "~", "test_copy_source")
+    target = IrodsPath(session, "~", "test_copy_target")
+    source.remove(missing_ok=True)
+    target.remove(missing_ok=True)
+    upload(testdata, source)
+    (source / "bunny.rtf").meta.add("key", "value")
+    target.create_collection()
+    ops = copy(source, target, copy_metadata=True)
+    dest = target / source.name
+    assert len(ops.copy) == len([p for p in source.walk() if p.dataobject_exists()])
+    for isource, idest in ops.copy:
+        assert idest.checksum == isource.checksum
+    assert ("key", "value", None) in (dest / "bunny.rtf").meta
+
+    # Unchanged data objects are not copied again.
+    ops = copy(source, target, overwrite=True)
+    assert len(ops.copy) == 0
+    with pytest.raises(DataObjectExistsError):
+        copy(source, target)
+
+    # Sync between two collections only copies the changes.
+    (dest / "bunny.rtf").remove()
+    ops = sync(source, dest)
+    assert [str(idest) for _, idest in ops.copy] == [str(dest / "bunny.rtf")]
+    source.remove()
+    target.remove()
+
+
+def test_upload_dedup(session, testdata):
+    first = IrodsPath(session, "~", "test_dedup_first")
+    second = IrodsPath(session, "~", "test_dedup_second")
+    first.remove(missing_ok=True)
+    second.remove(missing_ok=True)
+    upload(testdata, first)
+    ops = upload(testdata, second, dedup=first)
+    assert len(ops.upload) == 0
+    assert len(ops.copy) > 0
+    for isource, idest in ops.copy:
+        assert str(isource).startswith(str(first))
+        assert idest.checksum == isource.checksum
+    first.remove()
+    second.remove()
+
+
+def test_upload_bundles(session, testdata):
+    ipath = IrodsPath(session, "~", "test_bundles")
+    ipath.remove(missing_ok=True)
+    ops = upload(testdata, ipath, bundle_threshold=10**9)
+    assert [record.error for record in ops.report.records] == [None]
+    local_files = [p for p in testdata.rglob("*") if p.is_file()]
+    for lpath in local_files:
+        obj_path = ipath.joinpath(testdata.name, *lpath.relative_to(testdata).parts)
+        assert obj_path.dataobject_exists()
+        assert checksums_equal(obj_path, lpath)
+    assert not any(p.name.startswith(".ibridges_bundle") for p in ipath.walk())
+    ipath.remove()
+
+
+@pytest.mark.parametrize("archive_format", ["tar", "tar.gz"])
+def test_download_archive(session, testdata, archive_format):
+    ipath = IrodsPath(session, "~", "test_archive")
+    ipath.remove(missing_ok=True)
+    upload(testdata, ipath)
+    coll = ipath / testdata.name
+    (coll / "bunny.rtf").meta.add("key", "value")
+    fileobj = io.BytesIO()
+    n_objects = download_archive(coll, fileobj, format=archive_format, buffer_size=1000,
+                                 metadata=True)
+    local_files = [p for p in testdata.rglob("*") if p.is_file()]
+    assert n_objects == len(local_files)
+    fileobj.seek(0)
+    with tarfile.open(fileobj=fileobj, mode="r") as tar:
+        for lpath in local_files:
+            member = tar.extractfile(str(Path(testdata.name, lpath.relative_to(testdata))))
+            assert member.read() == lpath.read_bytes()
+        meta = json.load(tar.extractfile(f"{testdata.name}/.ibridges_metadata.json"))
+        bunny = [item for item in meta["items"] if item["rel_path"] == "bunny.rtf"][0]
+        assert ["key", "value"] in [avu[:2] for avu in bunny["metadata"]]
+    with pytest.raises(ValueError):
+        download_archive(coll, io.BytesIO(), format="zip")
+    ipath.remove()
+
+
+def test_upload_archive(session, testdata):
+    ipath = IrodsPath(session, "~", "test_upload_archive")
+    ipath.remove(missing_ok=True)
+    fileobj = io.BytesIO()
+    with tarfile.open(fileobj=fileobj, mode="w:gz") as tar:
+        tar.add(testdata, arcname=testdata.name)
+    fileobj.seek(0)
+    local_files = [p for p in testdata.rglob("*") if p.is_file()]
+    assert upload_archive(fileobj, ipath, buffer_size=1000) == len(local_files)
+    for lpath in local_files:
+        obj_path = ipath.joinpath(testdata.name, *lpath.relative_to(testdata).parts)
+        assert checksums_equal(obj_path, lpath)
+    fileobj.seek(0)
+    with pytest.raises(DataObjectExistsError):
+        upload_archive(fileobj, ipath)
+    ipath.remove()
+
+
+@pytest.mark.parametrize("verify", ["deferred", "none"])
+def test_verify_policy(session, testdata, tmpdir, verify):
+    ipath = IrodsPath(session, "~", "test_verify_policy")
+    ipath.remove(missing_ok=True)
+    ops = upload(testdata, ipath, verify=verify)
+    assert ops.unverified == []
+    local_files = [p for p in testdata.rglob("*") if p.is_file()]
+    for lpath in local_files:
+        obj_path = ipath.joinpath(testdata.name, *lpath.relative_to(testdata).parts)
+        assert checksums_equal(obj_path, lpath)
+    download(ipath / testdata.name, Path(tmpdir), verify=verify)
+    for lpath in local_files:
+        assert (Path(tmpdir) / testdata.name / lpath.relative_to(testdata)).read_bytes() == (
+            lpath.read_bytes())
+    ipath.remove()
+
+
+def test_verify(session, testdata, tmpdir):
+    ipath = IrodsPath(session, "~", "test_verify")
+    ipath.remove(missing_ok=True)
+    upload(testdata, ipath)
+    result = verify(testdata, ipath / testdata.name)
+    assert result.ok
+    assert result.matched == len([p for p in testdata.rglob("*") if p.is_file()])
+    local_copy = Path(tmpdir) / "local_copy"
+    download(ipath / testdata.name, local_copy)
+    (local_copy / testdata.name / "bunny.rtf").write_bytes(b"changed")
+    (local_copy / testdata.name / "extra.txt").write_bytes(b"extra")
+    result = verify(local_copy / testdata.name, ipath / testdata.name, workers=2)
+    assert result.extra == ["extra.txt"]
+    assert [path for path, _, _ in result.size_mismatch] == ["bunny.rtf"]
+    ipath.remove()
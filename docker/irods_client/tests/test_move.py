@@ -1,5 +1,9 @@
+import pytest
 from pytest import mark
 
+from ibridges import bulk
+from ibridges.data_operations import upload
+from ibridges.exception import DoesNotExistError
 from ibridges.path import IrodsPath
 
 
@@ -16,3 +20,25 @@ def test_move(session, item_name, request):
     new_path.rename(old_path)
     assert old_path.exists()
     assert not new_path.exists()
+
+
+def test_bulk_move_remove(session, testdata):
+    ipath = IrodsPath(session, "~", "bulk_test")
+    ipath.remove(missing_ok=True)
+    upload(testdata, ipath)
+    ipaths = [p for p in (ipath / testdata.name).walk() if p.dataobject_exists()]
+    new_paths = [ipath / "moved" / p.name for p in ipaths]
+    assert bulk.move(zip(ipaths, new_paths), workers=3) == len(ipaths)
+    assert all(p.dataobject_exists() for p in new_paths)
+    assert not any(p.exists() for p in ipaths)
+
+    missing = ipath / "does_not_exist"
+    with pytest.raises(DoesNotExistError):
+        bulk.remove([missing])
+    resolved = bulk.resolve([ipath / "moved", new_paths[0], missing])
+    assert resolved[0].collection_exists() and resolved[1].dataobject_exists()
+    assert resolved[2] is None
+    # The data objects inside the removed collection are skipped.
+    assert bulk.remove([*new_paths, ipath / "moved", missing], force=True, missing_ok=True) == 1
+    assert not (ipath / "moved").exists()
+    ipath.remove()
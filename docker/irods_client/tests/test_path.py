@@ -1,6 +1,7 @@
 import pytest
 from irods.exception import DataObjectDoesNotExist
 
+from ibridges.data_operations import upload
 from ibridges.exception import NotADataObjectError
 from ibridges.path import IrodsPath
 
@@ -54,3 +55,47 @@ def test_path_create_coll(session):
     ipath = IrodsPath(session, "/NotAZoneName")
     with pytest.raises(ValueError):
         ipath.create_collection()
+
+
+@pytest.mark.parametrize("partition", ["top", "adaptive"])
+@pytest.mark.parametrize("depth", [None, 1, 2])
+def test_path_walk_partitioned(session, testdata, partition, depth):
+    ipath = IrodsPath(session, "~", "test_walk")
+    ipath.create_collection()
+    upload(testdata, ipath, overwrite=True)
+    walk_paths = [str(path) for path in ipath.walk(depth=depth)]
+    part_paths = [str(path) for path in ipath.walk(depth=depth, workers=3, partition=partition)]
+    assert walk_paths == part_paths
+    with pytest.raises(ValueError):
+        list(ipath.walk(partition="unknown"))
+    ipath.remove()
+
+
+@pytest.mark.parametrize("depth", [1, 2, 3])
+def test_path_walk_depth(session, testdata, depth):
+    ipath = IrodsPath(session, "~", "test_walk_depth")
+    ipath.create_collection()
+    upload(testdata, ipath, overwrite=True)
+    all_paths = [str(path) for path in ipath.walk()
+                 if len(path.relative_to(ipath).parts) <= depth]
+    assert [str(path) for path in ipath.walk(depth=depth)] == all_paths
+    ipath.remove()
+
+
+def test_path_glob_filters(session, testdata):
+    ipath = IrodsPath(session, "~", "test_glob")
+    ipath.create_collection()
+    upload(testdata, ipath, overwrite=True)
+    base = ipath / testdata.name
+    assert sorted(p.name for p in base.glob("*.rtf")) == sorted(
+        p.name for p in testdata.glob("*.rtf"))
+    assert [p.name for p in base.rglob("*.txt")] == ["polarbear.txt"]
+    assert [p.name for p in base.glob("**/more_data")] == ["more_data"]
+
+    min_size = min(p.stat().st_size for p in testdata.rglob("*") if p.is_file()) + 1
+    large = [p for p in base.walk(min_size=min_size) if p.dataobject_exists()]
+    assert len(large) > 0
+    assert all(p.size >= min_size for p in large)
+    assert len([p for p in base.walk(has_checksum=True) if p.dataobject_exists()]) > 0
+    assert len([p for p in base.walk(has_checksum=False) if p.dataobject_exists()]) == 0
+    ipath.remove()
@@ -37,3 +37,18 @@ def test_tickets(item_name, ticket_type, n_days_ahead, session, config, request)
     assert len(tickets.fetch_tickets()) == 0
     with pytest.raises(KeyError):
         tickets.delete_ticket(tick, check=True)
+
+
+def test_tickets_bulk(session, collection, dataobject):
+    tickets = Tickets(session)
+    tickets.clear()
+    ipaths = [IrodsPath(session, collection.path), IrodsPath(session, dataobject.path)]
+    created = tickets.create_tickets(ipaths, workers=2)
+    assert len(created) == 2
+    ticket_paths = {tick_data.name: str(tick_data.path) for tick_data in tickets.fetch_tickets()}
+    assert ticket_paths == {ticket_str: str(ipath) for (ticket_str, _), ipath
+                            in zip(created, ipaths)}
+    assert sorted(tickets.all_ticket_strings) == sorted(ticket_paths)
+    tickets.clear(workers=2)
+    assert len(tickets.fetch_tickets()) == 0
+    assert len(tickets.all_ticket_strings) == 0
@@ -2,8 +2,8 @@ from copy import deepcopy
 
 from pytest import mark
 
-from ibridges import IrodsPath, Session, download, upload
-from ibridges.util import calc_checksum, checksums_equal
+from ibridges import IrodsPath, Session, bulk, download, upload
+from ibridges.util import CHECKSUM_CACHE, calc_checksum, checksums_equal
 
 
 @mark.parametrize(
@@ -26,3 +26,31 @@ def test_calc_checksum(irods_env, config, check_type, checksum, testdata, tmp_pa
         assert calc_checksum(tmp_path / "bunny.rtf", checksum_type=check_type) == checksum
         assert checksums_equal(ipath, tmp_path / "bunny.rtf")
         ipath.remove(missing_ok=True)
+
+
+def test_single_pass_checksum(session, testdata, tmp_path):
+    ipath_coll = IrodsPath(session, "test_single_pass")
+    ipath_coll.remove(missing_ok=True)
+    ipath_coll.create_collection()
+    CHECKSUM_CACHE.clear()
+    upload(testdata / "bunny.rtf", ipath_coll)
+    ipath = ipath_coll / "bunny.rtf"
+    # The checksum is computed while uploading and equal to the checksum on the server.
+    assert CHECKSUM_CACHE.get(testdata / "bunny.rtf", session.checksum_type) == ipath.checksum
+    download(ipath, tmp_path)
+    assert CHECKSUM_CACHE.get(tmp_path / "bunny.rtf", session.checksum_type) == ipath.checksum
+    ipath_coll.remove()
+
+
+def test_compute_checksums(session, testdata):
+    ipath = IrodsPath(session, "test_compute_checksums")
+    ipath.remove(missing_ok=True)
+    # Without verification, the uploaded data objects do not have a checksum.
+    upload(testdata, ipath, verify="none")
+    checksums = bulk.compute_checksums([ipath], workers=2, progress_bar=False)
+    local_files = [p for p in testdata.rglob("*") if p.is_file()]
+    assert len(checksums) == len(local_files)
+    for lpath in local_files:
+        obj_path = ipath.joinpath(testdata.name, *lpath.relative_to(testdata).parts)
+        assert checksums[str(obj_path)] == calc_checksum(lpath)
+    ipath.remove()
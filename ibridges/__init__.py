@@ -1,21 +1,44 @@
 """iBridges package that implements an API for iRODS."""
 
-from importlib.metadata import version
-
-from ibridges.data_operations import (
-    add_meta_from_archive,
-    create_meta_archive,
-    download,
-    sync,
-    upload,
-)
-from ibridges.meta import MetaData
-from ibridges.path import IrodsPath
-from ibridges.search import search_data
-from ibridges.session import Session
-from ibridges.tickets import Tickets
-
-__version__ = version("ibridges")
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ibridges.data_operations import (
+        add_meta_from_archive,
+        copy,
+        create_meta_archive,
+        download,
+        register,
+        sync,
+        upload,
+    )
+    from ibridges.meta import MetaData
+    from ibridges.path import IrodsPath
+    from ibridges.search import search_data
+    from ibridges.session import Session
+    from ibridges.tickets import Tickets
+    from ibridges.verification import verify
+
+# The API is only imported on first use, so that the CLI and other submodules
+# do not need to import python-irodsclient and tqdm unless they are used.
+_LAZY_IMPORTS = {
+    "Session": "ibridges.session",
+    "IrodsPath": "ibridges.path",
+    "download": "ibridges.data_operations",
+    "upload": "ibridges.data_operations",
+    "MetaData": "ibridges.meta",
+    "Tickets": "ibridges.tickets",
+    "search_data": "ibridges.search",
+    "sync": "ibridges.data_operations",
+    "copy": "ibridges.data_operations",
+    "register": "ibridges.data_operations",
+    "add_meta_from_archive": "ibridges.data_operations",
+    "create_meta_archive": "ibridges.data_operations",
+    "verify": "ibridges.verification",
+}
 
 __all__ = [
     "Session",
@@ -26,6 +49,27 @@ __all__ = [
     "Tickets",
     "search_data",
     "sync",
+    "copy",
+    "register",
     "add_meta_from_archive",
-    "create_meta_archive"
+    "create_meta_archive",
+    "verify",
 ]
+
+
+def __getattr__(name: str):
+    """Import the API on first use."""
+    if name == "__version__":
+        from importlib.metadata import version  # pylint: disable=import-outside-toplevel
+
+        return version("ibridges")
+    if name in _LAZY_IMPORTS:
+        value = getattr(importlib.import_module(_LAZY_IMPORTS[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    """List the API, including the parts that have not been imported yet."""
+    return sorted(set(globals()) | set(__all__) | {"__version__"})
@@ -0,0 +1,355 @@
+"""Remove, move and checksum many data objects and collections in parallel.
+
+:meth:`IrodsPath.remove <ibridges.path.IrodsPath.remove>` and
+:meth:`IrodsPath.rename <ibridges.path.IrodsPath.rename>` work on one path at a time and check
+whether the path exists first. The functions in this module look up the types of all paths with
+a few queries, and then remove, move or checksum them with parallel workers, which each use
+their own connection from the connection pool of the session. Errors are handled as with transfers:
+with on_error set to 'warn' or 'skip', the remaining paths are still processed, while with 'fail'
+no new paths are started after the first error.
+"""
+
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import PurePosixPath
+from typing import Callable, Iterable, Optional, Sequence, Union
+
+import irods.exception
+from tqdm import tqdm
+
+from ibridges import icat_columns as icat
+from ibridges.exception import DoesNotExistError
+from ibridges.executor import _raise_transfer_errors
+from ibridges.path import (
+    CachedIrodsPath,
+    IrodsPath,
+    _data_object_rows,
+    _in_conditions,
+    _partition_conditions,
+    _query_rows,
+)
+
+NUM_THREADS = 4
+
+
+def resolve(paths: Sequence[IrodsPath]) -> list[Optional[CachedIrodsPath]]:
+    """Find out whether paths are data objects, collections or do not exist.
+
+    Instead of checking the paths one by one, the collections and data objects are looked up
+    with one query per chunk of paths. Paths that are already cached are not looked up.
+
+    Parameters
+    ----------
+    paths:
+        Paths to look up, which should all use the same session.
+
+    Returns
+    -------
+        For each of the paths a CachedIrodsPath with its type, or None if it does not exist.
+
+    """
+    if len(paths) == 0:
+        return []
+    session = paths[0].session
+    names = {str(ipath) for ipath in paths if not isinstance(ipath, CachedIrodsPath)}
+    rows = _query_rows(session, (icat.COLL_NAME, ), _in_conditions(icat.COLL_NAME, sorted(names)))
+    found: dict[str, CachedIrodsPath] = {
+        coll_name: CachedIrodsPath(session, None, False, None, coll_name) for coll_name, in rows}
+
+    for coll_name, data_name, size, checksum in _data_object_rows(session, names - set(found)):
+        found[f"{coll_name}/{data_name}"] = CachedIrodsPath(
+            session, size, True, checksum, coll_name, data_name)
+    return [ipath if isinstance(ipath, CachedIrodsPath) else found.get(str(ipath))
+            for ipath in paths]
+
+
+def remove(
+    paths: Iterable[IrodsPath],
+    workers: int = NUM_THREADS,
+    force: bool = False,
+    unregister: bool = False,
+    missing_ok: bool = False,
+    on_error: str = "fail",
+    progress_bar: bool = True,
+) -> int:
+    """Remove many data objects and collections in parallel.
+
+    Collections are removed with all their content. Paths inside collections that are
+    removed as well are skipped.
+
+    Parameters
+    ----------
+    paths:
+        Paths to the data objects and collections to remove, with the same session.
+    workers:
+        Number of paths that are removed at the same time.
+    force:
+        Delete the data directly instead of moving it to the trash, which is faster.
+    unregister:
+        Only remove the data from the iRODS catalog, the files in the storage are kept.
+        This is the fastest, but is only allowed for data that was registered, or for rodsadmins.
+    missing_ok:
+        Skip paths that do not exist instead of handling them as errors.
+    on_error:
+        'fail': stop at the first error with an exception, paths that are being processed
+        at that moment are still finished; 'warn': turn errors into warnings and continue
+        with the other paths; 'skip': simply continue.
+    progress_bar:
+        Whether to display a progress bar.
+
+    Returns
+    -------
+        The number of data objects and collections that were removed.
+
+    Raises
+    ------
+    DoesNotExistError:
+        If a path does not exist and missing_ok is False.
+    PermissionError:
+        If the user has insufficient permission to remove the data.
+
+    Examples
+    --------
+    >>> results = search_data(session, path_pattern="%.tmp")
+    >>> bulk.remove(results, workers=8, force=True)
+
+    """
+    paths = list(paths)
+    targets = []
+    for ipath, cached_path in zip(paths, resolve(paths)):
+        if cached_path is not None:
+            targets.append(cached_path)
+        elif not missing_ok:
+            _raise_transfer_errors(on_error, f"{ipath} does not exist.", DoesNotExistError)
+    coll_names = {str(ipath) for ipath in targets if ipath.collection_exists()}
+    targets = [ipath for ipath in targets if not any(
+        str(parent) in coll_names for parent in PurePosixPath(str(ipath)).parents)]
+
+    def _remove(ipath: CachedIrodsPath) -> int:
+        session = ipath.session.irods_session
+        manager = session.data_objects if ipath.dataobject_exists() else session.collections
+        try:
+            if unregister:
+                manager.unregister(str(ipath))
+            elif ipath.dataobject_exists():
+                manager.unlink(str(ipath), force=force)
+            else:
+                manager.remove(str(ipath), recurse=True, force=force)
+            return 1
+        except (irods.exception.CUT_ACTION_PROCESSED_ERR,
+                irods.exception.CAT_NO_ACCESS_PERMISSION) as exc:
+            _raise_transfer_errors(
+                on_error, f"While removing {ipath}: iRODS server forbids action.",
+                PermissionError, exc)
+        except irods.exception.iRODSException as exc:
+            _raise_transfer_errors(on_error, f"Cannot remove {ipath}, {repr(exc)}",
+                                   type(exc), exc)
+        finally:
+            pbar.update(1)
+        return 0
+
+    with tqdm(total=len(targets), unit="path", disable=not progress_bar) as pbar:
+        return sum(_run_parallel(_remove, [(ipath, ) for ipath in targets], workers))
+
+
+def move(
+    pairs: Iterable[tuple[IrodsPath, Union[str, IrodsPath]]],
+    workers: int = NUM_THREADS,
+    on_error: str = "fail",
+    progress_bar: bool = True,
+) -> int:
+    """Move or rename many data objects and collections in parallel.
+
+    Collections that are missing on the new paths are created first.
+
+    Parameters
+    ----------
+    pairs:
+        Pairs of the path to move and its new path, which can also be a string.
+    workers:
+        Number of paths that are moved at the same time.
+    on_error:
+        'fail': stop at the first error with an exception, paths that are being processed
+        at that moment are still finished; 'warn': turn errors into warnings and continue
+        with the other paths; 'skip': simply continue.
+    progress_bar:
+        Whether to display a progress bar.
+
+    Returns
+    -------
+        The number of data objects and collections that were moved.
+
+    Raises
+    ------
+    DoesNotExistError:
+        If a path to move does not exist.
+    ValueError:
+        If a new path already exists, or is in a different zone.
+    PermissionError:
+        If the user has insufficient permission to move the data.
+
+    Examples
+    --------
+    >>> bulk.move([(ipath, ipath.parent / "archive" / ipath.name) for ipath in ipaths])
+
+    """
+    new_paths = [(ipath, IrodsPath(ipath.session, new_path)) for ipath, new_path in pairs]
+    moves = []
+    for (ipath, new_path), cached_path in zip(new_paths,
+                                              resolve([ipath for ipath, _ in new_paths])):
+        if cached_path is None:
+            _raise_transfer_errors(on_error, f"{ipath} does not exist.", DoesNotExistError)
+        else:
+            moves.append((cached_path, new_path))
+    parents = list({str(new_path.parent): new_path.parent for _, new_path in moves}.values())
+    for parent, cached_parent in zip(parents, resolve(parents)):
+        if cached_parent is None:
+            parent.create_collection()
+
+    def _move(ipath: CachedIrodsPath, new_path: IrodsPath) -> int:
+        session = ipath.session.irods_session
+        manager = session.data_objects if ipath.dataobject_exists() else session.collections
+        try:
+            manager.move(str(ipath), str(new_path))
+            return 1
+        except irods.exception.SAME_SRC_DEST_PATHS_ERR as exc:
+            _raise_transfer_errors(on_error, f"Path {new_path} already exists.", ValueError, exc)
+        except irods.exception.SYS_CROSS_ZONE_MV_NOT_SUPPORTED as exc:
+            _raise_transfer_errors(
+                on_error, f"Path {new_path} needs to start with /{ipath.session.zone}/home",
+                ValueError, exc)
+        except irods.exception.CAT_NO_ACCESS_PERMISSION as exc:
+            _raise_transfer_errors(on_error, f"Not allowed to move data to {new_path}",
+                                   PermissionError, exc)
+        except irods.exception.iRODSException as exc:
+            _raise_transfer_errors(on_error, f"Cannot move {ipath} to {new_path}, {repr(exc)}",
+                                   type(exc), exc)
+        finally:
+            pbar.update(1)
+        return 0
+
+    with tqdm(total=len(moves), unit="path", disable=not progress_bar) as pbar:
+        return sum(_run_parallel(_move, moves, workers))
+
+
+def compute_checksums(
+    paths: Iterable[IrodsPath],
+    workers: int = NUM_THREADS,
+    on_error: str = "fail",
+    progress_bar: bool = True,
+) -> dict[str, str]:
+    """Compute the checksums of data objects on the server that do not have one yet.
+
+    Collections are included with all the data objects in their subtree. The data objects
+    without a checksum are found with one query per collection, or per chunk of data objects,
+    after which the server computes their checksums with parallel workers. Paths that are
+    CachedIrodsPaths are not looked up again, and their cached checksums are updated.
+
+    Parameters
+    ----------
+    paths:
+        Paths to the data objects and collections, with the same session.
+    workers:
+        Number of checksums that are computed at the same time.
+    on_error:
+        'fail': stop at the first error with an exception, checksums that are being computed
+        at that moment are still finished; 'warn': turn errors into warnings and continue
+        with the other data objects; 'skip': simply continue.
+    progress_bar:
+        Whether to display a progress bar.
+
+    Returns
+    -------
+        The checksums of all the data objects by their path, except those for which the
+        checksum could not be computed.
+
+    Raises
+    ------
+    DoesNotExistError:
+        If a path does not exist.
+    PermissionError:
+        If the user has insufficient permission to compute a checksum.
+
+    Examples
+    --------
+    >>> checksums = bulk.compute_checksums([IrodsPath(session, "~/legacy_data")], workers=8)
+
+    """
+    paths = list(paths)
+    if len(paths) == 0:
+        return {}
+    session = paths[0].session
+    found: dict[str, Optional[str]] = {}
+    cached: dict[str, CachedIrodsPath] = {}
+    rows: list[tuple] = []
+    for ipath, cached_path in zip(paths, resolve(paths)):
+        if cached_path is None:
+            _raise_transfer_errors(on_error, f"{ipath} does not exist.", DoesNotExistError)
+        elif cached_path.collection_exists():
+            rows.extend(_query_rows(session, (icat.COLL_NAME, icat.DATA_NAME, icat.DATA_SIZE,
+                                              icat.DATA_CHECKSUM),
+                                    _partition_conditions(str(cached_path), True)))
+        else:
+            cached[str(cached_path)] = cached_path
+            found[str(cached_path)] = cached_path._checksum  # pylint: disable=protected-access
+    for coll_name, data_name, _, checksum in rows:
+        path = f"{coll_name}/{data_name}"
+        found[path] = found.get(path) or checksum or None
+    missing = [path for path, checksum in found.items() if not checksum]
+
+    def _compute(path: str) -> Optional[str]:
+        try:
+            return session.irods_session.data_objects.chksum(path)
+        except irods.exception.CAT_NO_ACCESS_PERMISSION as exc:
+            _raise_transfer_errors(on_error, f"Cannot compute the checksum of {path}, "
+                                   "no permission.", PermissionError, exc)
+        except irods.exception.iRODSException as exc:
+            _raise_transfer_errors(on_error, f"Cannot compute the checksum of {path}, "
+                                   f"{repr(exc)}", type(exc), exc)
+        finally:
+            pbar.update(1)
+        return None
+
+    with tqdm(total=len(missing), unit="obj", disable=not progress_bar) as pbar:
+        found.update(zip(missing, _run_parallel(_compute, [(path, ) for path in missing],
+                                                workers)))
+    for path, cached_path in cached.items():
+        cached_path._checksum = found[path]  # pylint: disable=protected-access
+    return {path: checksum for path, checksum in found.items() if checksum}
+
+
+def _run_parallel(func: Callable, args: Sequence[tuple], workers: int) -> list:
+    """Call the function for each of the arguments with parallel workers.
+
+    If one of the calls raises an exception, which only happens with on_error='fail', the
+    calls that have not started yet are skipped and the exception is raised. The calls that
+    are running at that moment are finished first.
+
+    Returns
+    -------
+        The return values, in the same order as the arguments.
+
+    """
+    stop = threading.Event()
+
+    def _call(*arg):
+        if stop.is_set():
+            return None
+        try:
+            return func(*arg)
+        except BaseException:
+            stop.set()
+            raise
+
+    with ThreadPoolExecutor(max(workers, 1)) as pool:
+        futures = [pool.submit(_call, *arg) for arg in args]
+        try:
+            for future in as_completed(futures):
+                future.result()
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+    return [future.result() for future in futures]
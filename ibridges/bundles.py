@@ -0,0 +1,146 @@
+"""Upload of many small files in tar bundles that are extracted on the iRODS server.
+
+Each uploaded file costs at least a few round trips to the iRODS server to open, write and
+close the data object. For trees with many small files, these round trips dominate the time of
+the upload. With bundling, small files that do not yet exist in iRODS are streamed into tar
+bundles, which are written as temporary data objects and extracted into the destination
+collection on the server with the `msiTarFileExtract` microservice. If the extraction fails,
+for example because the server does not allow it, the files are uploaded one by one instead.
+After the extraction, the checksums of the data objects are registered and compared with the
+local files, like those of files that are uploaded separately.
+"""
+
+from __future__ import annotations
+
+import posixpath
+import tarfile
+import uuid
+from pathlib import Path
+from typing import Optional
+
+import irods.exception
+import irods.keywords as kw
+
+from ibridges.path import IrodsPath
+from ibridges.rules import execute_rule
+from ibridges.session import Session
+from ibridges.util import PUT_OPR
+
+BUNDLE_MAX_SIZE = 256 * 1024**2
+BUNDLE_MAX_FILES = 10000
+EXTRACT_RULE = "msiTarFileExtract(*obj, *coll, *resc, *status);"
+
+
+class Bundle():
+    """Small files that are uploaded together in one tar bundle.
+
+    Parameters
+    ----------
+    root:
+        Collection into which the bundle is extracted. All data objects of the bundle
+        are in this collection or its subcollections.
+
+    """
+
+    def __init__(self, root: IrodsPath):
+        """Initialize an empty bundle."""
+        self.root = root
+        self.members: list[tuple[Path, IrodsPath, int]] = []
+        self.size = 0
+
+    def add(self, lpath: Path, ipath: IrodsPath, size: int):
+        """Add a file to the bundle."""
+        self.members.append((lpath, ipath, size))
+        self.size += size
+
+    def upload(self, session: Session, resc_name: str = "") -> bool:
+        """Upload the bundle and extract it on the iRODS server.
+
+        The temporary tar data object is removed afterwards.
+
+        Parameters
+        ----------
+        session:
+            Session to upload the bundle with.
+        resc_name:
+            Name of the resource to write the bundle and data objects to, by default
+            the default resource.
+
+        Returns
+        -------
+            Whether the bundle was extracted successfully.
+
+        """
+        tar_path = self.root / f".ibridges_bundle_{uuid.uuid4().hex}.tar"
+        if not resc_name:
+            try:
+                resc_name = session.default_resc
+            except ValueError:
+                resc_name = ""
+        options: dict = {kw.OPR_TYPE_KW: PUT_OPR}
+        if resc_name:
+            options[kw.DEST_RESC_NAME_KW] = resc_name
+        try:
+            with session.irods_session.data_objects.open(str(tar_path), "w", **options) as stream:
+                with tarfile.open(fileobj=stream, mode="w|") as tar:
+                    for lpath, ipath, _ in self.members:
+                        tar.add(lpath, arcname=posixpath.relpath(str(ipath), str(self.root)),
+                                recursive=False)
+            params = {"*obj": _rule_string(tar_path), "*coll": _rule_string(self.root),
+                      "*resc": _rule_string(resc_name or "null")}
+            _, stderr = execute_rule(session, None, params, body=EXTRACT_RULE)
+            return not stderr
+        except (ValueError, OSError, irods.exception.iRODSException):
+            return False
+        finally:
+            tar_path.remove(force=True, missing_ok=True)
+
+
+def plan_bundles(uploads: list[tuple[Path, IrodsPath]], sizes: list[int], threshold: int,
+                 max_size: int = BUNDLE_MAX_SIZE, max_files: int = BUNDLE_MAX_FILES
+                 ) -> tuple[list[Bundle], list[int]]:
+    """Divide the small files of an upload over bundles.
+
+    Only files smaller than the threshold are bundled, for which the data object does not exist,
+    since the extraction cannot overwrite data objects.
+
+    Parameters
+    ----------
+    uploads:
+        Local paths and destination IrodsPaths of the files to upload.
+    sizes:
+        Sizes of the files to upload.
+    threshold:
+        Files smaller than this size in bytes are bundled.
+    max_size:
+        Maximum total size of the files in one bundle.
+    max_files:
+        Maximum number of files in one bundle.
+
+    Returns
+    -------
+        The bundles and the indices of the uploads that are not bundled.
+
+    """
+    small = [i_upload for i_upload, ((_, ipath), size) in enumerate(zip(uploads, sizes))
+             if size < threshold and not ipath.dataobject_exists()]
+    if len(small) < 2:
+        return [], list(range(len(uploads)))
+    root_name = posixpath.commonpath([str(uploads[i_upload][1].parent) for i_upload in small])
+    root = IrodsPath(uploads[small[0]][1].session, root_name)
+    bundles: list[Bundle] = []
+    cur_bundle: Optional[Bundle] = None
+    for i_upload in small:
+        lpath, ipath = uploads[i_upload]
+        if (cur_bundle is None or len(cur_bundle.members) >= max_files
+                or cur_bundle.size + sizes[i_upload] > max_size):
+            cur_bundle = Bundle(root)
+            bundles.append(cur_bundle)
+        cur_bundle.add(lpath, ipath, sizes[i_upload])
+    small_set = set(small)
+    return bundles, [i_upload for i_upload in range(len(uploads)) if i_upload not in small_set]
+
+
+def _rule_string(value) -> str:
+    escaped = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{escaped}"'
@@ -1,14 +1,48 @@
 """Entry point for CLI interface."""
 
 import argparse
-import importlib.metadata
+import importlib
 import sys
-from importlib.metadata import version
 
-from ibridges.cli.other import CLI_BULTIN_COMMANDS
-from ibridges.cli.shell import get_all_shell_commands
-
-# pylint: disable=protected-access
+# pylint: disable=protected-access,import-outside-toplevel
+
+# Location of the builtin subcommands, so that running a subcommand only imports its own module.
+# These should be the same as in ALL_BUILTIN_COMMANDS and CLI_BULTIN_COMMANDS.
+BUILTIN_COMMANDS = {
+    "ls": "ibridges.cli.navigation:CliList",
+    "list": "ibridges.cli.navigation:CliList",
+    "l": "ibridges.cli.navigation:CliList",
+    "pwd": "ibridges.cli.navigation:CliPwd",
+    "tree": "ibridges.cli.navigation:CliTree",
+    "du": "ibridges.cli.navigation:CliDiskUsage",
+    "search": "ibridges.cli.navigation:CliSearch",
+    "cd": "ibridges.cli.navigation:CliCd",
+    "gui": "ibridges.cli.navigation:CliGui",
+    "version": "ibridges.cli.navigation:CliVersion",
+    "meta-list": "ibridges.cli.meta:CliMetaList",
+    "meta-add": "ibridges.cli.meta:CliMetaAdd",
+    "meta-del": "ibridges.cli.meta:CliMetaDel",
+    "meta-download": "ibridges.cli.meta:CliMetaDownload",
+    "meta-upload": "ibridges.cli.meta:CliMetaUpload",
+    "mkcoll": "ibridges.cli.data_operations:CliMakeCollection",
+    "download": "ibridges.cli.data_operations:CliDownload",
+    "upload": "ibridges.cli.data_operations:CliUpload",
+    "rm": "ibridges.cli.data_operations:CliRm",
+    "remove": "ibridges.cli.data_operations:CliRm",
+    "del": "ibridges.cli.data_operations:CliRm",
+    "sync": "ibridges.cli.data_operations:CliSync",
+    "cp": "ibridges.cli.data_operations:CliCopy",
+    "copy": "ibridges.cli.data_operations:CliCopy",
+    "register": "ibridges.cli.data_operations:CliRegister",
+    "checksum": "ibridges.cli.data_operations:CliChecksum",
+    "verify": "ibridges.cli.data_operations:CliVerify",
+    "chmod": "ibridges.cli.permission:CliACLEdit",
+    "shell": "ibridges.cli.other:CliShell",
+    "alias": "ibridges.cli.other:CliAlias",
+    "init": "ibridges.cli.other:CliInit",
+    "setup": "ibridges.cli.other:CliSetup",
+    "agent": "ibridges.cli.agent:CliAgent",
+}
 
 
 class ModuleGroupedHelpFormatter(argparse.RawTextHelpFormatter):
@@ -16,8 +50,10 @@ class ModuleGroupedHelpFormatter(argparse.RawTextHelpFormatter):
 
     def list_ibridges_shell_commands(self):
         """Return a dict mapping CLI command name -> (package name, version)."""
+        from importlib.metadata import distributions
+
         commands = {}
-        for dist in importlib.metadata.distributions():
+        for dist in distributions():
             for ep in dist.entry_points:
                 if ep.group == "ibridges.shell":  # ibridges shell entrypoint
                     commands[ep.name] = (dist.metadata["Name"], dist.version)
@@ -25,6 +61,9 @@ class ModuleGroupedHelpFormatter(argparse.RawTextHelpFormatter):
 
     def format_help(self):
         """Format the main help, create sections for plugin commands."""
+        # Only needed for the help, importlib.metadata is slow to import.
+        from importlib.metadata import version
+
         parser = self.parser
         prog = parser.prog
 
@@ -120,14 +159,42 @@ class ModuleGroupedHelpFormatter(argparse.RawTextHelpFormatter):
         return "\n".join(lines)
 
 
-def create_parser():
+def load_command(location: str):
+    """Import the class of a subcommand.
+
+    Parameters
+    ----------
+    location:
+        Location of the class in the form 'module:class', such as 'ibridges.cli.navigation:CliList'.
+
+    Returns
+    -------
+        The class implementing the subcommand.
+
+    """
+    module_name, class_name = location.split(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def create_parser(command_classes=None):
     """Create an argparse parser for the CLI.
 
+    Parameters
+    ----------
+    command_classes:
+        Subcommands to add to the parser. By default all builtin subcommands and
+        those of plugins are added, which requires importing all of them.
+
     Returns
     -------
         An argparse.ArgumentParser object with all the subcommands.
 
     """
+    if command_classes is None:
+        from ibridges.cli.other import CLI_BULTIN_COMMANDS
+        from ibridges.cli.shell import get_all_shell_commands
+
+        command_classes = get_all_shell_commands() + CLI_BULTIN_COMMANDS
     main_parser = argparse.ArgumentParser(
         prog="ibridges",
         formatter_class=ModuleGroupedHelpFormatter,
@@ -140,7 +207,7 @@ def create_parser():
     subparsers = main_parser.add_subparsers(dest="subcommand")
 
     # Add commands from classes
-    for command_class in get_all_shell_commands() + CLI_BULTIN_COMMANDS:
+    for command_class in command_classes:
         subpar = command_class.get_parser(subparsers.add_parser)
         subpar.set_defaults(func=command_class.run_command)
 
@@ -149,7 +216,16 @@ def create_parser():
 
 def main():
     """Start main function of the CLI."""
-    parser = create_parser()
+    if _use_agent(sys.argv[1:]):
+        from ibridges.cli.agent import run_in_agent
+
+        exit_code = run_in_agent(sys.argv[1:])
+        if exit_code is not None:
+            sys.exit(exit_code)
+    if len(sys.argv) > 1 and sys.argv[1] in BUILTIN_COMMANDS:
+        parser = create_parser([load_command(BUILTIN_COMMANDS[sys.argv[1]])])
+    else:
+        parser = create_parser()
     if len(sys.argv) == 1:
         parser.print_help()
         return
@@ -157,5 +233,13 @@ def main():
     args.func(args)
 
 
+def _use_agent(argv):
+    if len(argv) == 0 or "-h" in argv or "--help" in argv:
+        return False
+    from ibridges.cli.agent import AGENT_COMMANDS, agent_enabled
+
+    return argv[0] in AGENT_COMMANDS and agent_enabled()
+
+
 if __name__ == "__main__":
     main()
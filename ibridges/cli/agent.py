@@ -0,0 +1,323 @@
+"""Local agent that keeps authenticated sessions for short CLI commands.
+
+Authenticating with the iRODS server dominates the runtime of short commands such as
+:code:`ibridges ls`. If the IBRIDGES_AGENT environment variable is set to 1, these commands are
+sent to a local agent process over a Unix domain socket. The agent keeps an authenticated
+session for each iRODS environment, so that it only needs to authenticate once. It is started
+automatically and stops after it has been idle for a while.
+
+The protocol consists of a single JSON line for the request and one for the response.
+The request contains the command line arguments, the response the captured output and the exit
+code. If the agent is not available or cannot authenticate without asking for a password,
+the command is run locally instead.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import importlib
+import io
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import traceback
+from pathlib import Path
+from typing import Optional
+
+from ibridges.cli.base import BaseCliCommand
+
+AGENT_ENV = "IBRIDGES_AGENT"
+AGENT_SOCKET = Path.home() / ".ibridges" / "agent.sock"
+IDLE_TIMEOUT = 600  # Seconds without requests after which the agent stops.
+CONNECT_TIMEOUT = 0.5
+# Commands that only read from the iRODS server and do not use local paths or ask for input.
+AGENT_COMMANDS = {
+    "ls": "ibridges.cli.navigation:CliList",
+    "list": "ibridges.cli.navigation:CliList",
+    "l": "ibridges.cli.navigation:CliList",
+    "pwd": "ibridges.cli.navigation:CliPwd",
+    "tree": "ibridges.cli.navigation:CliTree",
+    "du": "ibridges.cli.navigation:CliDiskUsage",
+    "search": "ibridges.cli.navigation:CliSearch",
+    "meta-list": "ibridges.cli.meta:CliMetaList",
+}
+
+
+def agent_enabled() -> bool:
+    """Check whether the agent should be used for the CLI."""
+    return os.environ.get(AGENT_ENV, "0").lower() in ["1", "true", "yes"] and hasattr(
+        socket, "AF_UNIX")
+
+
+def _request(request: dict, socket_path: Path = AGENT_SOCKET,
+             timeout: Optional[float] = None) -> dict:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:  # type: ignore
+        sock.settimeout(CONNECT_TIMEOUT)
+        sock.connect(str(socket_path))
+        sock.settimeout(timeout)
+        sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        with sock.makefile("r", encoding="utf-8") as handle:
+            response = handle.readline()
+    if not response:
+        raise ConnectionError("The iBridges agent closed the connection.")
+    return json.loads(response)
+
+
+def run_in_agent(argv: list[str], socket_path: Path = AGENT_SOCKET) -> Optional[int]:
+    """Run a CLI command in the agent.
+
+    If the agent is not running, it is started in the background for the next command.
+
+    Parameters
+    ----------
+    argv:
+        Command line arguments, starting with the name of the subcommand.
+    socket_path:
+        Unix domain socket of the agent.
+
+    Returns
+    -------
+        The exit code of the command, or None if the command should be run locally.
+
+    """
+    try:
+        response = _request({"argv": argv, "columns": _terminal_columns(),
+                             "ls_colors": os.environ.get("LS_COLORS")}, socket_path)
+    except FileNotFoundError:
+        start_agent(socket_path)
+        return None
+    except (OSError, ValueError):
+        return None
+    if response.get("status") != "ok":
+        return None
+    sys.stdout.write(response["stdout"])
+    sys.stderr.write(response["stderr"])
+    return response["exit_code"]
+
+
+def start_agent(socket_path: Path = AGENT_SOCKET, idle_timeout: float = IDLE_TIMEOUT):
+    """Start the agent in the background."""
+    subprocess.Popen(  # pylint: disable=consider-using-with
+        [sys.executable, "-m", "ibridges.cli.agent", str(socket_path), str(idle_timeout)],
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        start_new_session=True)
+
+
+def _terminal_columns() -> Optional[int]:
+    try:
+        return os.get_terminal_size().columns
+    except OSError:
+        return None
+
+
+class Agent():
+    """Server that runs CLI commands with cached sessions.
+
+    Parameters
+    ----------
+    socket_path:
+        Unix domain socket to listen on, only accessible by the current user.
+    idle_timeout:
+        Stop the agent after this number of seconds without requests.
+
+    """
+
+    def __init__(self, socket_path: Path = AGENT_SOCKET, idle_timeout: float = IDLE_TIMEOUT):
+        """Initialize the agent without any sessions."""
+        self.socket_path = Path(socket_path)
+        self.idle_timeout = idle_timeout
+        self.sessions: dict = {}
+
+    def serve(self):
+        """Serve requests until the agent has been idle for too long or is stopped."""
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:  # type: ignore
+            if not self._bind(server):
+                return
+            server.listen()
+            server.settimeout(self.idle_timeout)
+            try:
+                while True:
+                    try:
+                        conn, _ = server.accept()
+                    except socket.timeout:
+                        break
+                    request = self._serve_connection(conn)
+                    if request.get("stop", False):
+                        break
+            finally:
+                self.socket_path.unlink(missing_ok=True)
+                for session in self.sessions.values():
+                    session.close()
+
+    def _serve_connection(self, conn) -> dict:
+        """Answer the request of a single connection, without failing on broken requests."""
+        request: dict = {}
+        try:
+            with conn, conn.makefile("rw", encoding="utf-8") as handle:
+                request = json.loads(handle.readline() or "{}")
+                response = self.handle(request)
+                handle.write(json.dumps(response) + "\n")
+                handle.flush()
+        except Exception:  # pylint: disable=broad-exception-caught
+            # The client went away or sent an invalid request, keep serving the others.
+            pass
+        return request if isinstance(request, dict) else {}
+
+    def _bind(self, server) -> bool:
+        old_umask = os.umask(0o177)
+        try:
+            server.bind(str(self.socket_path))
+        except OSError:
+            # Remove the socket if it is left over from an agent that was killed.
+            try:
+                _request({"ping": True}, self.socket_path, timeout=CONNECT_TIMEOUT)
+                return False
+            except OSError:
+                self.socket_path.unlink(missing_ok=True)
+                server.bind(str(self.socket_path))
+        finally:
+            os.umask(old_umask)
+        return True
+
+    def handle(self, request: dict) -> dict:
+        """Handle a single request.
+
+        Returns
+        -------
+            Response with the status 'ok', the exit code and the captured output of the command,
+            or with the status 'unavailable' if the command should be run locally.
+
+        """
+        if request.get("ping") or request.get("stop"):
+            return {"status": "ok", "sessions": list(self.sessions)}
+        argv = request.get("argv", [])
+        if len(argv) == 0 or argv[0] not in AGENT_COMMANDS:
+            return {"status": "unavailable"}
+        if request.get("columns"):
+            os.environ["COLUMNS"] = str(request["columns"])
+        else:
+            os.environ.pop("COLUMNS", None)
+        if request.get("ls_colors") is not None:
+            os.environ["LS_COLORS"] = request["ls_colors"]
+
+        from irods.exception import NetworkException  # pylint: disable=import-outside-toplevel
+
+        module_name, class_name = AGENT_COMMANDS[argv[0]].split(":")
+        command_class = getattr(importlib.import_module(module_name), class_name)
+        for _ in range(2):
+            try:
+                session = self._get_session()
+            except Exception:  # pylint: disable=broad-exception-caught
+                return {"status": "unavailable"}
+            if session is None:
+                return {"status": "unavailable"}
+            try:
+                return {"status": "ok", **_run_captured(command_class, session, argv[1:])}
+            except NetworkException:
+                # The connection was lost, try again with a new session.
+                self.sessions.pop(session.agent_ienv_path, None)
+        return {"status": "unavailable"}
+
+    def _get_session(self):
+        # pylint: disable=import-outside-toplevel
+        from ibridges.cli.config import IbridgesConf
+        from ibridges.session import Session
+        from ibridges.util import ValueErrorParser
+
+        ienv_path, entry = IbridgesConf(ValueErrorParser()).get_entry()
+        if ienv_path not in self.sessions:
+            if not Path(ienv_path).is_file():
+                return None
+            session = Session(ienv_path)
+            session.agent_ienv_path = ienv_path
+            self.sessions[ienv_path] = session
+        session = self.sessions[ienv_path]
+        session.cwd = entry.get("cwd", session.home)
+        if hasattr(session, "dir_color"):
+            del session.dir_color
+        return session
+
+
+def _run_captured(command_class, session, argv: list[str]) -> dict:
+    """Run the command as it would have been run in the CLI, but capture the output."""
+    # pylint: disable=import-outside-toplevel
+    import argparse
+
+    from irods.exception import NetworkException
+
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    exit_code = 0
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        parser = command_class.get_parser(argparse.ArgumentParser)
+        parser.prog = f"ibridges {command_class.names[0]}"
+        try:
+            args = parser.parse_args(argv)
+            command_class.run_shell(session, parser, args)
+        except SystemExit as exc:
+            exit_code = exc.code if isinstance(exc.code, int) else 1
+        except NetworkException:
+            raise
+        except Exception:  # pylint: disable=broad-exception-caught
+            stderr.write(traceback.format_exc())
+            exit_code = 1
+    return {"stdout": stdout.getvalue(), "stderr": stderr.getvalue(), "exit_code": exit_code}
+
+
+class CliAgent(BaseCliCommand):
+    """Subcommand to manage the local agent."""
+
+    names = ["agent"]
+    description = (f"Manage the local agent that keeps sessions open for short commands. "
+                   f"Set the {AGENT_ENV} environment variable to 1 to use it.")
+    examples = ["start", "status", "stop"]
+
+    @classmethod
+    def _mod_parser(cls, parser):
+        parser.add_argument(
+            "action",
+            help="Start, stop or show the status of the agent.",
+            choices=["start", "stop", "status"],
+        )
+        parser.add_argument(
+            "--idle-timeout",
+            help=f"Stop the agent after this many seconds without requests, default "
+                 f"{IDLE_TIMEOUT}. Only used with start.",
+            type=float,
+            default=IDLE_TIMEOUT,
+        )
+        return parser
+
+    @staticmethod
+    def run_shell(session, parser, args):
+        """Run agent is not available in the shell."""
+        raise NotImplementedError()
+
+    @classmethod
+    def run_command(cls, args):
+        """Start, stop or show the status of the agent."""
+        try:
+            response: Optional[dict] = _request({"ping": args.action != "stop",
+                                                 "stop": args.action == "stop"})
+        except OSError:
+            response = None
+        if args.action == "start" and response is None:
+            start_agent(AGENT_SOCKET, args.idle_timeout)
+            for _ in range(50):
+                if AGENT_SOCKET.exists():
+                    break
+                time.sleep(0.1)
+        elif args.action == "status":
+            if response is None:
+                print("The iBridges agent is not running.")
+            else:
+                print(f"The iBridges agent is running with sessions for: {response['sessions']}")
+
+
+if __name__ == "__main__":
+    Agent(Path(sys.argv[1]) if len(sys.argv) > 1 else AGENT_SOCKET,
+          float(sys.argv[2]) if len(sys.argv) > 2 else IDLE_TIMEOUT).serve()
@@ -1,19 +1,33 @@
 """Subcommands that do data operations."""
 
 import argparse
+import json
+import sys
 from pathlib import Path
 from typing import Literal, Union
 
+from ibridges import bulk
 from ibridges.cli.base import BaseCliCommand
 from ibridges.cli.util import parse_remote
-from ibridges.data_operations import download, sync, upload
+from ibridges.data_operations import (
+    copy,
+    download,
+    download_archive,
+    register,
+    sync,
+    upload,
+    upload_archive,
+)
 from ibridges.exception import (
     CollectionDoesNotExistError,
     DataObjectExistsError,
     DoesNotExistError,
     NotACollectionError,
 )
+from ibridges.executor import VERIFY_POLICIES
 from ibridges.path import IrodsPath
+from ibridges.placement import PLACEMENT_POLICIES
+from ibridges.verification import verify
 
 ON_ERROR_HELP = (
     "When a transfer of a file fails, by default the whole transfer will stop and print the error "
@@ -23,6 +37,78 @@ ON_ERROR_HELP = (
 )
 
 
+def _add_report_arguments(parser):
+    parser.add_argument(
+        "--report",
+        help="File to write a record for each transfer to, in JSON Lines format "
+        "or in CSV format if the file ends with '.csv'.",
+        type=Path,
+        default=None,
+    )
+    parser.add_argument(
+        "--prometheus",
+        help="Prometheus textfile to write the aggregate transfer statistics to.",
+        type=Path,
+        default=None,
+    )
+
+
+def _add_placement_argument(parser):
+    parser.add_argument(
+        "--placement",
+        help="Spread the uploaded files over the root resources: in turn (round-robin), "
+        "in proportion to their free space (free-space) or to the resource with the least data "
+        "being uploaded (least-in-flight).",
+        choices=PLACEMENT_POLICIES,
+        default=None,
+    )
+
+
+def _add_dedup_argument(parser):
+    parser.add_argument(
+        "--dedup",
+        help="Copy data objects with the same content on the server instead of uploading files. "
+        "Data objects are looked up in the given remote collection, or in the home collection.",
+        metavar="COLLECTION",
+        nargs="?",
+        const=True,
+        default=False,
+    )
+
+
+def _add_bundle_argument(parser):
+    parser.add_argument(
+        "--bundle-threshold",
+        help="Upload new files smaller than this size in bytes in tar bundles, which are "
+        "extracted on the server. This is much faster for many small files.",
+        metavar="BYTES",
+        type=int,
+        default=None,
+    )
+
+
+def _add_verify_argument(parser):
+    parser.add_argument(
+        "--verify",
+        help="When to verify the checksums of the transferred files: after each file (inline), "
+        "in parallel after all transfers (deferred) or not at all (none).",
+        choices=VERIFY_POLICIES,
+        default="inline",
+    )
+
+
+def _parse_dedup(args, session) -> Union[bool, IrodsPath]:
+    if isinstance(args.dedup, bool):
+        return args.dedup
+    return parse_remote(args.dedup, session)
+
+
+def _write_reports(args, ops):
+    if args.report is not None:
+        ops.report.write(args.report)
+    if args.prometheus is not None:
+        ops.report.write_prometheus(args.prometheus)
+
 
 class CliMakeCollection(BaseCliCommand):
     """Subcommand for creating a new collection."""
@@ -51,19 +137,21 @@ class CliMakeCollection(BaseCliCommand):
 
 
 class CliRm(BaseCliCommand):
-    """Subcommand for removing a data object or collection."""
+    """Subcommand for removing data objects or collections."""
 
     autocomplete = ["remote_path"]
     names = ["rm", "remove", "del"]
-    description = "Move collection or data object to trash. Delete fully with -f."
-    examples = ["irods:~/test.txt", "-r irods:~/test_collection"]
+    description = "Move collections or data objects to trash. Delete fully with -f."
+    examples = ["irods:~/test.txt", "-r irods:~/test_collection",
+                "-f irods:~/test1.txt irods:~/test2.txt"]
 
     @classmethod
     def _mod_parser(cls, parser):
         parser.add_argument(
             "remote_path",
-            help="Collection or data object to remove.",
+            help="Collections or data objects to remove.",
             type=str,
+            nargs="+",
         )
         parser.add_argument(
             "-r",
@@ -77,23 +165,237 @@ class CliRm(BaseCliCommand):
             help="Immediate removal of data objects without putting them in trash.",
             action="store_true",
         )
+        parser.add_argument(
+            "--workers",
+            help="Number of paths to remove at the same time.",
+            type=int,
+            default=4,
+        )
         return parser
 
     @staticmethod
     def run_shell(session, parser, args):
-        """Remove a data object or collection."""
-        ipath = parse_remote(args.remote_path, session)
-        if ipath.dataobject_exists():
-            ipath.remove(force = args.force)
-        elif ipath.collection_exists():
-            if args.recursive:
-                ipath.remove(force = args.force)
-            else:
+        """Remove data objects or collections."""
+        ipaths = [parse_remote(remote_path, session) for remote_path in args.remote_path]
+        targets = []
+        for ipath, cached_path in zip(ipaths, bulk.resolve(ipaths)):
+            if cached_path is None:
+                print(f"{ipath} not found.")
+            elif cached_path.collection_exists() and not args.recursive:
                 parser.error(
                     f"Cannot remove {ipath}: is a collection. Use -r to remove collections."
                 )
+            else:
+                targets.append(cached_path)
+        try:
+            bulk.remove(targets, workers=args.workers, force=args.force,
+                        progress_bar=len(targets) > 1)
+        except PermissionError as exc:
+            parser.error(exc)
+
+
+class CliVerify(BaseCliCommand):
+    """Subcommand to verify a local copy against the data on the iRODS server."""
+
+    autocomplete = ["local_path", "remote_path"]
+    names = ["verify"]
+    description = ("Verify that a local directory or file is equal to a collection or data object. "
+                   "Lists the missing and extra files, and the files with a different size "
+                   "or checksum. Exits with status 1 if there are differences.")
+    examples = ["some_local_directory irods:~/remote_collection",
+                "some_local_directory irods:~/remote_collection --json --workers 8"]
+
+    @classmethod
+    def _mod_parser(cls, parser):
+        parser.add_argument(
+            "local_path",
+            help="Local directory or file to verify.",
+            type=Path,
+        )
+        parser.add_argument(
+            "remote_path",
+            help="Collection or data object to compare with, starting with 'irods:'.",
+            type=str,
+        )
+        parser.add_argument(
+            "--workers",
+            help="Number of workers to scan the local directory and compute checksums.",
+            type=int,
+            default=4,
+        )
+        parser.add_argument(
+            "--json",
+            help="Print the result as JSON, instead of a tab separated line for each difference.",
+            action="store_true",
+        )
+        parser.add_argument(
+            "--no-compute",
+            help="Do not compute missing checksums on the server, but only compare the sizes "
+            "of those data objects.",
+            action="store_true",
+        )
+        return parser
+
+    @staticmethod
+    def run_shell(session, parser, args):
+        """Verify the local directory or file."""
+        ipath = parse_remote(args.remote_path, session)
+        try:
+            result = verify(args.local_path, ipath, workers=args.workers,
+                            compute_missing=not args.no_compute)
+        except (DoesNotExistError, FileNotFoundError) as exc:
+            parser.error(exc)
+            return
+        if args.json:
+            print(json.dumps(result.to_dict(), indent=4))
+        else:
+            for diff in result.differences():
+                print("\t".join(str(diff[key]) for key in ["status", "path", "local", "remote"]
+                                if key in diff))
+        if not result.ok:
+            sys.exit(1)
+
+
+class CliChecksum(BaseCliCommand):
+    """Subcommand for computing missing checksums on the server."""
+
+    autocomplete = ["remote_path"]
+    names = ["checksum"]
+    description = ("Compute the checksums of data objects that do not have one yet, "
+                   "including all data objects in collections.")
+    examples = ["irods:~/legacy_collection", "irods:~/test.txt irods:~/data --workers 8"]
+
+    @classmethod
+    def _mod_parser(cls, parser):
+        parser.add_argument(
+            "remote_path",
+            help="Collections or data objects to compute the checksums for.",
+            type=str,
+            nargs="+",
+        )
+        parser.add_argument(
+            "--workers",
+            help="Number of checksums to compute at the same time.",
+            type=int,
+            default=4,
+        )
+        parser.add_argument(
+            "--on-error",
+            help="When computing a checksum fails, by default the command stops with the error "
+            "message (fail). With 'warn' the error is turned into a warning and the other "
+            "checksums are computed, with 'skip' the error is ignored.",
+            default="fail",
+            type=str,
+        )
+        return parser
+
+    @staticmethod
+    def run_shell(session, parser, args):
+        """Compute the missing checksums."""
+        if args.on_error and args.on_error.lower() not in ["fail", "warn", "skip"]:
+            parser.error(
+                f"'on-error': Unknown keyword {args.on_error}, choose 'fail', 'warn' or 'skip'")
+        ipaths = [parse_remote(remote_path, session) for remote_path in args.remote_path]
+        try:
+            checksums = bulk.compute_checksums(ipaths, workers=args.workers,
+                                               on_error=args.on_error)
+        except (DoesNotExistError, PermissionError) as exc:
+            parser.error(exc)
+            return
+        print(f"{len(checksums)} data objects have a checksum.")
+
+
+class CliCopy(BaseCliCommand):
+    """Subcommand to copy data on the iRODS server."""
+
+    autocomplete = ["remote_path", "remote_coll"]
+    names = ["cp", "copy"]
+    description = ("Copy a data object or collection to another location on the iRODS server. "
+                   "The data is copied by the server and not transferred through the client.")
+    examples = [
+        "irods:~/test.txt irods:~/other_collection",
+        "irods:~/project_a/data irods:~/project_b --copy-metadata --copy-acls",
+    ]
+
+    @classmethod
+    def _mod_parser(cls, parser):
+        parser.add_argument(
+            "source",
+            help="Data object or collection to copy, starting with 'irods:'.",
+            type=str,
+        )
+        parser.add_argument(
+            "destination",
+            help="Collection to copy into or new data object path, starting with 'irods:'.",
+            type=str,
+        )
+        parser.add_argument(
+            "--overwrite",
+            help="Overwrite the destination data objects if they exist and differ.",
+            action="store_true",
+        )
+        parser.add_argument(
+            "--resource",
+            help="Name of the resource to which the data is to be copied.",
+            type=str,
+            default="",
+            required=False,
+        )
+        parser.add_argument(
+            "--copy-metadata",
+            help="Also copy the metadata of the data objects and collections.",
+            action="store_true",
+        )
+        parser.add_argument(
+            "--copy-acls",
+            help="Also copy the permissions of the data objects and collections.",
+            action="store_true",
+        )
+        parser.add_argument(
+            "--workers",
+            help="Number of data objects that are copied at the same time.",
+            type=int,
+            default=4,
+        )
+        parser.add_argument(
+            "--dry-run",
+            help="Do not copy, but list the data objects to be copied.",
+            action="store_true",
+        )
+        parser.add_argument(
+            "--on-error",
+            help=ON_ERROR_HELP,
+            default="fail",
+            type=str,
+        )
+        _add_report_arguments(parser)
+        return parser
+
+    @staticmethod
+    def run_shell(session, parser, args):
+        """Copy a data object or collection on the iRODS server."""
+        if args.on_error and args.on_error.lower() not in ["fail", "warn", "skip"]:
+            parser.error(
+                f"'on-error': Unknown keyword {args.on_error}, choose 'fail', 'warn' or 'skip'")
+        try:
+            ops = copy(
+                parse_remote(args.source, session),
+                parse_remote(args.destination, session),
+                overwrite=args.overwrite,
+                on_error=args.on_error,
+                resc_name=args.resource,
+                copy_metadata=args.copy_metadata,
+                copy_acls=args.copy_acls,
+                workers=args.workers,
+                dry_run=args.dry_run,
+            )
+        except (DoesNotExistError, PermissionError) as exc:
+            parser.error(str(exc))
+            return
+        if args.dry_run:
+            ops.print_summary()
         else:
-            print(f"{ipath} not found.")
+            _write_reports(args, ops)
 
 
 def _get_metadata_path(
@@ -122,7 +424,8 @@ class CliDownload(BaseCliCommand):
     autocomplete = ["remote_path", "local_dir"]
     names = ["download"]
     description = "Download a data object or collection from an iRODS server."
-    examples = ["irods:~/test.txt", "irods:~/some_collection"]
+    examples = ["irods:~/test.txt", "irods:~/some_collection",
+                "irods:~/some_collection --tar - | tar -t"]
 
     @classmethod
     def _mod_parser(cls, parser):
@@ -150,11 +453,32 @@ class CliDownload(BaseCliCommand):
             default="",
             required=False,
         )
+        parser.add_argument(
+            "--select-replica",
+            help="Download each data object from the good replica on the resource with the "
+            "highest throughput, and try the next replica if it fails. Optionally give the "
+            "resources to try first, in order of preference.",
+            type=str,
+            nargs="*",
+            default=None,
+            metavar="RESOURCE",
+        )
+        _add_verify_argument(parser)
         parser.add_argument(
             "--dry-run",
             help="Do not perform the download, but list the files to be updated.",
             action="store_true",
         )
+        parser.add_argument(
+            "--tar",
+            help="Stream the data object or collection into a tar archive instead of "
+            "downloading it, use '-' to write the archive to stdout. The archive is compressed "
+            "if the file name ends with '.tar.gz' or '.tgz'. With --metadata, the metadata is "
+            "added to the archive.",
+            metavar="FILE",
+            type=str,
+            default=None,
+        )
         parser.add_argument(
             "--metadata",
             help="Path to the metadata file which will be created.",
@@ -167,6 +491,7 @@ class CliDownload(BaseCliCommand):
             help=ON_ERROR_HELP,
             type=str,
         )
+        _add_report_arguments(parser)
         return parser
 
     @staticmethod
@@ -176,6 +501,9 @@ class CliDownload(BaseCliCommand):
             parser.error(
                 f"'on-error': Unknown keyword {args.on_error}, choose 'fail', 'warn' or 'skip'")
         ipath = parse_remote(args.remote_path, session)
+        if args.tar is not None:
+            _download_tar(parser, args, ipath)
+            return
         lpath = Path(args.local_path)
         metadata = _get_metadata_path(args, ipath, lpath, "download")
         try:
@@ -187,12 +515,33 @@ class CliDownload(BaseCliCommand):
                 dry_run=args.dry_run,
                 on_error=args.on_error,
                 metadata=metadata,
+                select_replica=False if args.select_replica is None else args.select_replica,
+                verify=args.verify,
             )
-        except (DoesNotExistError, PermissionError, NotADirectoryError, FileExistsError) as exc:
+        except (DoesNotExistError, PermissionError, NotADirectoryError, FileExistsError,
+                ValueError) as exc:
             parser.error(str(exc))
             return
         if args.dry_run:
             ops.print_summary()
+        else:
+            _write_reports(args, ops)
+
+
+def _download_tar(parser, args, ipath: IrodsPath):
+    archive_format = "tar.gz" if args.tar.endswith((".tar.gz", ".tgz")) else "tar"
+    try:
+        if args.tar == "-":
+            download_archive(ipath, sys.stdout.buffer, format=archive_format,
+                             metadata=hasattr(args, "metadata"), on_error=args.on_error or "fail")
+            sys.stdout.flush()
+        else:
+            with open(args.tar, "wb") as handle:
+                download_archive(ipath, handle, format=archive_format,
+                                 metadata=hasattr(args, "metadata"),
+                                 on_error=args.on_error or "fail")
+    except (DoesNotExistError, PermissionError) as exc:
+        parser.error(str(exc))
 
 
 class CliUpload(BaseCliCommand):
@@ -205,6 +554,7 @@ class CliUpload(BaseCliCommand):
         "local_file.txt",
         "local_file.txt irods:remote_collection",
         "local_dir irods:remote_collection",
+        "run.tar.gz irods:remote_collection --from-tar",
     ]
 
     @classmethod
@@ -238,6 +588,13 @@ class CliUpload(BaseCliCommand):
             help="Do not perform the upload, but list the files to be updated.",
             action="store_true",
         )
+        parser.add_argument(
+            "--from-tar",
+            help="Upload the members of the tar (or zip) archive in local_path into the remote "
+            "collection without extracting it locally. Use '-' as local_path to read the "
+            "archive from stdin.",
+            action="store_true",
+        )
         parser.add_argument(
             "--metadata",
             help="Path to the metadata json.",
@@ -251,6 +608,11 @@ class CliUpload(BaseCliCommand):
             default="fail",
             type=str,
         )
+        _add_placement_argument(parser)
+        _add_dedup_argument(parser)
+        _add_bundle_argument(parser)
+        _add_verify_argument(parser)
+        _add_report_arguments(parser)
         return parser
 
     @staticmethod
@@ -261,6 +623,9 @@ class CliUpload(BaseCliCommand):
                 f"'on-error': Unknown keyword {args.on_error}, choose 'fail', 'warn' or 'skip'")
         lpath = args.local_path
         ipath = parse_remote(args.remote_path, session)
+        if args.from_tar:
+            _upload_tar(parser, args, ipath)
+            return
         metadata = _get_metadata_path(args, ipath, lpath, "upload")
         try:
             ops = upload(
@@ -271,13 +636,46 @@ class CliUpload(BaseCliCommand):
                 dry_run=args.dry_run,
                 metadata=metadata,
                 on_error=args.on_error,
+                placement=args.placement,
+                dedup=_parse_dedup(args, session),
+                bundle_threshold=args.bundle_threshold,
+                verify=args.verify,
             )
-        except (FileNotFoundError, PermissionError, DataObjectExistsError) as exc:
+        except (FileNotFoundError, PermissionError, DataObjectExistsError, ValueError) as exc:
             parser.error(exc)
             return
 
         if args.dry_run:
             ops.print_summary()
+        else:
+            _write_reports(args, ops)
+
+
+def _upload_tar(parser, args, ipath: IrodsPath):
+    unsupported = {
+        "--dry-run": args.dry_run,
+        "--metadata": hasattr(args, "metadata"),
+        "--placement": args.placement is not None,
+        "--dedup": args.dedup is not False,
+        "--bundle-threshold": args.bundle_threshold is not None,
+        "--verify": args.verify != "inline",
+        "--report": args.report is not None,
+        "--prometheus": args.prometheus is not None,
+    }
+    used = [option for option, is_used in unsupported.items() if is_used]
+    if used:
+        parser.error(f"Cannot use {', '.join(used)} together with --from-tar.")
+    archive_format = "zip" if args.local_path.suffix == ".zip" else "tar"
+    try:
+        if str(args.local_path) == "-":
+            upload_archive(sys.stdin.buffer, ipath, overwrite=args.overwrite,
+                           resc_name=args.resource, on_error=args.on_error)
+        else:
+            with open(args.local_path, "rb") as handle:
+                upload_archive(handle, ipath, format=archive_format, overwrite=args.overwrite,
+                               resc_name=args.resource, on_error=args.on_error)
+    except (FileNotFoundError, PermissionError, DataObjectExistsError) as exc:
+        parser.error(str(exc))
 
 
 def _parse_str(remote_or_local: str, session) -> Union[Path, IrodsPath]:
@@ -325,6 +723,11 @@ class CliSync(BaseCliCommand):
             default="fail",
             type=str,
         )
+        _add_placement_argument(parser)
+        _add_dedup_argument(parser)
+        _add_bundle_argument(parser)
+        _add_verify_argument(parser)
+        _add_report_arguments(parser)
         return parser
 
     @staticmethod
@@ -339,10 +742,12 @@ class CliSync(BaseCliCommand):
             metadata = _get_metadata_path(args, dest_path, src_path, "sync")
         elif isinstance(src_path, IrodsPath) and isinstance(dest_path, Path):
             metadata = _get_metadata_path(args, src_path, dest_path, "sync")
+        elif isinstance(src_path, IrodsPath) and isinstance(dest_path, IrodsPath):
+            # Synchronization between collections is done on the server.
+            metadata = None
         else:
             parser.error(
-                "Please provide as the source and destination exactly one local path,"
-                " and one remote path."
+                "Please provide as the source and destination at least one remote path."
             )
             return
         try:
@@ -352,9 +757,111 @@ class CliSync(BaseCliCommand):
                 dry_run=args.dry_run,
                 metadata=metadata,
                 on_error=args.on_error,
+                placement=args.placement,
+                dedup=_parse_dedup(args, session),
+                bundle_threshold=args.bundle_threshold,
+                verify=args.verify,
             )
         except (CollectionDoesNotExistError, NotACollectionError, NotADirectoryError) as exc:
             parser.error(exc)
             return
         if args.dry_run:
             ops.print_summary()
+        else:
+            _write_reports(args, ops)
+
+
+class CliRegister(BaseCliCommand):
+    """Subcommand to register files that the iRODS server can access."""
+
+    autocomplete = ["local_path", "remote_coll"]
+    names = ["register"]
+    description = ("Register a local file or directory in iRODS without uploading it. "
+                   "The iRODS server must be able to access the files, e.g. on a shared "
+                   "file system.")
+    examples = [
+        "/shared/project irods:~/collection",
+        "/shared/project irods:~/collection --server-path /mnt/shared/project --checksum",
+    ]
+
+    @classmethod
+    def _mod_parser(cls, parser):
+        parser.add_argument(
+            "local_path",
+            help="Local file or directory to register.",
+            type=Path,
+        )
+        parser.add_argument(
+            "remote_path",
+            help="Path to the collection to register into, starting with 'irods:'.",
+            type=str,
+        )
+        parser.add_argument(
+            "--server-path",
+            help="Path of the local file or directory on the iRODS server, "
+            "if it is mounted on a different path there.",
+            type=str,
+            default=None,
+        )
+        parser.add_argument(
+            "--overwrite",
+            help="Overwrite the data objects if they exist and differ.",
+            action="store_true",
+        )
+        parser.add_argument(
+            "--resource",
+            help="Name of the resource that can access the files.",
+            type=str,
+            default="",
+            required=False,
+        )
+        parser.add_argument(
+            "--checksum",
+            help="Let the server compute and register the checksums of the files.",
+            action="store_true",
+        )
+        parser.add_argument(
+            "--workers",
+            help="Number of files that are registered at the same time.",
+            type=int,
+            default=4,
+        )
+        parser.add_argument(
+            "--dry-run",
+            help="Do not register, but list the files to be registered.",
+            action="store_true",
+        )
+        parser.add_argument(
+            "--on-error",
+            help=ON_ERROR_HELP,
+            default="fail",
+            type=str,
+        )
+        _add_report_arguments(parser)
+        return parser
+
+    @staticmethod
+    def run_shell(session, parser, args):
+        """Register a local file or directory in iRODS."""
+        if args.on_error and args.on_error.lower() not in ["fail", "warn", "skip"]:
+            parser.error(
+                f"'on-error': Unknown keyword {args.on_error}, choose 'fail', 'warn' or 'skip'")
+        try:
+            ops = register(
+                args.local_path,
+                parse_remote(args.remote_path, session),
+                server_path=args.server_path,
+                overwrite=args.overwrite,
+                on_error=args.on_error,
+                resc_name=args.resource,
+                checksum=args.checksum,
+                workers=args.workers,
+                dry_run=args.dry_run,
+            )
+        except (FileNotFoundError, PermissionError, DataObjectExistsError) as exc:
+            parser.error(str(exc))
+            return
+        if args.dry_run:
+            ops.print_summary()
+        else:
+            _write_reports(args, ops)
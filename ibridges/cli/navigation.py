@@ -6,6 +6,7 @@ import argparse
 import importlib.util
 import os
 import platform
+import shutil
 import unicodedata
 from importlib.metadata import version
 from typing import Optional
@@ -117,10 +118,8 @@ class CliList(BaseCliCommand):
 
     @staticmethod
     def _print_unix_style(ipath, dir_color):
-        try:
-            terminal_size = os.get_terminal_size().columns
-        except OSError:
-            terminal_size = 50
+        # Also respects the COLUMNS environment variable, which is set by the agent.
+        terminal_size = shutil.get_terminal_size(fallback=(50, 24)).columns
         paths = list(ipath.walk(depth=1, include_base_collection=False))
         if len(paths) == 0:
             return
@@ -360,6 +359,60 @@ class CliTree(BaseCliCommand):
         print(print_str)
 
 
+def _format_size(size: int) -> str:
+    if size < 1024:
+        return f"{size} B"
+    cur_size = float(size)
+    for unit in ["KiB", "MiB", "GiB", "TiB", "PiB"]:
+        cur_size /= 1024
+        if cur_size < 1024:
+            break
+    return f"{cur_size:.1f} {unit}"
+
+
+class CliDiskUsage(BaseCliCommand):
+    """Subcommand to show the total size of collections."""
+
+    autocomplete = ["remote_coll"]
+    names = ["du"]
+    description = ("Show the total size and number of data objects of a collection. "
+                   "Replicas are counted separately.")
+    examples = ["", "irods:some_collection --depth 1", "--human-readable"]
+
+    @classmethod
+    def _mod_parser(cls, parser):
+        parser.add_argument(
+            "remote_coll",
+            help="Path to the collection to compute the size of.",
+            type=str,
+            nargs="?",
+            default=".",
+        )
+        parser.add_argument(
+            "--depth",
+            help="Also show the totals of subcollections up to this depth, default 0.",
+            default=0,
+            type=int,
+        )
+        parser.add_argument(
+            "--human-readable",
+            help="Print sizes in KiB, MiB, etc. instead of bytes.",
+            action="store_true",
+        )
+        return parser
+
+    @staticmethod
+    def run_shell(session, parser, args):
+        """Show the total size and number of data objects of a collection."""
+        ipath = parse_remote(args.remote_coll, session)
+        if not ipath.exists():
+            parser.error(f"{ipath} does not exist.")
+            return
+        for path, usage in ipath.disk_usage(depth=args.depth).items():
+            size = _format_size(usage.size) if args.human_readable else str(usage.size)
+            print(f"{size: >12} {usage.count: >10} {path}")
+
+
 class CliSearch(BaseCliCommand):
     """Subcommand to search for kdata objects and collections."""
 
@@ -6,9 +6,9 @@ import traceback
 from pathlib import Path
 
 from ibridges.authenticate import cli_auth
+from ibridges.cli.agent import CliAgent
 from ibridges.cli.base import BaseCliCommand
 from ibridges.cli.config import IbridgesConf
-from ibridges.cli.shell import IBridgesShell
 from ibridges.session import Session
 from ibridges.util import (
     DEFAULT_IENV_PATH,
@@ -32,6 +32,9 @@ class CliShell(BaseCliCommand):
     @classmethod
     def run_command(cls, args):
         """Run the shell from the command line."""
+        # The shell imports all subcommands, so only import it when it is used.
+        from ibridges.cli.shell import IBridgesShell  # pylint: disable=import-outside-toplevel
+
         start = time.time()
         try:
             IBridgesShell().cmdloop()
@@ -233,4 +236,4 @@ class CliSetup(BaseCliCommand):
 
 
 
-CLI_BULTIN_COMMANDS=[CliShell, CliAlias, CliInit, CliSetup]
+CLI_BULTIN_COMMANDS=[CliShell, CliAlias, CliInit, CliSetup, CliAgent]
@@ -2,10 +2,15 @@
 
 import cmd
 import os
+import queue
 import subprocess
 import sys
+import threading
+import time
 import traceback
+from functools import partial
 from pathlib import Path
+from typing import Callable, Optional
 
 try:
     from importlib_metadata import entry_points
@@ -13,16 +18,37 @@ except ImportError:
     from importlib.metadata import entry_points  # type: ignore
 
 from ibridges.authenticate import cli_auth
-from ibridges.cli.data_operations import CliDownload, CliMakeCollection, CliRm, CliSync, CliUpload
+from ibridges.cli.data_operations import (
+    CliChecksum,
+    CliCopy,
+    CliDownload,
+    CliMakeCollection,
+    CliRegister,
+    CliRm,
+    CliSync,
+    CliUpload,
+    CliVerify,
+)
 from ibridges.cli.meta import CliMetaAdd, CliMetaDel, CliMetaDownload, CliMetaList, CliMetaUpload
-from ibridges.cli.navigation import CliCd, CliGui, CliList, CliPwd, CliSearch, CliTree, CliVersion
+from ibridges.cli.navigation import (
+    CliCd,
+    CliDiskUsage,
+    CliGui,
+    CliList,
+    CliPwd,
+    CliSearch,
+    CliTree,
+    CliVersion,
+)
 from ibridges.cli.permission import CliACLEdit
+from ibridges.exception import CollectionDoesNotExistError, NotACollectionError
 from ibridges.path import IrodsPath
 
 ALL_BUILTIN_COMMANDS = [
     CliList,
     CliPwd,
     CliTree,
+    CliDiskUsage,
     CliMetaList,
     CliMetaAdd,
     CliMetaDel,
@@ -35,11 +61,154 @@ ALL_BUILTIN_COMMANDS = [
     CliCd,
     CliRm,
     CliSync,
+    CliCopy,
+    CliRegister,
+    CliChecksum,
+    CliVerify,
     CliGui,
     CliVersion,
     CliACLEdit,
 ]
 IBSHELL_HISTORY_FILE = Path.home() / ".ibridges" / ".shell_history"
+# Commands after which the listings for autocompletion are outdated.
+MUTATING_COMMANDS = [CliMakeCollection, CliRm, CliUpload, CliSync, CliCopy, CliRegister]
+COMPLETION_CACHE_TTL = 30  # Seconds before a listing is refreshed.
+COMPLETION_TIMEOUT = 0.005  # Maximum time to wait for a listing that is not in the cache.
+
+
+class ListingCache:  # pylint: disable=too-many-instance-attributes
+    """Cache of collection listings for the autocompletion of remote paths.
+
+    Listings are retrieved in a background thread, so that autocompletion never
+    waits for the iRODS server for more than a few milliseconds. Listings that are
+    older than the time-to-live are still used, while a new listing is retrieved.
+
+    Parameters
+    ----------
+    session:
+        Session to retrieve the listings with.
+    ttl:
+        Time in seconds after which a listing is refreshed.
+    timeout:
+        Maximum time in seconds to wait for a listing that is not in the cache yet.
+
+    """
+
+    def __init__(self, session, ttl: float = COMPLETION_CACHE_TTL,
+                 timeout: float = COMPLETION_TIMEOUT):
+        """Initialize an empty cache, the background thread is started on first use."""
+        self.session = session
+        self.ttl = ttl
+        self.timeout = timeout
+        self._listings: dict[str, tuple[float, Optional[dict[str, bool]]]] = {}
+        self._pending: set[str] = set()
+        # Increased by invalidate, listings requested before that are dropped.
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._updated = threading.Condition(self._lock)
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+
+    def get(self, coll_path: str) -> Optional[dict[str, bool]]:
+        """Get the listing of a collection.
+
+        Returns
+        -------
+            Dictionary with the names of the subcollections and data objects, with
+            True for collections and False for data objects. None if the path is not
+            a collection or if the listing is not available within the timeout.
+
+        """
+        deadline = time.monotonic() + self.timeout
+        with self._lock:
+            if coll_path not in self._listings or self._is_stale(coll_path):
+                self._request(coll_path)
+            while coll_path not in self._listings:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._updated.wait(remaining)
+            return self._listings[coll_path][1]
+
+    def prefetch(self, coll_path: str, children: bool = False):
+        """Retrieve the listing of a collection in the background.
+
+        Parameters
+        ----------
+        coll_path:
+            Collection to retrieve the listing for.
+        children:
+            Also retrieve the listings of all subcollections.
+
+        """
+        with self._lock:
+            if coll_path not in self._listings or self._is_stale(coll_path):
+                self._request(coll_path, children)
+            elif children:
+                self._request_children(coll_path)
+
+    def invalidate(self):
+        """Remove all listings from the cache.
+
+        Listings that are being retrieved at the moment are dropped when they arrive,
+        since they can be from before a change on the server.
+        """
+        with self._lock:
+            self._listings = {}
+            self._pending = set()
+            self._generation += 1
+
+    def close(self):
+        """Stop the background thread."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def _is_stale(self, coll_path: str) -> bool:
+        return time.monotonic() - self._listings[coll_path][0] > self.ttl
+
+    def _request(self, coll_path: str, children: bool = False):
+        if coll_path in self._pending:
+            return
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True,
+                                            name="ibridges-completion")
+            self._thread.start()
+        self._pending.add(coll_path)
+        self._queue.put((coll_path, children, self._generation))
+
+    def _request_children(self, coll_path: str):
+        listing = self._listings[coll_path][1]
+        for name, is_coll in (listing or {}).items():
+            sub_path = coll_path.rstrip("/") + "/" + name
+            if is_coll and (sub_path not in self._listings or self._is_stale(sub_path)):
+                self._request(sub_path)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            coll_path, children, generation = item
+            if generation != self._generation:
+                continue
+            try:
+                listing = _list_collection(self.session, coll_path)
+            except Exception:  # pylint: disable=broad-exception-caught
+                # Never disturb the shell, the listing will be requested again.
+                with self._lock:
+                    if generation == self._generation:
+                        self._pending.discard(coll_path)
+                continue
+            with self._lock:
+                if generation != self._generation:
+                    continue
+                self._listings[coll_path] = (time.monotonic(), listing)
+                self._pending.discard(coll_path)
+                self._updated.notify_all()
+                if children:
+                    self._request_children(coll_path)
 
 
 class IBridgesShell(cmd.Cmd):
@@ -60,6 +229,8 @@ class IBridgesShell(cmd.Cmd):
         except ImportError:
             pass
         self.session = cli_auth(None)
+        self.listing_cache = ListingCache(self.session)
+        self.listing_cache.prefetch(self.session.cwd, children=True)
         self.commands = {}
         for command_class in get_all_shell_commands():
             for name in command_class.names:
@@ -94,16 +265,18 @@ class IBridgesShell(cmd.Cmd):
 
         complete = []
         if command_class.autocomplete[len(arg_list) - 1] == "remote_path":
-            complete = complete_ipath(self.session, text, line, collections_only=False)
+            complete = complete_ipath(self.session, text, line, collections_only=False,
+                                      cache=self.listing_cache)
         elif command_class.autocomplete[len(arg_list) - 1] == "remote_coll":
-            complete = complete_ipath(self.session, text, line, collections_only=True)
+            complete = complete_ipath(self.session, text, line, collections_only=True,
+                                      cache=self.listing_cache)
         elif command_class.autocomplete[len(arg_list) - 1] == "local_path":
             complete = complete_lpath(text, line, directories_only=False)
         elif command_class.autocomplete[len(arg_list) - 1] == "local_dir":
             complete = complete_lpath(text, line, directories_only=True)
         elif command_class.autocomplete[len(arg_list) - 1] == "any_dir":
             complete = complete_lpath(text, line, directories_only=True) + complete_ipath(
-                self.session, text, line, collections_only=True
+                self.session, text, line, collections_only=True, cache=self.listing_cache
             )
         return complete
 
@@ -112,6 +285,11 @@ class IBridgesShell(cmd.Cmd):
         args = parser.parse_args(_prepare_args(arg))
         if not getattr(parser, "printed_help", False):
             command_class.run_shell(self.session, parser, args)
+            if issubclass(command_class, tuple(MUTATING_COMMANDS)):
+                self.listing_cache.invalidate()
+            if issubclass(command_class, CliCd) or issubclass(command_class,
+                                                              tuple(MUTATING_COMMANDS)):
+                self.listing_cache.prefetch(self.session.cwd, children=True)
 
     def _universal_help(self, command_class):
         command_class.get_parser().print_help()
@@ -127,6 +305,7 @@ class IBridgesShell(cmd.Cmd):
 
     def close(self):
         """Close the session."""
+        self.listing_cache.close()
         self.session.close()
         try:
             import readline  # pylint: disable=import-outside-toplevel
@@ -220,28 +399,41 @@ def _prepare_args(args, add_last_space=False, unescape=True):
     return split_args
 
 
-def _filter(ipaths, collections_only, base_path, add_prefix=False):
-    ipaths = [p for p in ipaths if str(p) != str(base_path)]
-    if collections_only:
-        ipaths = [p for p in ipaths if p.collection_exists()]
-    names = [p.name + "/" if p.collection_exists() else p.name for p in ipaths]
-    # col_names = [p.name for p in ipaths if p.collection_exists()]
-    # else:
-    # col_names = [p.name for p in ipaths]
-    if add_prefix:
-        return [f"irods:{c}" for c in names]
-    return names
+def _list_collection(session, coll_path: str) -> Optional[dict[str, bool]]:
+    """List the collection, with True for subcollections and False for data objects."""
+    try:
+        return {ipath.name: ipath.collection_exists()
+                for ipath in IrodsPath(session, coll_path).walk(depth=1,
+                                                                include_base_collection=False)}
+    except (CollectionDoesNotExistError, NotACollectionError):
+        return None
 
 
-def complete_ipath(session, text, line, collections_only=False):  # pylint: disable=too-many-branches
-    """Complete an IrodsPath."""
+def _filter(listing, collections_only):
+    if listing is None:
+        return []
+    return [name + "/" if is_coll else name for name, is_coll in sorted(listing.items())
+            if is_coll or not collections_only]
+
+
+def complete_ipath(session, text, line, collections_only=False,  # pylint: disable=too-many-branches
+                   cache: Optional[ListingCache] = None):
+    """Complete an IrodsPath.
+
+    If a cache is supplied, listings are only retrieved through the cache, otherwise
+    the collections are listed on the iRODS server directly.
+    """
+    get_listing: Callable[[str], Optional[dict[str, bool]]]
+    if cache is None:
+        get_listing = partial(_list_collection, session)
+    else:
+        get_listing = cache.get
     args = _prepare_args(line, unescape=False)[1:]
     args = [x for x in args if not x.startswith("-")]
 
     # When nothing has been completed yet.
     if len(args) == 0 or args[-1] == "":
-        ipath_list = list(IrodsPath(session).walk(depth=1))
-        return _escape(_filter(ipath_list, collections_only, IrodsPath(session)))
+        return _escape(_filter(get_listing(session.cwd), collections_only))
 
     base_arg = args[-1]
     base_completion = []
@@ -253,37 +445,39 @@ def complete_ipath(session, text, line, collections_only=False):  # pylint: disa
 
     # In case of matching "irods:"
     if len(base_arg) == 0:
-        ipath_list = list(IrodsPath(session).walk(depth=1))
-        return _escape(_filter(ipath_list, collections_only, IrodsPath(session), add_prefix=False))
+        return _escape(_filter(get_listing(session.cwd), collections_only))
 
     # Add collections to the list
     base_path = IrodsPath(session, _unescape(base_arg))
-    if base_path.collection_exists():
-        if line.endswith("/"):
-            path_list = _filter(base_path.walk(depth=1), collections_only, base_path)
-            return [f"{text}{_escape(ipath)}" for ipath in path_list]
+    if line.endswith("/"):
+        listing = get_listing(str(base_path.absolute()))
+        if listing is not None:
+            return [f"{text}{_escape(name)}" for name in _filter(listing, collections_only)]
+
+    # Add the path itself if it is a collection or data object.
+    abs_path = base_path.absolute()
+    last_part = abs_path.name
+    parent_listing = get_listing(str(abs_path.parent))
+    if parent_listing is None:
+        parent_listing = {}
+    if parent_listing.get(last_part) is True:
         base_completion.append(f"{text}/")
-
-    # Add data objects to the list
-    if base_path.dataobject_exists():
+    elif parent_listing.get(last_part) is False:
         base_completion.append(text)
 
     # Add partial data object and collections to the list.
-    last_part = base_path.parts[-1]
-    base_path = IrodsPath(session, *base_path.parts[:-1])
     completions = []
-    for ipath in base_path.walk(depth=1, include_base_collection=False):
-        if str(ipath) == base_path or base_arg.endswith("/"):
-            continue
-        if (
-            ipath.name.startswith(last_part)
-            and not ipath.name == last_part
-            and not (collections_only and not ipath.collection_exists())
-        ):
-            compl = text + _escape(ipath.name[len(last_part) :])
-            if ipath.collection_exists():
-                compl += "/"
-            completions.append(compl)
+    if not base_arg.endswith("/"):
+        for name, is_coll in parent_listing.items():
+            if (
+                name.startswith(last_part)
+                and not name == last_part
+                and not (collections_only and not is_coll)
+            ):
+                compl = text + _escape(name[len(last_part) :])
+                if is_coll:
+                    compl += "/"
+                completions.append(compl)
 
     all_completions = list(set(base_completion + completions))
 
@@ -1,36 +1,58 @@
 """Data and metadata transfers.
 
 Transfer data between local file system and iRODS, includes upload, download and sync.
+Files that the iRODS server can access can also be registered in place, and collections
+can be streamed into a tar archive and uploaded from one.
+Data can also be copied and synchronized between iRODS collections on the server.
 Also includes operations for creating a local metadata archive and using this archive
 to set the metadata.
 """
 
+# pylint: disable=too-many-lines
+
 from __future__ import annotations
 
+import io
 import json
 import os
+import tarfile
+import time
 import warnings
-from pathlib import Path
-from typing import Optional, Union
+import zipfile
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from pathlib import Path, PurePosixPath
+from typing import BinaryIO, Iterable, Optional, Union
 
 import irods.collection
 import irods.data_object
 import irods.exception
+import irods.keywords as kw
+from tqdm import tqdm
 
+from ibridges import bulk
+from ibridges import icat_columns as icat
 from ibridges.exception import (
     CollectionDoesNotExistError,
     DataObjectExistsError,
     DoesNotExistError,
     NotACollectionError,
+    ObjectTransferFailedError,
 )
-from ibridges.executor import Operations
-from ibridges.path import CachedIrodsPath, IrodsPath
-from ibridges.util import checksums_equal
+from ibridges.executor import Operations, _meta_archive_dict, _raise_transfer_errors
+from ibridges.path import CachedIrodsPath, IrodsPath, _query_rows
+from ibridges.placement import PLACEMENT_POLICIES
+from ibridges.search import _checksum_type, search_checksums
+from ibridges.util import PUT_OPR, HashingTee, _detect_checksum, calc_checksum, checksums_equal
 
 NUM_THREADS = 4
+ARCHIVE_BUFFER_SIZE = 64 * 1024**2
+ARCHIVE_FORMATS = ["tar", "tar.gz"]
+ARCHIVE_CHUNK_SIZE = 4 * 1024**2
 
 
-def upload(
+def upload(  # pylint: disable=too-many-arguments
     local_path: Union[str, Path],
     irods_path: IrodsPath,
     overwrite: bool = False,
@@ -41,6 +63,11 @@ def upload(
     dry_run: bool = False,
     metadata: Union[None, str, Path, dict] = None,
     progress_bar: bool = True,
+    placement: Optional[str] = None,
+    *,
+    dedup: Union[bool, str, IrodsPath] = False,
+    bundle_threshold: Optional[int] = None,
+    verify: str = "inline",
 ) -> Operations:
     """Upload a local directory or file to iRODS.
 
@@ -71,6 +98,22 @@ def upload(
         If not None, it should point to a file that contains the metadata for the upload.
     progress_bar:
         Whether to display a progress bar.
+    placement:
+        Spread the files over the root resources with a placement policy: 'round-robin',
+        'free-space' or 'least-in-flight', see :mod:`ibridges.placement`. The files are
+        then uploaded by parallel workers.
+        Cannot be used together with resc_name.
+    dedup:
+        Instead of uploading a file, copy a data object with the same checksum and size
+        on the server. If True, such data objects are looked up in the home collection,
+        otherwise in the given collection. Files that are equal are only uploaded once.
+    bundle_threshold:
+        Upload new files smaller than this size in bytes in tar bundles, which are extracted
+        on the server, see :mod:`ibridges.bundles`. This is much faster for many small files.
+    verify:
+        When to verify the checksums of the transferred files: 'inline' after each file,
+        'deferred' in parallel after all transfers, or 'none'.
+        See :meth:`ibridges.executor.Operations.execute`.
 
     Returns
     -------
@@ -84,6 +127,8 @@ def upload(
         If the data object to be uploaded already exists without using overwrite==True.
     PermissionError:
         If the iRODS server does not allow the collection or data object to be created.
+    ValueError:
+        If the placement policy is unknown or used together with resc_name.
 
     Examples
     --------
@@ -100,6 +145,7 @@ def upload(
     >>> ops.execute()  # Performs the upload
 
     """
+    _placement_checks(resc_name, placement)
     local_path = Path(local_path)
     session = irods_path.session
     ops = Operations()
@@ -129,16 +175,19 @@ def upload(
         )
     else:
         raise FileNotFoundError(f"Cannot upload {local_path}: file or directory does not exist.")
+    _dedup_operations(ops, session, dedup)
     ops.resc_name = resc_name
     ops.options = options
+    ops.placement = placement
+    ops.bundle_threshold = bundle_threshold
     if metadata is not None:
         add_meta_from_archive(metadata, idest_path, dry_run=True, ops=ops)
     if not dry_run:
-        ops.execute(session, on_error=on_error, progress_bar=progress_bar)
+        ops.execute(session, on_error=on_error, progress_bar=progress_bar, verify=verify)
     return ops
 
 
-def download(
+def download(  # pylint: disable=too-many-arguments
     irods_path: IrodsPath,
     local_path: Union[str, Path],
     overwrite: bool = False,
@@ -149,6 +198,9 @@ def download(
     dry_run: bool = False,
     metadata: Union[None, str, Path] = None,
     progress_bar: bool = True,
+    select_replica: Union[bool, list[str]] = False,
+    *,
+    verify: str = "inline",
 ) -> Operations:
     """Download a collection or data object to the local filesystem.
 
@@ -180,6 +232,17 @@ def download(
         It is recommended to use the .json suffix.
     progress_bar:
         Whether to display a progress bar.
+    select_replica:
+        Choose the replica to download each data object from, instead of letting the
+        server decide. Only good replicas are used, ordered by the throughput of their resource
+        in earlier downloads. If a download fails, the next replica is tried.
+        Supply a list of root resource names to try replicas on these resources first,
+        in order of preference. See :mod:`ibridges.replicas`.
+        Cannot be used together with resc_name.
+    verify:
+        When to verify the checksums of the transferred files: 'inline' after each file,
+        'deferred' in parallel after all transfers, or 'none'.
+        See :meth:`ibridges.executor.Operations.execute`.
 
     Returns
     -------
@@ -196,6 +259,8 @@ def download(
         If the irods_path points to a data object and the local file already exists.
     NotADirectoryError:
         If the irods_path is a collection, while the destination is a file.
+    ValueError:
+        If replica selection is used together with resc_name.
 
     Examples
     --------
@@ -210,6 +275,8 @@ def download(
     >>> ops.execute()
 
     """
+    if select_replica is not False and resc_name not in ["", None]:
+        raise ValueError("Cannot select replicas when a resource name is given.")
     session = irods_path.session
     local_path = Path(local_path)
 
@@ -245,12 +312,550 @@ def download(
         ops.meta_download.extend(new_ops.meta_download)
     ops.resc_name = resc_name
     ops.options = options
+    ops.select_replica = select_replica is not False
+    ops.preferred_resources = select_replica if isinstance(select_replica, list) else None
+    if not dry_run:
+        ops.execute(session, on_error=on_error, progress_bar=progress_bar, verify=verify)
+    return ops
+
+
+def download_archive(
+    irods_path: IrodsPath,
+    fileobj: BinaryIO,
+    format: str = "tar",  # pylint: disable=redefined-builtin
+    workers: int = NUM_THREADS,
+    buffer_size: int = ARCHIVE_BUFFER_SIZE,
+    metadata: bool = False,
+    on_error: str = "fail",
+) -> int:
+    """Stream a data object or collection into a tar archive without using local storage.
+
+    The data objects and the modification times of the collections are read ahead by parallel
+    workers and written to the archive in order. Data objects are kept in memory until they are
+    written, up to the buffer size. Larger data objects are streamed from iRODS into the
+    archive directly, after everything that was read ahead has been written.
+
+    Parameters
+    ----------
+    irods_path:
+        Path to the data object or collection to archive. The paths in the archive start with
+        its name, like with :func:`download`.
+    fileobj:
+        Binary file object to write the archive to, for example an open file or
+        `sys.stdout.buffer`. It does not need to be seekable.
+    format:
+        'tar' for a plain tar archive, or 'tar.gz' for a gzip-compressed one.
+    workers:
+        Number of data objects that are read at the same time.
+    buffer_size:
+        Maximum number of bytes that are read ahead in memory.
+    metadata:
+        Whether to add the metadata of the data objects and collections as a JSON member,
+        in the format of :func:`create_meta_archive`, at the same path where :func:`download`
+        stores the metadata by default.
+    on_error:
+        When reading a data object fails, by default the archive is stopped with an error.
+        By setting 'on-error' to 'warn', the data object is skipped with a warning.
+        Setting 'on-error' to 'skip' skips the data object without a message.
+        Data objects larger than the buffer are streamed into the archive, so if reading them
+        fails halfway, the archive is always stopped with an error, since it cannot be
+        completed without a truncated member.
+
+    Returns
+    -------
+        The number of data objects that were written to the archive.
+
+    Raises
+    ------
+    DoesNotExistError:
+        If the irods_path does not exist.
+    ValueError:
+        If the format is unknown.
+
+    Examples
+    --------
+    >>> with open("collection.tar", "wb") as handle:
+    >>>     download_archive(IrodsPath(session, "~/collection"), handle)
+
+    """
+    if format not in ARCHIVE_FORMATS:
+        raise ValueError(f"Unknown archive format '{format}', choose one of "
+                         f"{ARCHIVE_FORMATS}.")
+    session = irods_path.session
+    if irods_path.collection_exists():
+        ipaths = irods_path.walk()
+        meta_base, meta_name = irods_path, f"{irods_path.name}/.ibridges_metadata.json"
+    elif irods_path.dataobject_exists():
+        ipaths = iter([CachedIrodsPath(session, irods_path.size, True, None, str(irods_path))])
+        meta_base, meta_name = irods_path.parent, ".ibridges_metadata.json"
+    else:
+        raise DoesNotExistError(f"Data object or collection not found: '{irods_path}'")
+
+    if format == "tar.gz":
+        tar = tarfile.open(fileobj=fileobj, mode="w|gz")
+    else:
+        tar = tarfile.open(fileobj=fileobj, mode="w|")
+    meta_paths: list[IrodsPath] = []
+    with tar, _ArchiveWriter(tar, irods_path.parent, workers, buffer_size, on_error) as writer:
+        for ipath in ipaths:
+            meta_paths.append(ipath)
+            writer.add(ipath)
+        writer.flush()
+        if metadata:
+            meta_bytes = json.dumps(_meta_archive_dict(meta_base, meta_paths),
+                                    indent=4).encode("utf-8")
+            info = tarfile.TarInfo(meta_name)
+            info.size = len(meta_bytes)
+            info.mtime = int(time.time())
+            tar.addfile(info, io.BytesIO(meta_bytes))
+    return writer.n_objects
+
+
+class _ArchiveWriter():  # pylint: disable=too-many-instance-attributes
+    """Write data objects to a tar archive in order, while reading ahead in parallel."""
+
+    def __init__(self, tar: tarfile.TarFile, base_path: IrodsPath, workers: int,
+                 buffer_size: int, on_error: str):
+        self.tar = tar
+        self.base_path = base_path
+        self.buffer_size = buffer_size
+        self.on_error = on_error
+        self.pool = ThreadPoolExecutor(max(workers, 1))
+        self.pending: deque = deque()
+        self.in_memory = 0
+        self.n_objects = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        for _, _, future in self.pending:
+            future.cancel()
+        self.pool.shutdown()
+
+    def add(self, ipath: IrodsPath):
+        """Add a collection or data object, which is read ahead if it fits in the buffer.
+
+        The paths are usually CachedIrodsPaths from a walk, so their type and size are known.
+        """
+        if ipath.collection_exists():
+            self.pending.append((ipath, None, self.pool.submit(_collection_time, ipath)))
+            return
+        size = ipath.size
+        if size > self.buffer_size:
+            # Write everything that was read ahead first, to keep the order.
+            self.flush()
+            self._write_streamed(ipath, size)
+            return
+        while len(self.pending) > 0 and self.in_memory + size > self.buffer_size:
+            self._write_next()
+        self.in_memory += size
+        self.pending.append((ipath, size, self.pool.submit(_read_data_object, ipath)))
+
+    def flush(self):
+        """Write all collections and data objects that were read ahead."""
+        while len(self.pending) > 0:
+            self._write_next()
+
+    def _write_next(self):
+        ipath, size, future = self.pending.popleft()
+        info = tarfile.TarInfo(str(ipath.relative_to(self.base_path)))
+        if size is None:
+            info.type = tarfile.DIRTYPE
+            info.mode = 0o755
+            info.mtime = future.result()
+            self.tar.addfile(info)
+            return
+        self.in_memory -= size
+        try:
+            info.mtime, data = future.result()
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            _raise_transfer_errors(self.on_error, f"Cannot add {ipath} to the archive, "
+                                   f"{repr(error)}", ObjectTransferFailedError, error)
+            return
+        # The replica that was read can be smaller than the size of the data object.
+        info.size = len(data)
+        self.tar.addfile(info, io.BytesIO(data))
+        self.n_objects += 1
+
+    def _write_streamed(self, ipath: IrodsPath, size: int):
+        info = tarfile.TarInfo(str(ipath.relative_to(self.base_path)))
+        try:
+            dataobj = ipath.dataobject
+            handle = dataobj.open("r")
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            _raise_transfer_errors(self.on_error, f"Cannot add {ipath} to the archive, "
+                                   f"{repr(error)}", ObjectTransferFailedError, error)
+            return
+        info.mtime = _timestamp(dataobj.modify_time)
+        info.size = size
+        # Once the header is written, a failure leaves a truncated member behind, so the
+        # archive cannot be continued whatever on_error is.
+        try:
+            with handle:
+                self.tar.addfile(info, handle)
+        except Exception as error:
+            raise ObjectTransferFailedError(f"Cannot add {ipath} to the archive, the archive "
+                                            f"is incomplete, {repr(error)}") from error
+        self.n_objects += 1
+
+
+def _collection_time(ipath: IrodsPath) -> int:
+    """Get the modification time of a collection."""
+    return _timestamp(ipath.collection.modify_time)
+
+
+def _read_data_object(ipath: IrodsPath) -> tuple[int, bytes]:
+    """Read a data object, returning its modification time and content."""
+    dataobj = ipath.dataobject
+    with dataobj.open("r") as handle:
+        return _timestamp(dataobj.modify_time), handle.read()
+
+
+def _timestamp(modify_time: datetime) -> int:
+    """Convert the modification time of iRODS, in UTC, to a POSIX timestamp."""
+    if modify_time.tzinfo is None:
+        modify_time = modify_time.replace(tzinfo=timezone.utc)
+    return int(modify_time.timestamp())
+
+
+def upload_archive(  # pylint: disable=too-many-locals
+    fileobj: BinaryIO,
+    irods_path: IrodsPath,
+    format: str = "tar",  # pylint: disable=redefined-builtin
+    overwrite: bool = False,
+    resc_name: str = "",
+    workers: int = NUM_THREADS,
+    buffer_size: int = ARCHIVE_BUFFER_SIZE,
+    on_error: str = "fail",
+    progress_bar: bool = True,
+) -> int:
+    """Upload the members of a tar or zip archive without extracting it to local storage.
+
+    The members are read one by one and written to data objects by parallel workers.
+    Members are kept in memory until they are written, up to the buffer size. Larger
+    members are streamed into their data objects directly. The checksums of the data objects
+    are registered and compared with the checksums of the members. Collections are created,
+    or listed to check for existing data objects, when members appear in them.
+
+    Parameters
+    ----------
+    fileobj:
+        Binary file object to read the archive from, for example an open file or
+        `sys.stdin.buffer`. Tar archives, which can be compressed, are read as a stream,
+        zip archives need a seekable file object.
+    irods_path:
+        Collection to upload the members of the archive into.
+    format:
+        'tar' for a tar archive with or without compression, or 'zip' for a zip archive.
+    overwrite:
+        Whether to overwrite data objects that already exist.
+    resc_name:
+        Name of the resource to which data is uploaded, by default the server will decide.
+    workers:
+        Number of data objects that are written at the same time.
+    buffer_size:
+        Maximum number of bytes that are kept in memory.
+    on_error:
+        When uploading a member fails, by default the upload is stopped with an error.
+        By setting 'on-error' to 'warn', the member is skipped with a warning.
+        Setting 'on-error' to 'skip' skips the member without a message.
+    progress_bar:
+        Whether to display a progress bar.
+
+    Returns
+    -------
+        The number of data objects that were uploaded.
+
+    Raises
+    ------
+    DataObjectExistsError:
+        If a data object already exists without using overwrite==True.
+    ValueError:
+        If the format is unknown.
+
+    Examples
+    --------
+    >>> with open("instrument_run.tar.gz", "rb") as handle:
+    >>>     upload_archive(handle, IrodsPath(session, "~/runs"))
+
+    """
+    if format not in ["tar", "zip"]:
+        raise ValueError(f"Unknown archive format '{format}', choose 'tar' or 'zip'.")
+    session = irods_path.session
+    # Names of the data objects in each collection in which members have appeared.
+    listings: dict[str, set[str]] = {}
+    options: dict = {kw.OPR_TYPE_KW: PUT_OPR}
+    if resc_name:
+        options[kw.DEST_RESC_NAME_KW] = resc_name
+
+    def _write(ipath: IrodsPath, data: bytes) -> int:
+        return _write_stream(session, ipath, io.BytesIO(data), options, on_error, pbar)
+
+    n_objects = 0
+    futures: dict = {}
+    with tqdm(unit="B", unit_scale=True, unit_divisor=1024, disable=not progress_bar) as pbar, \
+            ThreadPoolExecutor(max(workers, 1)) as pool:
+        for name, is_dir, size, handle in _archive_members(fileobj, format):
+            rel_parts = PurePosixPath(name).parts
+            if ".." in rel_parts or name.startswith("/"):
+                _raise_transfer_errors(on_error, f"Member '{name}' of the archive is outside "
+                                       "of the destination.", ValueError)
+                continue
+            ipath = irods_path.joinpath(*rel_parts)
+            coll_path = ipath if is_dir else ipath.parent
+            if str(coll_path) not in listings:
+                listings[str(coll_path)] = _collection_listing(coll_path)
+            if is_dir:
+                continue
+            if ipath.name in listings[str(coll_path)] and not overwrite:
+                _raise_transfer_errors(
+                    on_error, f"Data object {ipath} already exists. "
+                    "Use overwrite=True to overwrite the existing data object.",
+                    DataObjectExistsError)
+                continue
+            if size > buffer_size:
+                n_objects += _write_stream(session, ipath, handle, options, on_error, pbar)
+                continue
+            while len(futures) > 0 and sum(futures.values()) + size > buffer_size:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    n_objects += future.result()
+                    del futures[future]
+            futures[pool.submit(_write, ipath, handle.read())] = size
+        n_objects += sum(future.result() for future in futures)
+    return n_objects
+
+
+def _archive_members(fileobj: BinaryIO, archive_format: str) -> Iterable[tuple]:
+    """Iterate over the name, whether it is a directory, size and file handle of the members."""
+    if archive_format == "zip":
+        with zipfile.ZipFile(fileobj) as archive:
+            for zip_info in archive.infolist():
+                with archive.open(zip_info) as handle:
+                    yield (zip_info.filename.rstrip("/"), zip_info.is_dir(), zip_info.file_size,
+                           handle)
+        return
+    with tarfile.open(fileobj=fileobj, mode="r|*") as archive:
+        for tar_info in archive:
+            if tar_info.isdir():
+                yield tar_info.name, True, 0, None
+            elif tar_info.isfile():
+                yield tar_info.name, False, tar_info.size, archive.extractfile(tar_info)
+
+
+def _collection_listing(coll_path: IrodsPath) -> set[str]:
+    """Get the names of the data objects in a collection, which is created if it does not exist."""
+    if not coll_path.collection_exists():
+        coll_path.create_collection()
+        return set()
+    return {name for name, in _query_rows(coll_path.session, (icat.DATA_NAME, ),
+                                          [icat.COLL_NAME == str(coll_path)])}
+
+
+def _write_stream(session, ipath: IrodsPath, handle, options: dict, on_error: str, pbar) -> int:
+    """Write a member of an archive to a data object and verify its registered checksum."""
+    # Both checksum types are computed, since the data cannot be read again.
+    sha2_tee = HashingTee(handle, "sha2")
+    tee = HashingTee(sha2_tee, "md5")
+    try:
+        with session.irods_session.data_objects.open(str(ipath), "w", **options) as dest:
+            for chunk in iter(lambda: tee.read(ARCHIVE_CHUNK_SIZE), b""):
+                dest.write(chunk)
+                pbar.update(len(chunk))
+        remote_checksum = session.irods_session.data_objects.chksum(str(ipath))
+        local_checksum = (sha2_tee if _detect_checksum(remote_checksum) == "sha2" else tee).checksum
+        if remote_checksum != local_checksum:
+            raise ValueError(f"the checksum of the member ({local_checksum}) differs from the "
+                             f"checksum of the data object ({remote_checksum})")
+        return 1
+    except Exception as error:  # pylint: disable=broad-exception-caught
+        _raise_transfer_errors(on_error, f"Cannot upload {ipath}, {repr(error)}",
+                               ObjectTransferFailedError, error)
+    return 0
+
+
+def copy(
+    source: IrodsPath,
+    target: IrodsPath,
+    overwrite: bool = False,
+    on_error: str = "fail",
+    resc_name: str = "",
+    copy_empty_folders: bool = True,
+    copy_metadata: bool = False,
+    copy_acls: bool = False,
+    workers: int = NUM_THREADS,
+    dry_run: bool = False,
+    progress_bar: bool = True,
+) -> Operations:
+    """Copy a data object or collection to another location on the iRODS server.
+
+    The data objects are copied by the iRODS server with parallel workers, so the data
+    does not pass through the client. Data objects that already exist with the same size
+    and checksum are not copied again.
+
+    Parameters
+    ----------
+    source:
+        Data object or collection to copy.
+    target:
+        Collection to copy the source into, or the new path for a data object.
+    overwrite:
+        If the destination data objects already exist and differ, overwrite them.
+    on_error:
+        When a copy of a data object fails, by default the whole operation will stop and
+        print the error message(fail). By setting 'on-error' to 'warn', those errors
+        will be turned into warnings and the copying continues with the next data object.
+        Setting 'on-error' to 'skip' will omit any message and simply proceed.
+    resc_name:
+        Name of the resource to which the data is copied, by default the server will decide.
+    copy_empty_folders:
+        Create the respective collections for empty collections. Default: True.
+    copy_metadata:
+        Also copy the metadata of the data objects and collections.
+    copy_acls:
+        Also copy the permissions of the data objects and collections, other than those of
+        the current user.
+    workers:
+        Number of data objects that are copied at the same time.
+    dry_run:
+        Whether to do a dry run before copying the data objects and collections.
+    progress_bar:
+        Whether to display a progress bar.
+
+    Returns
+    -------
+        Operations object that can be used to execute the copy in case of a dry-run.
+
+    Raises
+    ------
+    DoesNotExistError:
+        If the source does not exist.
+    DataObjectExistsError:
+        If a data object to be copied already exists and differs, without using overwrite==True.
+
+    Examples
+    --------
+    >>> # Below will create the collection "~/project_b/some_col"
+    >>> copy(IrodsPath(session, "~/project_a/some_col"), IrodsPath(session, "~/project_b"))
+
+    >>> # Also copy the metadata and permissions
+    >>> copy(ipath, IrodsPath(session, "~/project_b"), copy_metadata=True, copy_acls=True)
+
+    """
+    session = source.session
+    if source.collection_exists():
+        idest_path = target / source.name
+        if not overwrite and idest_path.dataobject_exists():
+            raise DataObjectExistsError(f"Data object {idest_path} already exists.")
+        ops = _copy_sync_operations(source, idest_path, copy_empty_folders=copy_empty_folders,
+                                    depth=None, overwrite=overwrite, on_error=on_error)
+        if not target.collection_exists():
+            ops.add_create_coll(target)
+    elif source.dataobject_exists():
+        ops = Operations()
+        idest_path = target / source.name if target.collection_exists() else target
+        if not idest_path.dataobject_exists() or _copy_needed(source, idest_path, overwrite,
+                                                              on_error):
+            ops.add_copy(source, idest_path)
+        else:
+            ops.copy_unchanged += 1
+    else:
+        raise DoesNotExistError(f"Data object or collection not found: '{source}'")
+    ops.resc_name = resc_name
+    ops.copy_metadata = copy_metadata
+    ops.copy_acls = copy_acls
+    ops.copy_workers = workers
     if not dry_run:
         ops.execute(session, on_error=on_error, progress_bar=progress_bar)
     return ops
 
 
-def sync(
+def register(
+    local_path: Union[str, Path],
+    irods_path: IrodsPath,
+    server_path: Union[None, str, Path] = None,
+    overwrite: bool = False,
+    on_error: str = "fail",
+    resc_name: str = "",
+    copy_empty_folders: bool = True,
+    checksum: bool = False,
+    workers: int = NUM_THREADS,
+    dry_run: bool = False,
+    progress_bar: bool = True,
+) -> Operations:
+    """Register a local directory or file that the iRODS server can access.
+
+    Instead of uploading the data, the files are added to the iRODS catalog in place,
+    for example if the data is on a shared file system that is mounted on both the client and
+    the iRODS server. The local directory is walked like with :func:`upload`, and the files are
+    registered with parallel workers. Registering data outside of the vault of a resource
+    usually requires rodsadmin permissions.
+
+    Parameters
+    ----------
+    local_path:
+        Path to the directory or file to register.
+    irods_path:
+        Irods destination path, the directory is registered as a subcollection of it.
+    server_path:
+        Path of the local directory or file on the iRODS server, if the shared file system is
+        mounted on a different path there. By default the absolute local path.
+    overwrite:
+        If data object or collection already exists on iRODS, overwrite.
+    on_error:
+        When the registration of a file fails, by default the whole registration will stop.
+        By setting 'on-error' to 'warn', those errors will be turned into warnings and
+        the registration continues with the next file.
+        Setting 'on-error' to 'skip' will omit any message and simply proceed.
+    resc_name:
+        Name of the resource that can access the files, by default the default resource.
+    copy_empty_folders:
+        Create respective iRODS collection for empty folders. Default: True.
+    checksum:
+        Whether the server computes and registers the checksums of the files.
+    workers:
+        Number of files that are registered at the same time.
+    dry_run:
+        Whether to do a dry run before registering the files.
+    progress_bar:
+        Whether to display a progress bar.
+
+    Returns
+    -------
+        Operations object that can be used to execute the registration in case of a dry-run.
+
+    Raises
+    ------
+    FileNotFoundError:
+        If the local_path is not a valid filename of directory.
+    DataObjectExistsError:
+        If the data object to be registered already exists without using overwrite==True.
+    PermissionError:
+        If the iRODS server does not allow the data to be registered.
+
+    Examples
+    --------
+    >>> # The directory /shared/project is mounted as /mnt/shared/project on the iRODS server.
+    >>> register("/shared/project", IrodsPath(session, "~"), server_path="/mnt/shared/project")
+
+    """
+    local_path = Path(local_path).absolute()
+    server_path = local_path if server_path is None else server_path
+    ops = upload(local_path, irods_path, overwrite=overwrite, on_error=on_error,
+                 copy_empty_folders=copy_empty_folders, dry_run=True)
+    for lpath, ipath in ops.upload:
+        ops.add_register(lpath, ipath, str(Path(server_path, lpath.relative_to(local_path))))
+    ops.upload = []
+    ops.resc_name = resc_name
+    ops.register_checksum = checksum
+    ops.register_workers = workers
+    if not dry_run:
+        ops.execute(irods_path.session, on_error=on_error, progress_bar=progress_bar)
+    return ops
+
+
+def sync(  # pylint: disable=too-many-branches,too-many-arguments
     source: Union[str, Path, IrodsPath],
     target: Union[str, Path, IrodsPath],
     max_level: Optional[int] = None,
@@ -261,14 +866,20 @@ def sync(
     options: Optional[dict] = None,
     metadata: Union[None, str, Path, dict] = None,
     progress_bar: bool = True,
+    placement: Optional[str] = None,
+    *,
+    dedup: Union[bool, str, IrodsPath] = False,
+    bundle_threshold: Optional[int] = None,
+    verify: str = "inline",
 ) -> Operations:
     """Synchronize data between local and remote copies.
 
-    The command can be in one of the two modes: synchronization of data from the client's local file
-    system to iRODS, or from iRODS to the local file system. The mode is determined by the type of
-    the values for `source` and `target`: objects with type :class:`ibridges.path.IrodsPath`  will
-    be interpreted as remote paths, while types :code:`str` and :code:`Path` with be interpreted
-    as local paths.
+    The command can be in one of the three modes: synchronization of data from the client's local
+    file system to iRODS, from iRODS to the local file system, or between two iRODS collections.
+    The mode is determined by the type of the values for `source` and `target`: objects with type
+    :class:`ibridges.path.IrodsPath`  will be interpreted as remote paths, while types :code:`str`
+    and :code:`Path` with be interpreted as local paths. Between two iRODS collections, the data
+    objects are copied on the server, see :func:`copy`.
 
     Files/data objects that have the same checksum will not be synchronized.
 
@@ -309,6 +920,22 @@ def sync(
         If not None, the location to get the metadata from or store it to.
     progress_bar:
         Whether to display a progress bar.
+    placement:
+        Spread the uploaded files over the root resources with a placement policy:
+        'round-robin', 'free-space' or 'least-in-flight', see :mod:`ibridges.placement`.
+        The files are then uploaded by parallel workers.
+        Cannot be used together with resc_name.
+    dedup:
+        Instead of uploading a file, copy a data object with the same checksum and size
+        on the server. If True, such data objects are looked up in the home collection,
+        otherwise in the given collection. Files that are equal are only uploaded once.
+    bundle_threshold:
+        Upload new files smaller than this size in bytes in tar bundles, which are extracted
+        on the server, see :mod:`ibridges.bundles`. This is much faster for many small files.
+    verify:
+        When to verify the checksums of the transferred files: 'inline' after each file,
+        'deferred' in parallel after all transfers, or 'none'.
+        See :meth:`ibridges.executor.Operations.execute`.
 
     Raises
     ------
@@ -333,6 +960,7 @@ def sync(
 
     """
     _param_checks(source, target)
+    _placement_checks(resc_name, placement)
 
     if isinstance(source, IrodsPath):
         session = source.session
@@ -351,7 +979,15 @@ def sync(
     else:
         raise TypeError("Either source or target must be an IrodsPath")
 
-    if isinstance(source, IrodsPath):
+    if isinstance(source, IrodsPath) and isinstance(target, IrodsPath):
+        if metadata is not None:
+            raise ValueError("Cannot use a metadata archive for synchronization between iRODS "
+                             "collections, use copy_metadata of the Operations object instead.")
+        ops = _copy_sync_operations(source, target, copy_empty_folders=copy_empty_folders,
+                                    depth=max_level, overwrite=True)
+        if not target.collection_exists():
+            ops.add_create_coll(target)
+    elif isinstance(source, IrodsPath):
         if isinstance(metadata, dict):
             raise ValueError("Cannot use dictionary type for metadata download.")
         ops = _down_sync_operations(
@@ -365,25 +1001,79 @@ def sync(
         ops = _up_sync_operations(
             Path(source), IrodsPath(session, target), copy_empty_folders=copy_empty_folders,
             depth=max_level, overwrite=True)
+        _dedup_operations(ops, session, dedup)
         if metadata is not None:
             add_meta_from_archive(metadata, IrodsPath(session, target), dry_run=True,
                                ops=ops)
 
     ops.resc_name = resc_name
     ops.options = options
+    ops.placement = placement
+    ops.bundle_threshold = bundle_threshold
     if not dry_run:
-        ops.execute(session, on_error=on_error, progress_bar=progress_bar)
+        ops.execute(session, on_error=on_error, progress_bar=progress_bar, verify=verify)
 
     return ops
 
 
+def _placement_checks(resc_name: str, placement: Optional[str]):
+    if placement is None:
+        return
+    if placement not in PLACEMENT_POLICIES:
+        raise ValueError(f"Unknown placement policy '{placement}', choose one of "
+                         f"{PLACEMENT_POLICIES}.")
+    if resc_name not in ["", None]:
+        raise ValueError("Cannot use a placement policy together with a resource name.")
+
+
+def _dedup_operations(ops: Operations, session, dedup: Union[bool, str, IrodsPath]):
+    """Replace uploads of files that already exist on the server by server-side copies.
+
+    The checksums of the files are computed locally and looked up in the scope collection
+    with one query per chunk of checksums. If a data object with the same checksum and size
+    is found, the file is not uploaded, but the data object is copied on the server.
+    Files with the same content within the upload itself are uploaded only once.
+    The checksum type is taken from a data object in the scope collection. If none of them
+    has a checksum, nothing can be found and the files are uploaded as usual.
+    """
+    if dedup is False or len(ops.upload) == 0:
+        return
+    scope = None if dedup is True else dedup
+    checksum_type = _checksum_type(session, scope)
+    if checksum_type is None:
+        warnings.warn("Cannot deduplicate the upload, no data objects with a checksum found "
+                      f"in {session.home if scope is None else scope}.")
+        return
+    session.checksum_type = checksum_type
+    sizes = [lpath.stat().st_size for lpath, _ in ops.upload]
+    with ThreadPoolExecutor(NUM_THREADS) as pool:
+        checksums = list(pool.map(lambda lpath: calc_checksum(lpath, checksum_type),
+                                  [lpath for lpath, _ in ops.upload]))
+    found = search_checksums(session, [chk for chk, size in zip(checksums, sizes) if size > 0],
+                             path=scope)
+    # Data objects that are overwritten by this upload cannot be the source of a copy.
+    upload_dests = {str(ipath) for _, ipath in ops.upload}
+    uploads = []
+    first_upload: dict[str, IrodsPath] = {}
+    for (lpath, ipath), checksum, size in zip(ops.upload, checksums, sizes):
+        sources = [isource for isource in found.get(checksum, [])
+                   if int(isource.size) == size and str(isource) not in upload_dests]
+        if size > 0 and len(sources) > 0:
+            ops.add_copy(sources[0], ipath)
+        elif size > 0 and checksum in first_upload:
+            # Copies are executed after the uploads, so the first upload can be copied.
+            ops.add_copy(CachedIrodsPath(session, size, True, checksum,
+                                         str(first_upload[checksum])), ipath)
+        else:
+            first_upload[checksum] = ipath
+            uploads.append((lpath, ipath))
+    ops.upload = uploads
+
+
 def _param_checks(source, target):
     if not isinstance(source, IrodsPath) and not isinstance(target, IrodsPath):
         raise TypeError("Either source or target should be an iRODS path.")
 
-    if isinstance(source, IrodsPath) and isinstance(target, IrodsPath):
-        raise TypeError("iRODS to iRODS copying is not supported.")
-
     if isinstance(source, (str, Path)) and isinstance(target, (str, Path)):
         raise TypeError("Local to local copying is not supported.")
 
@@ -415,25 +1105,107 @@ def _transfer_needed(source: Union[IrodsPath, Path],
             warnings.warn(f"Skipping file/data object {source} -> {dest} since "
                           f"both exist and overwrite == False.")
         return False
+    if ipath.size != lpath.stat().st_size:
+        return True
     if checksums_equal(ipath, lpath):
         return False
     return True
 
 
+def _compute_missing_checksums(pairs: list[tuple[Path, IrodsPath]], overwrite: bool):
+    """Compute the checksums that are needed to compare data objects with local files.
+
+    Only data objects with the same size as the local file are compared by checksum. Missing
+    checksums are computed on the server in parallel, instead of one by one during planning.
+    """
+    if not overwrite:
+        return
+    compared = [ipath for lpath, ipath in pairs if ipath.size == lpath.stat().st_size]
+    bulk.compute_checksums(compared, on_error="skip", progress_bar=False)
+
+
+def _compute_missing_copy_checksums(pairs: list[tuple[IrodsPath, IrodsPath]], overwrite: bool):
+    """Compute the checksums that are needed to compare the data objects of a copy.
+
+    As with :func:`_compute_missing_checksums`, only data objects of the same size are compared,
+    and the missing checksums of both sides are computed on the server in parallel.
+    """
+    if not overwrite:
+        return
+    compared = [ipath for isource, idest in pairs if isource.size == idest.size
+                for ipath in (isource, idest)]
+    bulk.compute_checksums(compared, on_error="skip", progress_bar=False)
+
+
+def _copy_needed(isource: IrodsPath, idest: IrodsPath, overwrite: bool, on_error: str) -> bool:
+    if not overwrite:
+        if on_error == "fail":
+            raise DataObjectExistsError(
+                f"Cannot overwrite {isource} -> {idest} unless overwrite==True. "
+                f"To ignore this error and skip the data objects use on_error=='warn'.")
+        if on_error == "warn":
+            warnings.warn(f"Skipping data object {isource} -> {idest} since "
+                          f"both exist and overwrite == False.")
+        return False
+    if isource.size != idest.size:
+        return True
+    # Missing checksums are computed on the server.
+    source_checksum, dest_checksum = isource.checksum, idest.checksum
+    return not source_checksum or source_checksum != dest_checksum
+
+
+def _copy_sync_operations(isource_path: IrodsPath, idest_path: IrodsPath,
+                          overwrite: bool,
+                          on_error: str = "fail",
+                          copy_empty_folders: bool = True, depth: Optional[int] = None
+                          ) -> Operations:
+    ops = Operations()
+    session = idest_path.session
+    # A single listing of both sides, which includes the sizes and checksums.
+    try:
+        dest_ipaths = {ipath.relative_to(idest_path).parts: ipath
+                       for ipath in idest_path.walk(depth=depth)}
+    except irods.exception.CollectionDoesNotExist:
+        dest_ipaths = {}
+    sources: dict[tuple, IrodsPath] = {}
+    for ipath in isource_path.walk(depth=depth):
+        # Data objects with replicas that differ are listed once for each of them.
+        sources.setdefault(ipath.relative_to(isource_path).parts, ipath)
+    _compute_missing_copy_checksums([(ipath, dest_ipaths[rel_parts])
+                                     for rel_parts, ipath in sources.items()
+                                     if ipath.dataobject_exists() and rel_parts in dest_ipaths],
+                                    overwrite)
+    for rel_parts, ipath in sources.items():
+        dest = idest_path.joinpath(*rel_parts)
+        if ipath.dataobject_exists():
+            if rel_parts in dest_ipaths:
+                if _copy_needed(ipath, dest_ipaths[rel_parts], overwrite, on_error):
+                    ops.add_copy(ipath, dest_ipaths[rel_parts])
+                else:
+                    ops.copy_unchanged += 1
+            else:
+                ops.add_copy(ipath, CachedIrodsPath(session, None, True, None, str(dest)))
+                if rel_parts[:-1] not in dest_ipaths:
+                    ops.add_create_coll(dest.parent)
+        else:
+            if rel_parts not in dest_ipaths and (copy_empty_folders or len(rel_parts) == 0):
+                ops.add_create_coll(dest)
+            ops.copy_collections.append((ipath, dest))
+    return ops
+
+
 def _down_sync_operations(isource_path: IrodsPath, ldest_path: Path,
                           overwrite: bool,
                           on_error: str = "fail",
                           copy_empty_folders: bool = True, depth: Optional[int] = None
                           ) -> Operations:
     ops = Operations()
+    existing = []
     for ipath in isource_path.walk(depth=depth):
         lpath = ldest_path.joinpath(*ipath.relative_to(isource_path).parts)
         if ipath.dataobject_exists():
             if lpath.is_file():
-                if _transfer_needed(ipath, lpath, overwrite, on_error):
-                    ops.add_download(ipath, lpath)
-                else:
-                    ops.download_unchanged += 1
+                existing.append((lpath, ipath))
             else:
                 ops.add_download(ipath, lpath)
             if not lpath.parent.exists():
@@ -441,6 +1213,12 @@ def _down_sync_operations(isource_path: IrodsPath, ldest_path: Path,
         elif ipath.collection_exists() and copy_empty_folders:
             if not lpath.exists():
                 ops.add_create_dir(lpath)
+    _compute_missing_checksums(existing, overwrite)
+    for lpath, ipath in existing:
+        if _transfer_needed(ipath, lpath, overwrite, on_error):
+            ops.add_download(ipath, lpath)
+        else:
+            ops.download_unchanged += 1
     return ops
 
 
@@ -449,6 +1227,7 @@ def _up_sync_operations(lsource_path: Path, idest_path: IrodsPath,  # pylint: di
                         copy_empty_folders: bool = True, depth: Optional[int] = None,
                         on_error: str = "fail") -> Operations:
     ops = Operations()
+    existing = []
     session = idest_path.session
     try:
         remote_ipaths = {str(ipath): ipath for ipath in idest_path.walk()}
@@ -468,11 +1247,7 @@ def _up_sync_operations(lsource_path: Path, idest_path: IrodsPath,  # pylint: di
                 warnings.warn(f"Ignoring symlink {lpath}.")
                 continue
             if str(ipath) in remote_ipaths:
-                ipath = remote_ipaths[str(ipath)]
-                if _transfer_needed(lpath, ipath, overwrite, on_error):
-                    ops.add_upload(lpath, ipath)
-                else:
-                    ops.upload_unchanged += 1
+                existing.append((lpath, remote_ipaths[str(ipath)]))
             else:
                 ipath = CachedIrodsPath(session, None, False, None, str(ipath))
                 ops.add_upload(lpath, ipath)
@@ -487,6 +1262,12 @@ def _up_sync_operations(lsource_path: Path, idest_path: IrodsPath,  # pylint: di
                     ops.add_create_coll(source / fold)
         if str(source) not in remote_ipaths:
             ops.add_create_coll(source)
+    _compute_missing_checksums(existing, overwrite)
+    for lpath, ipath in existing:
+        if _transfer_needed(lpath, ipath, overwrite, on_error):
+            ops.add_upload(lpath, ipath)
+        else:
+            ops.upload_unchanged += 1
     return ops
 
 
@@ -1,12 +1,18 @@
 """Operations to be performed for upload/download/sync."""
+
+# pylint: disable=too-many-lines
+
 from __future__ import annotations
 
 import json
+import os
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 from inspect import signature
 from pathlib import Path
 from typing import Optional, Union
 
+import irods.access
 import irods.collection
 import irods.data_object
 import irods.exception
@@ -15,12 +21,30 @@ from irods.exception import CollectionDoesNotExist
 from tqdm import tqdm
 from tqdm.std import tqdm as tqdm_type
 
+from ibridges import icat_columns as icat
+from ibridges.bundles import plan_bundles
 from ibridges.exception import FileTransferFailedError, ObjectTransferFailedError
-from ibridges.path import IrodsPath
+from ibridges.path import IrodsPath, _data_object_rows
+from ibridges.placement import ResourcePlacement
+from ibridges.replicas import ReplicaSelector
 from ibridges.session import Session
+from ibridges.slow_log import log_slow_operation
+from ibridges.telemetry import TransferRecord, TransferReport
+from ibridges.util import (
+    CHECKSUM_CACHE,
+    PUT_OPR,
+    HashingTee,
+    _detect_checksum,
+    calc_checksum,
+)
 
 NUM_THREADS = 4
 NUM_TRANSFER_RESET = 3000
+# Files up to this size are transferred in one stream, while their checksum is computed.
+# Larger files are transferred in parallel by the python-irodsclient.
+SINGLE_PASS_MAX_SIZE = 32 * 1024**2
+SINGLE_PASS_CHUNK_SIZE = 4 * 1024**2
+VERIFY_POLICIES = ["inline", "deferred", "none"]
 
 
 class Operations():  # pylint: disable=too-many-instance-attributes
@@ -41,7 +65,9 @@ class Operations():  # pylint: disable=too-many-instance-attributes
 
     """
 
-    def __init__(self, resc_name: Optional[str] = None, options: Optional[dict] = None):
+    def __init__(self, resc_name: Optional[str] = None, options: Optional[dict] = None,
+                 placement: Optional[str] = None, select_replica: bool = False,
+                 preferred_resources: Optional[list[str]] = None):
         """Initialize and empty Operations object.
 
         The operations should be added separately, which is usually done by higher
@@ -53,18 +79,46 @@ class Operations():  # pylint: disable=too-many-instance-attributes
             Name of the resource to perform the operations on.
         options:
             Options to transfer data with.
+        placement:
+            Policy to spread the uploads over the root resources with if no resource name
+            is given, see :mod:`ibridges.placement`. The uploads are then run by
+            :attr:`upload_workers` parallel workers. By default the server decides.
+        select_replica:
+            Whether to select the replica for each download if no resource name is given,
+            see :mod:`ibridges.replicas`. By default the server decides.
+        preferred_resources:
+            Resources to download from if they have a good replica, in order of preference.
+            Only used if select_replica is True.
 
         """
         self.create_dir: set[str] = set()
         self.create_collection: set[str] = set()
         self.upload: list[tuple[Path, IrodsPath]] = []
         self.download: list[tuple[IrodsPath, Path]] = []
+        self.copy: list[tuple[IrodsPath, IrodsPath]] = []
+        self.copy_collections: list[tuple[IrodsPath, IrodsPath]] = []
+        self.copy_metadata = False
+        self.copy_acls = False
+        self.copy_workers = NUM_THREADS
+        self.register: list[tuple[Path, str, IrodsPath]] = []
+        self.register_checksum = False
+        self.register_workers = NUM_THREADS
+        self.unverified: list[tuple[str, Path, IrodsPath]] = []
+        self.verify_workers = NUM_THREADS
+        self.upload_workers = NUM_THREADS
+        self.bundle_threshold: Optional[int] = None
         self.meta_download: list[tuple[Union[str, Path], IrodsPath, list[IrodsPath]]] = []
         self.meta_upload: list[tuple[IrodsPath, Union[str, Path, dict], dict]] = []
         self.resc_name: str = "" if resc_name is None else resc_name
         self.options: Optional[dict] = {} if resc_name is None else options
+        self.placement = placement
+        self.select_replica = select_replica
+        self.preferred_resources = preferred_resources
+        self.upload_resources: dict[str, int] = {}
         self.download_unchanged = 0
         self.upload_unchanged = 0
+        self.copy_unchanged = 0
+        self.report = TransferReport()
 
     def add_meta_download(self, meta_fp: Union[str, Path], root_ipath: IrodsPath,
                           meta_paths: list[IrodsPath]):
@@ -142,6 +196,34 @@ class Operations():  # pylint: disable=too-many-instance-attributes
         """
         self.upload.append((lpath, ipath))
 
+    def add_copy(self, isource: IrodsPath, idest: IrodsPath):
+        """Add operation to copy a data object on the iRODS server.
+
+        Parameters
+        ----------
+        isource
+            IrodsPath of the data object to be copied.
+        idest
+            Destination IrodsPath for the data object to be created or overwritten.
+
+        """
+        self.copy.append((isource, idest))
+
+    def add_register(self, lpath: Path, ipath: IrodsPath, server_path: Optional[str] = None):
+        """Add operation to register a file that the iRODS server can access as a data object.
+
+        Parameters
+        ----------
+        lpath
+            Local path of the file to be registered.
+        ipath
+            Destination IrodsPath for the data object to be created.
+        server_path
+            Path of the file on the iRODS server, by default the same as the local path.
+
+        """
+        self.register.append((lpath, str(lpath) if server_path is None else server_path, ipath))
+
     def add_create_coll(self, new_col: IrodsPath):
         """Add operation to create a new collection.
 
@@ -153,11 +235,15 @@ class Operations():  # pylint: disable=too-many-instance-attributes
         """
         self.create_collection.add(str(new_col))
 
-    def execute(self, session: Session, on_error: str = "fail",
-                progress_bar: bool = True, print_summary: bool = True):
+    def execute(self, session: Session, on_error: str = "fail",  # pylint: disable=too-many-locals
+                progress_bar: bool = True, print_summary: bool = True,
+                report: Union[None, str, Path] = None,
+                prometheus: Union[None, str, Path] = None, verify: str = "inline"):
         """Execute all added operations.
 
-        This also creates a progress bar to see the status updates.
+        This also creates a progress bar to see the status updates. For each transfer
+        a record is added to the :attr:`report` attribute,
+        see :class:`ibridges.telemetry.TransferReport`.
 
         Parameters
         ----------
@@ -172,13 +258,34 @@ class Operations():  # pylint: disable=too-many-instance-attributes
         print_summary:
             Whether to print a summary about how many files have been uploaded, downloaded,
             directories created, and more.
+        report:
+            File to write the per-transfer records to. Records are written in CSV format
+            if the suffix is '.csv', otherwise in JSON Lines format.
+        prometheus:
+            Prometheus textfile to write the aggregate transfer statistics to.
+        verify:
+            When to verify the checksums of uploads and downloads. With 'inline', each transfer
+            is verified before the next one starts. With 'deferred', the transfers do not wait
+            for the checksums and are verified in parallel at the end, see :meth:`execute_verify`.
+            With 'none', no checksums are computed or verified.
+
+        Raises
+        ------
+        ValueError:
+            If the verification policy is unknown.
 
         """
+        if verify not in VERIFY_POLICIES:
+            raise ValueError(f"Unknown verification policy '{verify}', choose one of "
+                             f"{VERIFY_POLICIES}.")
         up_sizes = [lpath.stat().st_size for lpath, _ in self.upload]
         down_sizes = [ipath.size for ipath, _ in self.download]
-        disable = len(up_sizes) + len(down_sizes) == 0 or not progress_bar
+        copy_sizes = [ipath.size for ipath, _ in self.copy]
+        reg_sizes = [lpath.stat().st_size for lpath, _, _ in self.register]
+        disable = len(up_sizes) + len(down_sizes) + len(copy_sizes) + len(reg_sizes) == 0 or (
+            not progress_bar)
         pbar = tqdm(
-            total=sum(up_sizes) + sum(down_sizes),
+            total=sum(up_sizes) + sum(down_sizes) + sum(copy_sizes) + sum(reg_sizes),
             unit="B",
             unit_scale=True,
             unit_divisor=1024,
@@ -186,89 +293,179 @@ class Operations():  # pylint: disable=too-many-instance-attributes
         )
         n_dir = self.execute_create_dir()
         n_coll = self.execute_create_coll(session)
-        n_download = self.execute_download(session, pbar, on_error=on_error)
-        n_upload = self.execute_upload(session, pbar, on_error=on_error)
+        n_download = self.execute_download(session, pbar, on_error=on_error,
+                                           sizes=down_sizes, verify=verify)
+        n_upload = self.execute_upload(session, pbar, on_error=on_error, sizes=up_sizes,
+                                       verify=verify)
+        n_copy = self.execute_copy(session, pbar, on_error=on_error, sizes=copy_sizes)
+        n_register = self.execute_register(session, pbar, on_error=on_error, sizes=reg_sizes)
+        n_verified, n_retried = self.execute_verify(session, on_error=on_error)
         n_meta_down = self.execute_meta_download()
         n_meta_up = self.execute_meta_upload()
 
         download_error = len(self.download) - n_download
         upload_error = len(self.upload) - n_upload
+        copy_error = len(self.copy) - n_copy
+        register_error = len(self.register) - n_register
 
         msg_dict = {
             "Downloaded": n_download,
             "Download errors": download_error,
             "Uploaded": n_upload,
             "Upload errors": upload_error,
-            "Skipped unchanged": self.download_unchanged + self.upload_unchanged,
+            "Copied": n_copy,
+            "Copy errors": copy_error,
+            "Registered": n_register,
+            "Register errors": register_error,
+            "Verified": n_verified,
+            "Transferred again after verification": n_retried,
+            "Skipped unchanged": (self.download_unchanged + self.upload_unchanged
+                                  + self.copy_unchanged),
             "Directories created": n_dir,
             "Collections created": n_coll,
             "Metadata download": n_meta_down,
             "Metadata upload": n_meta_up,
         }
         messages = [f"{msg}: {count}" for msg, count in msg_dict.items() if count > 0]
+        if len(self.upload_resources) > 0:
+            messages.append("Upload resources: " + ", ".join(
+                f"{resc_name} ({count})" for resc_name, count in self.upload_resources.items()))
         pbar.close()
+        if report is not None:
+            self.report.write(report)
+        if prometheus is not None:
+            self.report.write_prometheus(prometheus)
         if print_summary:
             print(", ".join(messages))
+            if report is not None or prometheus is not None:
+                print(_report_message(self.report))
 
-    def execute_download(self, session: Session,
-                         pbar: Optional[tqdm_type], on_error: str = "fail"):
+    def execute_download(self, session: Session,  # pylint: disable=too-many-arguments
+                         pbar: Optional[tqdm_type], on_error: str = "fail",
+                         sizes: Optional[list[int]] = None, verify: str = "inline"):
         """Execute all download operations.
 
         Parameters
         ----------
         session
             Session to perform the downloads with.
-        down_sizes
-            Sizes of the data objects to be downloaded.
         pbar
             The progress bar to be updated.
         on_error, optional
             Decides what happens when an error occurs.
             There are three options: 'fail', 'warn' and 'skip'.
+        sizes, optional
+            Sizes of the data objects to be downloaded, used for the transfer report.
+        verify, optional
+            Verification policy, see :meth:`execute`. Deferred downloads are added
+            to :attr:`unverified`.
 
         """
+        if sizes is None:
+            sizes = [ipath.size for ipath, _ in self.download]
+        selector = None
+        if self.select_replica and not self.resc_name and len(self.download) > 0:
+            selector = ReplicaSelector(session, self.preferred_resources)
+            selector.fetch(ipath for ipath, _ in self.download)
         n_transfer = 0
-        for ipath, lpath in self.download:
+        for (ipath, lpath), size in zip(self.download, sizes):
             if n_transfer % NUM_TRANSFER_RESET == NUM_TRANSFER_RESET-1:
                 session.close()
                 session.irods_session = session.connect()
 
-            n_transfer += _obj_get(
-                session,
-                ipath,
-                lpath,
-                overwrite=True,
-                on_error=on_error,
-                options=self.options,
-                resc_name=self.resc_name,
-                pbar=pbar,
-            )
+            record = self.report.start("download", ipath, lpath, size)
+            if selector is None:
+                record.resource = self.resc_name or None
+                success = _obj_get(
+                    session,
+                    ipath,
+                    lpath,
+                    overwrite=True,
+                    on_error=on_error,
+                    options=self.options,
+                    resc_name=self.resc_name,
+                    pbar=pbar,
+                    record=record,
+                    verify=verify,
+                )
+            else:
+                success = self._get_with_failover(session, selector, ipath, lpath,
+                                                  on_error, pbar, record, verify)
+            n_transfer += success
+            if success and verify == "deferred":
+                self.unverified.append(("download", lpath, ipath))
         return n_transfer
 
-    def execute_upload(self, session: Session,
-                       pbar: Optional[tqdm_type], on_error: str = "fail"):
+    def _get_with_failover(self, session, selector, ipath, lpath,  # pylint: disable=too-many-arguments
+                           on_error, pbar, record, verify="inline"):
+        """Download from the best replica, and try the next replica if that fails."""
+        resc_names = selector.rank(ipath) or [""]
+        for i_resc, resc_name in enumerate(resc_names):
+            last_try = i_resc == len(resc_names) - 1
+            record.resource = resc_name or None
+            try:
+                success = _obj_get(
+                    session,
+                    ipath,
+                    lpath,
+                    overwrite=True,
+                    on_error=on_error if last_try else "fail",
+                    options=self.options,
+                    resc_name=resc_name,
+                    pbar=pbar,
+                    record=record,
+                    verify=verify,
+                )
+            except ObjectTransferFailedError:
+                # Only errors on the server side can be solved by using another replica.
+                if last_try:
+                    raise
+                record.retries += 1
+                record.end = None
+                record.error = None
+                continue
+            if success and resc_name:
+                selector.measure(resc_name, record.throughput)
+            return success
+        return 0
+
+    def execute_upload(self, session: Session,  # pylint: disable=too-many-arguments
+                       pbar: Optional[tqdm_type], on_error: str = "fail",
+                       sizes: Optional[list[int]] = None, verify: str = "inline"):
         """Execute all upload operations.
 
         Parameters
         ----------
         session
             Session to perform the downloads with.
-        up_sizes
-            Sizes of the files to be uploaded.
         pbar
             Progress bar to be updated while uploading.
         on_error, optional
             Decides what happens when an error occurs.
             There are three options: 'fail', 'warn' and 'skip'.
+        sizes, optional
+            Sizes of the files to be uploaded, used for the transfer report.
+        verify, optional
+            Verification policy, see :meth:`execute`. Deferred uploads are added
+            to :attr:`unverified`, including the files of bundles.
 
         """
+        if sizes is None:
+            sizes = [lpath.stat().st_size for lpath, _ in self.upload]
         n_transfer = 0
-        for lpath, ipath in self.upload:
+        uploads = list(zip(self.upload, sizes))
+        if self.bundle_threshold:
+            n_transfer, uploads = self._upload_bundles(session, pbar, on_error, sizes, verify)
+        if self.placement is not None and not self.resc_name and len(uploads) > 0:
+            return n_transfer + self._upload_placed(session, pbar, on_error, uploads, verify)
+        for (lpath, ipath), size in uploads:
             if n_transfer % NUM_TRANSFER_RESET == NUM_TRANSFER_RESET-1:
                 session.close()
                 session.irods_session = session.connect()
 
-            n_transfer += _obj_put(
+            record = self.report.start("upload", lpath, ipath, size)
+            record.resource = self.resc_name or None
+            success = _obj_put(
                 session,
                 lpath,
                 ipath,
@@ -277,26 +474,268 @@ class Operations():  # pylint: disable=too-many-instance-attributes
                 options=self.options,
                 resc_name=self.resc_name,
                 pbar=pbar,
+                record=record,
+                verify=verify,
             )
+            n_transfer += success
+            if success and verify == "deferred":
+                self.unverified.append(("upload", lpath, ipath))
+        return n_transfer
+
+    def _upload_bundles(self, session: Session, pbar: Optional[tqdm_type], on_error: str,
+                        sizes: list[int], verify: str):
+        """Upload the small files in bundles, see :mod:`ibridges.bundles`.
+
+        Returns the number of uploaded files and the uploads that still need to be done,
+        including the files of bundles that could not be extracted or verified.
+        """
+        bundles, remaining = plan_bundles(self.upload, sizes, self.bundle_threshold or 0)
+        uploads = [(self.upload[i_upload], sizes[i_upload]) for i_upload in remaining]
+        n_transfer = 0
+        for bundle in bundles:
+            record = self.report.start("upload", f"bundle of {len(bundle.members)} files",
+                                       bundle.root, bundle.size)
+            record.resource = self.resc_name or None
+            if bundle.upload(session, self.resc_name):
+                record.finish()
+                failed = []
+                if verify == "inline":
+                    failed = self._verify_bundle(session, bundle, on_error)
+                elif verify == "deferred":
+                    self.unverified.extend(("upload", lpath, ipath)
+                                           for lpath, ipath, _ in bundle.members)
+                n_transfer += len(bundle.members) - len(failed)
+                uploads.extend(failed)
+                if pbar is not None:
+                    pbar.update(bundle.size - sum(size for _, size in failed))
+            else:
+                record.finish(error="Extraction of the bundle failed, uploading the files "
+                                    "separately.")
+                uploads.extend(((lpath, ipath), size) for lpath, ipath, size in bundle.members)
+        return n_transfer, uploads
+
+    def _verify_bundle(self, session: Session, bundle, on_error: str):
+        """Register the checksums of the extracted files and compare them with the local files.
+
+        Returns the uploads of the files that differ, which are uploaded again separately.
+        """
+        remote_checksums = _remote_checksums(session, [ipath for _, ipath, _ in bundle.members])
+
+        def _compare(lpath: Path, ipath: IrodsPath) -> Optional[bool]:
+            try:
+                remote_checksum = (remote_checksums.get(str(ipath))
+                                   or session.irods_session.data_objects.chksum(str(ipath)))
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                _raise_transfer_errors(on_error, f"Cannot compute the checksum of {ipath}, "
+                                       f"{repr(error)}", FileTransferFailedError, error)
+                return None
+            return remote_checksum == calc_checksum(
+                lpath, checksum_type=_detect_checksum(remote_checksum))
+
+        with ThreadPoolExecutor(max(self.verify_workers, 1)) as pool:
+            equal = list(pool.map(_compare, [lpath for lpath, _, _ in bundle.members],
+                                  [ipath for _, ipath, _ in bundle.members]))
+        failed = []
+        for (lpath, ipath, size), is_equal in zip(bundle.members, equal):
+            if is_equal:
+                continue
+            if is_equal is False:
+                _raise_transfer_errors(on_error, f"Checksum of {lpath} differs from the checksum "
+                                       f"of {ipath} after extracting the bundle, uploading again.",
+                                       FileTransferFailedError)
+            failed.append(((lpath, ipath), size))
+        return failed
+
+    def _upload_placed(self, session: Session,  # pylint: disable=too-many-arguments
+                       pbar: Optional[tqdm_type], on_error: str,
+                       uploads: list[tuple[tuple[Path, IrodsPath], int]], verify: str) -> int:
+        """Upload the files with parallel workers to the resources chosen by the placement."""
+        placement = ResourcePlacement.from_session(session, str(self.placement))
+
+        def _put(lpath, ipath, size):
+            resc_name = placement.assign(size)
+            record = self.report.start("upload", lpath, ipath, size)
+            record.resource = resc_name
+            try:
+                return resc_name, _obj_put(session, lpath, ipath, overwrite=True,
+                                           on_error=on_error, options=self.options,
+                                           resc_name=resc_name, pbar=pbar, record=record,
+                                           verify=verify)
+            finally:
+                placement.release(resc_name, size)
+
+        n_transfer = 0
+        with ThreadPoolExecutor(max(self.upload_workers, 1)) as pool:
+            results = pool.map(_put, [lpath for (lpath, _), _ in uploads],
+                               [ipath for (_, ipath), _ in uploads],
+                               [size for _, size in uploads])
+            for ((lpath, ipath), _), (resc_name, success) in zip(uploads, results):
+                n_transfer += success
+                if success and verify == "deferred":
+                    self.unverified.append(("upload", lpath, ipath))
+                if success:
+                    self.upload_resources[resc_name] = self.upload_resources.get(resc_name, 0) + 1
         return n_transfer
 
+    def execute_verify(self, session: Session, on_error: str = "fail") -> tuple[int, int]:
+        """Verify the checksums of the transfers in :attr:`unverified`.
+
+        The checksums on the server are retrieved with one query per chunk of data objects.
+        Missing checksums are computed by the server, and the local checksums are computed
+        or taken from the checksum cache, both with parallel workers. Transfers with different
+        checksums are done once more with inline verification, unless on_error is 'fail'.
+
+        Parameters
+        ----------
+        session
+            Session to verify the transfers with.
+        on_error, optional
+            Decides what happens when the checksums differ, when they cannot be computed, or
+            when a transfer fails again. There are three options: 'fail' raises an exception,
+            'warn' gives a warning and continues, and 'skip' simply continues.
+
+        Returns
+        -------
+            The number of verified transfers and the number of transfers that were done again.
+
+        """
+        unverified, self.unverified = self.unverified, []
+        if len(unverified) == 0:
+            return 0, 0
+        remote_checksums = _remote_checksums(session, [ipath for _, _, ipath in unverified])
+
+        def _compare(direction: str, lpath: Path, ipath: IrodsPath) -> Optional[bool]:
+            try:
+                remote_checksum = (remote_checksums.get(str(ipath))
+                                   or session.irods_session.data_objects.chksum(str(ipath)))
+                return remote_checksum == calc_checksum(
+                    lpath, checksum_type=_detect_checksum(remote_checksum))
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                _raise_transfer_errors(
+                    on_error, f"Cannot verify the checksums of {lpath} and {ipath}, "
+                    f"{repr(error)}", _failed_error(direction), error)
+            return None
+
+        with ThreadPoolExecutor(max(self.verify_workers, 1)) as pool:
+            equal = list(pool.map(_compare, *zip(*unverified)))
+        n_retried = 0
+        for (direction, lpath, ipath), is_equal in zip(unverified, equal):
+            if is_equal is not False:
+                continue
+            _raise_transfer_errors(on_error, f"Checksums of {lpath} and {ipath} differ after "
+                                   "the transfer, transferring again.", _failed_error(direction))
+            n_retried += 1
+            if direction == "upload":
+                record = self.report.start(direction, lpath, ipath, lpath.stat().st_size)
+                _obj_put(session, lpath, ipath, overwrite=True, on_error=on_error,
+                         options=self.options, resc_name=self.resc_name, record=record)
+            else:
+                record = self.report.start(direction, ipath, lpath, ipath.size)
+                _obj_get(session, ipath, lpath, overwrite=True, on_error=on_error,
+                         options=self.options, resc_name=self.resc_name, record=record)
+        return sum(is_equal is True for is_equal in equal), n_retried
+
+    def execute_copy(self, session: Session,
+                     pbar: Optional[tqdm_type], on_error: str = "fail",
+                     sizes: Optional[list[int]] = None):
+        """Execute all server-side copy operations with parallel workers.
+
+        The data is copied by the iRODS server, so that it does not pass through the client.
+        If :attr:`copy_metadata` or :attr:`copy_acls` are set, the metadata and permissions of
+        the copied data objects and collections are copied as well.
+
+        Parameters
+        ----------
+        session
+            Session to perform the copies with.
+        pbar
+            Progress bar to be updated while copying.
+        on_error, optional
+            Decides what happens when an error occurs.
+            There are three options: 'fail', 'warn' and 'skip'.
+        sizes, optional
+            Sizes of the data objects to be copied, used for the transfer report.
+
+        """
+        if sizes is None:
+            sizes = [ipath.size for ipath, _ in self.copy]
+
+        def _copy(isource, idest, size):
+            record = self.report.start("copy", isource, idest, size)
+            record.resource = self.resc_name or None
+            success = _obj_copy(session, isource, idest, overwrite=True, on_error=on_error,
+                                resc_name=self.resc_name, record=record)
+            if pbar is not None:
+                pbar.update(size)
+            if success:
+                self._copy_attributes(session, isource, idest)
+            return success
+
+        n_transfer = 0
+        if len(self.copy) > 0:
+            with ThreadPoolExecutor(max(self.copy_workers, 1)) as pool:
+                n_transfer = sum(pool.map(_copy, [isource for isource, _ in self.copy],
+                                          [idest for _, idest in self.copy], sizes))
+        for isource, idest in self.copy_collections:
+            self._copy_attributes(session, isource, idest)
+        return n_transfer
+
+    def execute_register(self, session: Session,
+                         pbar: Optional[tqdm_type], on_error: str = "fail",
+                         sizes: Optional[list[int]] = None):
+        """Execute all register operations with parallel workers.
+
+        The files are not transferred, the iRODS server adds them to the catalog in place.
+        If :attr:`register_checksum` is set, the server computes and registers the checksums.
+
+        Parameters
+        ----------
+        session
+            Session to register the files with.
+        pbar
+            Progress bar to be updated while registering.
+        on_error, optional
+            Decides what happens when an error occurs.
+            There are three options: 'fail', 'warn' and 'skip'.
+        sizes, optional
+            Sizes of the files to be registered, used for the transfer report.
+
+        """
+        if sizes is None:
+            sizes = [lpath.stat().st_size for lpath, _, _ in self.register]
+
+        def _register(server_path, ipath, size):
+            record = self.report.start("register", server_path, ipath, size)
+            record.resource = self.resc_name or None
+            success = _obj_register(session, server_path, ipath, overwrite=True,
+                                    resc_name=self.resc_name, checksum=self.register_checksum,
+                                    on_error=on_error, record=record)
+            if pbar is not None:
+                pbar.update(size)
+            return success
+
+        if len(self.register) == 0:
+            return 0
+        with ThreadPoolExecutor(max(self.register_workers, 1)) as pool:
+            return sum(pool.map(_register, [server_path for _, server_path, _ in self.register],
+                                [ipath for _, _, ipath in self.register], sizes))
+
+    def _copy_attributes(self, session: Session, isource: IrodsPath, idest: IrodsPath):
+        if self.copy_metadata:
+            idest.meta.from_dict(isource.meta.to_dict())
+        if self.copy_acls:
+            item = isource.dataobject if isource.dataobject_exists() else isource.collection
+            for acl in session.irods_session.acls.get(item):
+                # The owner of the copy already has all permissions.
+                if acl.user_name == session.username and acl.user_zone == session.zone:
+                    continue
+                session.irods_session.acls.set(irods.access.iRODSAccess(
+                    acl.access_name, str(idest), acl.user_name, acl.user_zone))
+
     def execute_meta_download(self):
         """Execute all metadata download operations."""
         for meta_fp, base_path, meta_paths in self.meta_download:
-            meta_dict = _empty_metadict(base_path)
-            for cur_ipath in meta_paths:
-                if cur_ipath.collection_exists():
-                    item_type = "collection"
-                elif cur_ipath.dataobject_exists():
-                    item_type = "data object"
-                else:
-                    item_type = "unknown"
-                new_metadata = {
-                    "rel_path": str(cur_ipath.relative_to(base_path)),
-                    "type": item_type,
-                }
-                new_metadata.update(cur_ipath.meta.to_dict())
-                meta_dict["items"].append(new_metadata)
+            meta_dict = _meta_archive_dict(base_path, meta_paths)
             with open(meta_fp, "w", encoding="utf-8") as handle:
                 json.dump(meta_dict, handle, indent=4)
 
@@ -345,7 +784,7 @@ class Operations():  # pylint: disable=too-many-instance-attributes
             IrodsPath(session, col).create_collection()
         return len(self.create_collection)
 
-    def print_summary(self):
+    def print_summary(self):  # pylint: disable=too-many-branches
         """Print a summary of all the operations added to the object."""
         summary_strings = []
         if len(self.create_collection) > 0:
@@ -362,6 +801,10 @@ class Operations():  # pylint: disable=too-many-instance-attributes
 
         if len(self.upload) > 0:
             summary = "Upload files:\n\n"
+            if self.bundle_threshold:
+                summary = f"Upload files, bundling files below {self.bundle_threshold} bytes:\n\n"
+            if self.placement is not None and not self.resc_name:
+                summary = f"Upload files with '{self.placement}' placement:\n\n"
             for lpath, ipath in self.upload:
                 summary += f"{lpath} -> {ipath}\n"
             summary_strings.append(summary)
@@ -372,6 +815,18 @@ class Operations():  # pylint: disable=too-many-instance-attributes
                 summary += f"{ipath} -> {lpath}\n"
             summary_strings.append(summary)
 
+        if len(self.copy) > 0:
+            summary = "Copy data objects on the server:\n\n"
+            for isource, idest in self.copy:
+                summary += f"{isource} -> {idest}\n"
+            summary_strings.append(summary)
+
+        if len(self.register) > 0:
+            summary = "Register files on the server:\n\n"
+            for _, server_path, ipath in self.register:
+                summary += f"{server_path} -> {ipath}\n"
+            summary_strings.append(summary)
+
         if len(self.meta_download) > 0:
             summary = "Metadata to download:\n\n"
             for meta_fp, base_path, meta_items in self.meta_download:
@@ -398,10 +853,36 @@ def _warn_ignored_keywords(options: Optional[dict]):
         warnings.warn(f"Some options will be ignored: {cur_ignored_set}", UserWarning)
 
 
+def _report_message(report: TransferReport) -> str:
+    messages = []
+    for direction, stats in report.summary().items():
+        if stats["throughput_p50"] is None:
+            continue
+        message = (f"{direction.capitalize()} throughput p50/p95: "
+                   f"{_format_rate(stats['throughput_p50'])}/"
+                   f"{_format_rate(stats['throughput_p95'])}")
+        if stats["ttfb_p50"] is not None:
+            message += (f", time to first byte p50/p95: "
+                        f"{stats['ttfb_p50']:.3f}s/{stats['ttfb_p95']:.3f}s")
+        messages.append(message)
+    return "\n".join(messages)
+
+
+def _format_rate(rate: float) -> str:
+    for unit in ["B/s", "KiB/s", "MiB/s"]:
+        if rate < 1024:
+            return f"{rate:.1f} {unit}"
+        rate /= 1024
+    return f"{rate:.1f} GiB/s"
+
+
 def _raise_transfer_errors(on_error: str,
                            msg: str,
                            throw_error,
-                           error: Optional[Exception] = None):
+                           error: Optional[Exception] = None,
+                           record: Optional[TransferRecord] = None):
+    if record is not None:
+        record.finish(error=msg)
     if on_error == "fail":
         if error:
             raise throw_error(msg) from error
@@ -410,7 +891,8 @@ def _raise_transfer_errors(on_error: str,
         warnings.warn(msg)
 
 
-def _obj_put(  # pylint: disable=too-many-branches
+@log_slow_operation
+def _obj_put(  # pylint: disable=too-many-branches,too-many-statements
     session: Session,
     local_path: Union[str, Path],
     irods_path: Union[str, IrodsPath],
@@ -419,6 +901,8 @@ def _obj_put(  # pylint: disable=too-many-branches
     options: Optional[dict] = None,
     on_error: str = "fail",
     pbar: Optional[tqdm_type] = None,
+    record: Optional[TransferRecord] = None,
+    verify: str = "inline",
 ) -> int:
     """Upload `local_path` to `irods_path` following iRODS `options`.
 
@@ -441,6 +925,11 @@ def _obj_put(  # pylint: disable=too-many-branches
         'skip': simply continue.
     pbar:
         Optional progress bar.
+    record:
+        Optional telemetry record for the transfer.
+    verify:
+        'inline': register the checksum and verify it; 'deferred': only compute the local
+        checksum, which is verified later; 'none': do not compute any checksums.
 
     """
     transfers = 0
@@ -453,40 +942,49 @@ def _obj_put(  # pylint: disable=too-many-branches
 
     if not local_path.is_file():
         err_msg = f"local_path '{local_path}' must be a file."
-        _raise_transfer_errors(on_error, err_msg, ValueError)
+        _raise_transfer_errors(on_error, err_msg, ValueError, record=record)
         return 0
 
     # Check if irods object already exists
-    obj_exists = (
-        IrodsPath(session, irods_path / local_path.name).dataobject_exists()
-        or irods_path.dataobject_exists()
-    )
+    if irods_path.collection_exists():
+        irods_path = irods_path / local_path.name
+    obj_exists = irods_path.dataobject_exists()
 
     _warn_ignored_keywords(options)
 
-    if options is None:
-        options = {}
-    options.update({kw.NUM_THREADS_KW: NUM_THREADS, kw.REG_CHKSUM_KW: "", kw.VERIFY_CHKSUM_KW: ""})
+    options = {} if options is None else dict(options)
+    options[kw.NUM_THREADS_KW] = NUM_THREADS
+    if verify == "inline":
+        options.update({kw.REG_CHKSUM_KW: "", kw.VERIFY_CHKSUM_KW: ""})
 
-    if pbar is not None:
-        upd_put = "updatables" in signature(session.irods_session.data_objects.put).parameters
-        if upd_put:
-            options["updatables"] = [pbar.update]
+    upd_put = "updatables" in signature(session.irods_session.data_objects.put).parameters
+    updatables = [upd.update for upd in (pbar, record) if upd is not None]
+    if upd_put and len(updatables) > 0:
+        options["updatables"] = updatables
 
     if overwrite:
         options[kw.FORCE_FLAG_KW] = ""
     if resc_name not in ["", None]:
         options[kw.RESC_NAME_KW] = resc_name
+    mismatch = None
+    single_pass = False
     if overwrite or not obj_exists:
         try:
-            session.irods_session.data_objects.put(local_path, str(irods_path), **options)
+            single_pass = verify != "none" and local_path.stat().st_size <= SINGLE_PASS_MAX_SIZE
+            if single_pass:
+                checksum = _put_single_pass(session, local_path, irods_path, options, updatables)
+            else:
+                session.irods_session.data_objects.put(local_path, str(irods_path), **options)
+                checksum = None
+            if verify == "inline":
+                mismatch = _verify_checksum(session, irods_path, local_path, checksum)
             transfers += 1
         except (PermissionError, OSError) as error:
             err_msg = f"Cannot read {error.filename}."
-            _raise_transfer_errors(on_error, err_msg, error, error)
+            _raise_transfer_errors(on_error, err_msg, error, error, record=record)
         except irods.exception.CAT_NO_ACCESS_PERMISSION as error:
             err_msg = f"Cannot write iRODS path {str(irods_path)}."
-            _raise_transfer_errors(on_error, err_msg, PermissionError, error)
+            _raise_transfer_errors(on_error, err_msg, PermissionError, error, record=record)
         except irods.exception.OVERWRITE_WITHOUT_FORCE_FLAG as error:
             # This should generally not occur, but a race condition might trigger this.
             # obj does not exist -> someone else writes to object -> overwrite error
@@ -494,19 +992,223 @@ def _obj_put(  # pylint: disable=too-many-branches
                        "Use overwrite=True to overwrite the existing file."
                        "This error might be the result of simultaneous writing "
                        "to the same data object.")
-            _raise_transfer_errors(on_error, err_msg, FileExistsError, error)
+            _raise_transfer_errors(on_error, err_msg, FileExistsError, error, record=record)
         except Exception as error: # pylint: disable=W0718
             err_msg = f"Cannot transfer {local_path} to {irods_path}, {repr(error)}"
-            _raise_transfer_errors(on_error, err_msg, FileTransferFailedError, error)
+            _raise_transfer_errors(on_error, err_msg, FileTransferFailedError, error,
+                                   record=record)
     else:
         err_msg = (f"Dataset {irods_path} already exists. "
                     "Use overwrite=True to overwrite the existing file.")
-        _raise_transfer_errors(on_error, err_msg, FileExistsError)
-    if pbar is not None and not upd_put:
+        _raise_transfer_errors(on_error, err_msg, FileExistsError, record=record)
+    if mismatch is not None:
+        transfers -= 1
+        _raise_transfer_errors(on_error, mismatch, FileTransferFailedError, record=record)
+    if record is not None and record.end is None:
+        record.finish()
+    if pbar is not None and not (upd_put or single_pass):
         pbar.update(IrodsPath(session, irods_path).size)
     return transfers
 
 
+@log_slow_operation
+def _obj_copy(
+    session: Session,
+    isource: IrodsPath,
+    idest: IrodsPath,
+    overwrite: bool = False,
+    resc_name: str = "",
+    on_error: str = "fail",
+    record: Optional[TransferRecord] = None,
+) -> int:
+    """Copy the data object `isource` to `idest` on the iRODS server.
+
+    Parameters
+    ----------
+    session :
+        Session to copy the object with.
+    isource :
+        Path of the iRODS data object to copy.
+    idest :
+        Path of the new iRODS data object.
+    overwrite :
+        Whether to overwrite the destination if it exists.
+    resc_name :
+        Optional name of the resource to copy the data object to.
+    on_error:
+        'fail': fail with an exception; 'warn': turn error into warning and continue;
+        'skip': simply continue.
+    record:
+        Optional telemetry record for the copy.
+
+    """
+    if on_error and on_error.lower() not in ["fail", "warn", "skip"]:
+        raise ValueError(f"'on_error' {on_error} not a valid value. Choose fail, warn or skip.")
+    options = {}
+    if overwrite:
+        options[kw.FORCE_FLAG_KW] = ""
+    if resc_name not in ["", None]:
+        options[kw.DEST_RESC_NAME_KW] = resc_name
+    transfers = 0
+    try:
+        session.irods_session.data_objects.copy(str(isource), str(idest), **options)
+        transfers += 1
+    except irods.exception.CAT_NO_ACCESS_PERMISSION as error:
+        msg = f"Cannot copy {isource} to {idest}, no permission."
+        _raise_transfer_errors(on_error, msg, PermissionError, error, record=record)
+    except irods.exception.OVERWRITE_WITHOUT_FORCE_FLAG as error:
+        msg = (f"Data object {idest} already exists. "
+               "Use overwrite=True to overwrite the existing data object.")
+        _raise_transfer_errors(on_error, msg, FileExistsError, error, record=record)
+    except Exception as error:  # pylint: disable=broad-exception-caught
+        msg = f"Cannot copy {isource} to {idest}, {repr(error)}"
+        _raise_transfer_errors(on_error, msg, ObjectTransferFailedError, error, record=record)
+    if record is not None and record.end is None:
+        record.finish()
+    return transfers
+
+
+def _obj_register(  # pylint: disable=too-many-arguments
+    session: Session,
+    server_path: str,
+    idest: IrodsPath,
+    overwrite: bool = False,
+    resc_name: str = "",
+    checksum: bool = False,
+    on_error: str = "fail",
+    record: Optional[TransferRecord] = None,
+) -> int:
+    """Register the file `server_path` on the iRODS server as the data object `idest`.
+
+    Parameters
+    ----------
+    session :
+        Session to register the file with.
+    server_path :
+        Path of the file on the iRODS server.
+    idest :
+        Path of the new iRODS data object.
+    overwrite :
+        Whether to overwrite the destination if it exists.
+    resc_name :
+        Optional name of the resource that holds the file.
+    checksum :
+        Whether the server should compute and register the checksum.
+    on_error:
+        'fail': fail with an exception; 'warn': turn error into warning and continue;
+        'skip': simply continue.
+    record:
+        Optional telemetry record for the registration.
+
+    """
+    if on_error and on_error.lower() not in ["fail", "warn", "skip"]:
+        raise ValueError(f"'on_error' {on_error} not a valid value. Choose fail, warn or skip.")
+    options = {}
+    if overwrite:
+        options[kw.FORCE_FLAG_KW] = ""
+    if resc_name not in ["", None]:
+        options[kw.DEST_RESC_NAME_KW] = resc_name
+    if checksum:
+        options[kw.REG_CHKSUM_KW] = ""
+    transfers = 0
+    try:
+        session.irods_session.data_objects.register(server_path, str(idest), **options)
+        transfers += 1
+    except irods.exception.CAT_NO_ACCESS_PERMISSION as error:
+        msg = f"Cannot register {server_path} as {idest}, no permission."
+        _raise_transfer_errors(on_error, msg, PermissionError, error, record=record)
+    except irods.exception.UNIX_FILE_STAT_ERR as error:
+        msg = f"Cannot register {server_path}, the iRODS server cannot access the file."
+        _raise_transfer_errors(on_error, msg, FileNotFoundError, error, record=record)
+    except irods.exception.OVERWRITE_WITHOUT_FORCE_FLAG as error:
+        msg = (f"Data object {idest} already exists. "
+               "Use overwrite=True to overwrite the existing data object.")
+        _raise_transfer_errors(on_error, msg, FileExistsError, error, record=record)
+    except Exception as error:  # pylint: disable=broad-exception-caught
+        msg = f"Cannot register {server_path} as {idest}, {repr(error)}"
+        _raise_transfer_errors(on_error, msg, FileTransferFailedError, error, record=record)
+    if record is not None and record.end is None:
+        record.finish()
+    return transfers
+
+
+def _copy_stream(source, dest, updatables: list):
+    for chunk in iter(lambda: source.read(SINGLE_PASS_CHUNK_SIZE), b""):
+        dest.write(chunk)
+        for update in updatables:
+            update(len(chunk))
+
+
+def _stream_options(options: dict) -> dict:
+    return {key: value for key, value in options.items()
+            if key not in (kw.NUM_THREADS_KW, kw.FORCE_FLAG_KW, "updatables")}
+
+
+def _put_single_pass(session: Session, local_path: Path, irods_path: IrodsPath, options: dict,
+                     updatables: list) -> str:
+    """Upload a file in one stream and return its checksum, computed while it is read."""
+    with open(local_path, "rb") as handle:
+        stat = os.fstat(handle.fileno())
+        tee = HashingTee(handle, session.checksum_type)
+        with session.irods_session.data_objects.open(str(irods_path), "w",
+                                                     **_stream_options(options),
+                                                     **{kw.OPR_TYPE_KW: PUT_OPR}) as stream:
+            _copy_stream(tee, stream, updatables)
+    CHECKSUM_CACHE.store(local_path, tee.checksum, stat)
+    return tee.checksum
+
+
+def _get_single_pass(session: Session, irods_path: IrodsPath, local_path: Path, options: dict,
+                     updatables: list) -> str:
+    """Download a data object in one stream and return the checksum of the written file."""
+    if local_path.exists() and kw.FORCE_FLAG_KW not in options:
+        raise irods.exception.OVERWRITE_WITHOUT_FORCE_FLAG()
+    with session.irods_session.data_objects.open(str(irods_path), "r",
+                                                 **_stream_options(options)) as stream:
+        with open(local_path, "wb") as handle:
+            tee = HashingTee(handle, session.checksum_type)
+            _copy_stream(stream, tee, updatables)
+    CHECKSUM_CACHE.store(local_path, tee.checksum)
+    return tee.checksum
+
+
+def _remote_checksums(session: Session, ipaths: list[IrodsPath]) -> dict[str, str]:
+    """Get the checksums of data objects with one query per chunk of collections and names."""
+    checksums: dict[str, str] = {}
+    for coll_name, data_name, checksum in _data_object_rows(
+            session, [str(ipath) for ipath in ipaths],
+            (icat.COLL_NAME, icat.DATA_NAME, icat.DATA_CHECKSUM)):
+        if checksum:
+            checksums.setdefault(f"{coll_name}/{data_name}", checksum)
+    return checksums
+
+
+def _failed_error(direction: str) -> type:
+    """Exception for a failed transfer in the direction 'upload' or 'download'."""
+    return FileTransferFailedError if direction == "upload" else ObjectTransferFailedError
+
+
+def _verify_checksum(session: Session, irods_path: IrodsPath, local_path: Path,
+                     checksum: Optional[str]) -> Optional[str]:
+    """Compare the checksum of the local file with the checksum on the server.
+
+    The checksum from the transfer is used if it has the same type as the checksum on the
+    server. Otherwise, the local checksum is taken from the cache or computed, and the checksum
+    type of the session is updated for the next transfers.
+    Returns a message if the checksums differ.
+    """
+    remote_checksum = irods_path.checksum
+    checksum_type = _detect_checksum(remote_checksum)
+    if checksum is None or _detect_checksum(checksum) != checksum_type:
+        session.checksum_type = checksum_type
+        checksum = calc_checksum(local_path, checksum_type=checksum_type)
+    if remote_checksum != checksum:
+        return (f"Checksum of {local_path} ({checksum}) differs from the checksum of "
+                f"{irods_path} ({remote_checksum}) after the transfer.")
+    return None
+
+
+@log_slow_operation
 def _obj_get(
     session: Session,
     irods_path: IrodsPath,
@@ -516,6 +1218,8 @@ def _obj_get(
     options: Optional[dict] = None,
     on_error: str = "fail",
     pbar: Optional[tqdm_type] = None,
+    record: Optional[TransferRecord] = None,
+    verify: str = "inline",
  ) -> int:
     # pylint: disable=W0718,R0915,R0912
     """Download `irods_path` to `local_path` following iRODS `options`.
@@ -539,30 +1243,31 @@ def _obj_get(
         'skip': simply continue.
     pbar:
         Optional progress bar.
+    record:
+        Optional telemetry record for the transfer.
+    verify:
+        'inline': verify the checksum; 'deferred': only compute the local checksum,
+        which is verified later; 'none': do not compute any checksums.
 
     """
     if on_error and on_error.lower() not in ["fail", "warn", "skip"]:
         raise ValueError(f"'on_error' {on_error} not a valid value. Choose fail, warn or skip.")
     _warn_ignored_keywords(options)
 
-    if options is None:
-        options = {}
-    options.update(
-        {
-            kw.NUM_THREADS_KW: NUM_THREADS,
-            kw.VERIFY_CHKSUM_KW: "",
-        }
-    )
+    options = {} if options is None else dict(options)
+    options[kw.NUM_THREADS_KW] = NUM_THREADS
+    if verify == "inline":
+        options[kw.VERIFY_CHKSUM_KW] = ""
     if overwrite:
         options[kw.FORCE_FLAG_KW] = ""
     if resc_name not in ["", None]:
         options[kw.RESC_NAME_KW] = resc_name
 
     # Compatibility with PRC<2.1
-    if pbar is not None:
-        upd_put = "updatables" in signature(session.irods_session.data_objects.put).parameters
-        if upd_put:
-            options["updatables"] = [pbar.update]
+    upd_put = "updatables" in signature(session.irods_session.data_objects.put).parameters
+    updatables = [upd.update for upd in (pbar, record) if upd is not None]
+    if upd_put and len(updatables) > 0:
+        options["updatables"] = updatables
 
     transfers = 0
 
@@ -570,26 +1275,74 @@ def _obj_get(
     if Path(local_path).is_dir():
         local_path = Path(local_path).joinpath(irods_path.name)
 
+    mismatch = None
+    single_pass = False
     try:
-        session.irods_session.data_objects.get(str(irods_path), local_path, **options)
+        single_pass = verify != "none" and irods_path.size <= SINGLE_PASS_MAX_SIZE
+        if single_pass:
+            checksum = _get_single_pass(session, irods_path, Path(local_path), options,
+                                        updatables)
+        else:
+            session.irods_session.data_objects.get(str(irods_path), local_path, **options)
+            checksum = None
+        if verify == "inline":
+            mismatch = _verify_checksum(session, irods_path, Path(local_path), checksum)
         transfers += 1
     except (OSError, irods.exception.CAT_NO_ACCESS_PERMISSION) as error:
         msg = f"Cannot write to {local_path}."
-        _raise_transfer_errors(on_error, msg, PermissionError, error)
+        _raise_transfer_errors(on_error, msg, PermissionError, error, record=record)
     except irods.exception.CUT_ACTION_PROCESSED_ERR as error:
         msg = f"During download operation from '{irods_path}': iRODS server forbids action."
-        _raise_transfer_errors(on_error, msg, PermissionError, error)
+        _raise_transfer_errors(on_error, msg, PermissionError, error, record=record)
     except irods.exception.CollectionDoesNotExist:
         msg = f"{irods_path} does not exist."
         exception = CollectionDoesNotExist(msg)
-        _raise_transfer_errors(on_error, msg, ObjectTransferFailedError, exception)
+        _raise_transfer_errors(on_error, msg, ObjectTransferFailedError, exception,
+                               record=record)
     except Exception as error:
         msg = f"Cannot transfer {irods_path} to {local_path}, {repr(error)}"
-        _raise_transfer_errors(on_error, msg, ObjectTransferFailedError, error)
-    if pbar is not None and not upd_put:
+        _raise_transfer_errors(on_error, msg, ObjectTransferFailedError, error, record=record)
+    if mismatch is not None:
+        transfers -= 1
+        _raise_transfer_errors(on_error, mismatch, ObjectTransferFailedError, record=record)
+    if record is not None and record.end is None:
+        record.finish()
+    if pbar is not None and not (upd_put or single_pass):
         pbar.update(IrodsPath(session, irods_path).size)
     return transfers
 
+def _meta_archive_dict(base_path: IrodsPath, meta_paths: list[IrodsPath]) -> dict:
+    """Create the dictionary of a metadata archive.
+
+    Parameters
+    ----------
+    base_path
+        IrodsPath to which the paths of the items are relative.
+    meta_paths
+        IrodsPaths of the collections and data objects to add the metadata of.
+
+    Returns
+    -------
+        A dictionary with the metadata of all items.
+
+    """
+    meta_dict = _empty_metadict(base_path)
+    for cur_ipath in meta_paths:
+        if cur_ipath.collection_exists():
+            item_type = "collection"
+        elif cur_ipath.dataobject_exists():
+            item_type = "data object"
+        else:
+            item_type = "unknown"
+        new_metadata = {
+            "rel_path": str(cur_ipath.relative_to(base_path)),
+            "type": item_type,
+        }
+        new_metadata.update(cur_ipath.meta.to_dict())
+        meta_dict["items"].append(new_metadata)
+    return meta_dict
+
+
 def _empty_metadict(root_ipath: IrodsPath, recursive: bool = True) -> dict:
     """Create an empty dictionary for metadata archival.
 
@@ -10,6 +10,8 @@ import irods
 import irods.exception
 import irods.meta
 
+from ibridges.slow_log import log_slow_operation
+
 
 def _parse_tuple(key, value, units = ""):
     if key == "":
@@ -214,6 +216,7 @@ class MetaData:
         for sub in other:
             self.add(*key, *sub)
 
+    @log_slow_operation
     def add(self, key: str, value: str, units: Optional[str] = ""):
         """Add metadata to an item.
 
@@ -296,6 +299,7 @@ class MetaData:
         self.delete(key)
         self.add(key, value, units)
 
+    @log_slow_operation
     def delete(
         self,
         key: str,
@@ -343,6 +347,7 @@ class MetaData:
         for meta_item in all_meta_items:
             meta_item.remove()
 
+    @log_slow_operation
     def clear(self):
         """Delete all metadata entries belonging to the item.
 
@@ -367,6 +372,7 @@ class MetaData:
         for meta in self:
             meta.remove()
 
+    @log_slow_operation
     def to_dict(self, keys: Optional[list] = None) -> dict:
         """Convert iRODS metadata (AVUs) and system information to a python dictionary.
 
@@ -405,6 +411,7 @@ class MetaData:
             meta_dict["metadata"] = [tuple(m) for m in self if m.key in keys]
         return meta_dict
 
+    @log_slow_operation
     def from_dict(self, meta_dict: dict):
         """Fill the metadata based on a dictionary.
 
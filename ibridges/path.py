@@ -1,8 +1,13 @@
 """A class to handle iRODS paths."""
 
+# pylint: disable=too-many-lines
+
 from __future__ import annotations
 
-from collections import defaultdict
+import fnmatch
+from collections import defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pathlib import PurePosixPath
 from typing import Iterable, Optional, Union
 
@@ -18,9 +23,16 @@ from ibridges.exception import (
     NotADataObjectError,
 )
 from ibridges.meta import MetaData
+from ibridges.slow_log import log_slow_operation
+
+WALK_PARTITIONS = ("top", "adaptive")
+MAX_PARTITION_ROUNDS = 3
+IN_QUERY_CHUNK = 50
+
+DiskUsage = namedtuple("DiskUsage", ["size", "count"])
 
 
-class IrodsPath:
+class IrodsPath:  # pylint: disable=too-many-public-methods
     """A class analogous to the pathlib.Path for accessing iRods data.
 
     The IrodsPath can be used in much the same way as a Path from the pathlib library.
@@ -180,6 +192,7 @@ class IrodsPath:
         """
         return self.absolute().parts[-1]
 
+    @log_slow_operation
     def remove(self, force: bool = False, missing_ok: bool = False):
         """Move the data behind an iRODS path to the trash folder.
 
@@ -215,6 +228,7 @@ class IrodsPath:
         except irods.exception.CUT_ACTION_PROCESSED_ERR as exc:
             raise PermissionError(f"While removing {self}: iRODS server forbids action.") from exc
 
+    @log_slow_operation
     def create_collection(self) -> irods.collection.iRODSCollection:
         """Create a collection and all parent collections that do not exist yet.
 
@@ -250,6 +264,7 @@ class IrodsPath:
             msg = f"Zone {self._path.parts[1]} not found. Use: {self.session.zone}."
             raise ValueError(msg) from e
 
+    @log_slow_operation
     def rename(self, new_name: Union[str, IrodsPath]) -> IrodsPath:
         """Change the name or the path of a data object or collection.
 
@@ -301,6 +316,7 @@ class IrodsPath:
         except irods.exception.CAT_NO_ACCESS_PERMISSION as err:
             raise PermissionError(f"Not allowed to move data to {new_path}") from err
 
+    @log_slow_operation
     def collection_exists(self) -> bool:
         """Check if the path points to an iRODS collection.
 
@@ -316,6 +332,7 @@ class IrodsPath:
         """
         return self.session.irods_session.collections.exists(str(self))
 
+    @log_slow_operation
     def dataobject_exists(self) -> bool:
         """Check if the path points to an iRODS data object.
 
@@ -331,6 +348,7 @@ class IrodsPath:
         """
         return self.session.irods_session.data_objects.exists(str(self))
 
+    @log_slow_operation
     def exists(self) -> bool:
         """Check if the path already exists on the iRODS server.
 
@@ -453,7 +471,11 @@ class IrodsPath:
         return self.dataobject.open(mode=mode, **kwargs)
 
     def walk(self, depth: Optional[int] = None,
-             include_base_collection: bool = True) -> Iterable[IrodsPath]:
+             include_base_collection: bool = True,
+             workers: int = 1, partition: str = "top",
+             min_size: Optional[int] = None, max_size: Optional[int] = None,
+             modified_since: Optional[datetime] = None,
+             has_checksum: Optional[bool] = None) -> Iterable[IrodsPath]:
         """Walk on a collection.
 
         This iterates over all collections and data object for the path. If the
@@ -464,15 +486,43 @@ class IrodsPath:
         depth : int
             The maximum depth relative to the starting collection over which is walked.
             For example if depth equals 1, then it will iterate only over the subcollections
-            and data objects directly under the starting collection.
+            and data objects directly under the starting collection. Collections deeper
+            than the maximum depth are not retrieved from the server.
         include_base_collection:
             Whether to yield the collection to be walked over or not. By default this is True,
             conforming to the os.path.walk behavior.
+        workers:
+            Number of concurrent queries that retrieve the subtree, each on its own connection
+            from the connection pool. By default 1, in which case the whole subtree is retrieved
+            with a single query. With more workers the subtree is split into partitions, which
+            are queried concurrently. The order in which the paths are generated does not
+            depend on the number of workers.
+        partition:
+            How the subtree is split if there is more than one worker. With 'top' (default)
+            each subcollection of the starting collection is one partition. With 'adaptive'
+            partitions that contain more than their share of data objects are split further
+            into their subcollections.
+        min_size:
+            Only yield data objects of at least this size [bytes].
+        max_size:
+            Only yield data objects of at most this size [bytes].
+        modified_since:
+            Only yield data objects that were modified at or after this time.
+        has_checksum:
+            If True, only yield data objects that have a checksum, if False only those
+            without a checksum. By default (None) yield all data objects.
+            The filters on data objects are evaluated on the server as part of the query,
+            except has_checksum=False. Collections are yielded irrespective of the filters.
 
         Returns
         -------
             Generator that generates all data objects and subcollections in the collection.
 
+        Raises
+        ------
+        ValueError:
+            If the partition method is unknown.
+
         Examples
         --------
         >>> for ipath in IrodsPath(session, "~").walk():
@@ -483,22 +533,121 @@ class IrodsPath:
         >>> for ipath in IrodsPath(session, "~").walk(depth=1):
         >>>     print(ipath)
         IrodsPath(~, x)
+        >>> for ipath in IrodsPath(session, "~").walk(min_size=1000, has_checksum=False):
+        >>>     print(ipath)
+        IrodsPath(~, x)
+        IrodsPath(~, x, y)
+        >>> for ipath in IrodsPath(session, "~").walk(workers=4, partition="adaptive"):
+        >>>     print(ipath)
+        IrodsPath(~, x)
+        IrodsPath(~, x, y)
+        IrodsPath(~, x, y, z.txt)
 
         """
+        if partition not in WALK_PARTITIONS:
+            raise ValueError(f"Unknown partition method '{partition}', "
+                             f"choose one of {', '.join(WALK_PARTITIONS)}.")
+        partitions = None
+        if workers > 1 and depth is None:
+            partitions = _partition_subtree(self.session, self.collection, workers, partition)
+        all_collections = _get_subcoll_paths(self.session, self.collection, depth=depth,
+                                             workers=workers, partitions=partitions)
+        all_collections = sorted(all_collections, key=str)
+        # Data objects in the collections at the maximum depth are never yielded.
+        data_collections = None
+        if depth is not None and depth > 1:
+            data_collections = [str(col) for col in all_collections
+                                if len(col.relative_to(self).parts) < depth]
         all_data_objects: dict[str, list[IrodsPath]] = defaultdict(list)
-        prc_data_objects = _get_data_objects(self.session, self.collection, depth=depth)
+        filters = _data_object_filters(min_size, max_size, modified_since, has_checksum)
+        prc_data_objects = _get_data_objects(self.session, self.collection, depth=depth,
+                                             workers=workers, partitions=partitions,
+                                             collections=data_collections, filters=filters)
         for path, name, size, checksum in prc_data_objects:
+            if has_checksum is False and checksum:
+                continue
             abs_path = IrodsPath(self.session, path).absolute()
             ipath = CachedIrodsPath(self.session, size, True, checksum, path, name)
             all_data_objects[str(abs_path)].append(ipath)
-        all_collections = _get_subcoll_paths(self.session, self.collection, depth=depth)
-        all_collections = sorted(all_collections, key=str)
         sub_collections: dict[str, list[IrodsPath]] = defaultdict(list)
         for cur_col in all_collections:
             sub_collections[str(cur_col.parent)].append(cur_col)
         yield from _recursive_walk(self, sub_collections, all_data_objects, self, 0, depth,
                                    include_base_collection)
 
+    def glob(self, pattern: str) -> Iterable[IrodsPath]:
+        """Find data objects and collections that match a shell-style pattern.
+
+        The pattern is relative to the collection and is matched per path component:
+        '*', '?' and '[seq]' match within a single collection or data object name,
+        while a '**' component matches any number of subcollections, including none.
+        The pattern is translated into GenQuery LIKE conditions, so that only the candidate
+        matches are retrieved from the server. These are then matched exactly with the pattern.
+
+        Parameters
+        ----------
+        pattern:
+            Relative pattern, such as '*.nc' or '**/raw/*.h5'.
+
+        Returns
+        -------
+            Generator that generates all matching data objects and collections, sorted by path.
+
+        Raises
+        ------
+        ValueError:
+            If the pattern is empty or absolute.
+
+        Examples
+        --------
+        >>> for ipath in IrodsPath(session, "~").glob("*.txt"):
+        >>>     print(ipath)
+        CachedIrodsPath(/, zone, home, user, x.txt)
+        >>> list(IrodsPath(session, "~").glob("**/raw/*.h5"))
+        [CachedIrodsPath(/, zone, home, user, raw, a.h5),
+         CachedIrodsPath(/, zone, home, user, exp, raw, b.h5)]
+
+        """
+        parts = [part for part in pattern.split("/") if part not in ("", ".")]
+        if pattern.startswith("/") or len(parts) == 0:
+            raise ValueError(f"Glob pattern '{pattern}' should be a non-empty relative pattern.")
+        base_path = str(self.absolute())
+        matches: dict[str, IrodsPath] = {}
+
+        if parts[-1] != "**":
+            name_filter = [icat.LIKE(icat.DATA_NAME, _like_pattern(parts[-1]))]
+            columns = (icat.COLL_NAME, icat.DATA_NAME, DataObject.size, DataObject.checksum)
+            for like_pat in _glob_like_patterns(base_path, parts[:-1]):
+                rows = _query_rows(self.session, columns, [icat.LIKE(icat.COLL_NAME, like_pat)],
+                                   name_filter)
+                for coll_path, name, size, checksum in rows:
+                    if _glob_match(base_path, coll_path + "/" + name, parts):
+                        matches[coll_path + "/" + name] = CachedIrodsPath(
+                            self.session, size, True, checksum, coll_path, name)
+
+        for like_pat in _glob_like_patterns(base_path, parts):
+            rows = _query_rows(self.session, (icat.COLL_NAME,),
+                               [icat.LIKE(icat.COLL_NAME, like_pat)])
+            for coll_path, in rows:
+                if _glob_match(base_path, coll_path, parts):
+                    matches[coll_path] = CachedIrodsPath(self.session, None, False, None,
+                                                         coll_path)
+        yield from (matches[path] for path in sorted(matches))
+
+    def rglob(self, pattern: str) -> Iterable[IrodsPath]:
+        """Find data objects and collections that match a pattern anywhere in the subtree.
+
+        This is the same as calling :meth:`glob` with '**/' in front of the pattern.
+
+        Examples
+        --------
+        >>> list(IrodsPath(session, "~").rglob("*.h5"))
+        [CachedIrodsPath(/, zone, home, user, raw, a.h5),
+         CachedIrodsPath(/, zone, home, user, exp, raw, b.h5)]
+
+        """
+        return self.glob("**/" + pattern)
+
     def relative_to(self, other: IrodsPath) -> PurePosixPath:
         """Calculate the relative path compared to our path.
 
@@ -512,9 +661,13 @@ class IrodsPath:
         return PurePosixPath(str(self.absolute())).relative_to(PurePosixPath(str(other.absolute())))
 
     @property
+    @log_slow_operation
     def size(self) -> int:
         """Collect the sizes of a data object or a collection.
 
+        The size of a collection is computed on the server. Data objects with multiple
+        replicas are counted once, with the size of their largest replica.
+
         Returns
         -------
         int :
@@ -533,17 +686,77 @@ class IrodsPath:
         623
 
         """
-        if not self.exists():
+        if self.collection_exists():
+            coll_path = str(self.absolute())
+            return _get_usage(self.session, coll_path)[coll_path].size
+        sizes = _query_rows(self.session, (icat.DATA_SIZE,),
+                            [icat.COLL_NAME == str(self.parent.absolute())],
+                            [icat.DATA_NAME == self.name])
+        if len(sizes) == 0:
             raise FileNotFoundError(
                 f"Path '{str(self)}' does not exist;"
                 " it is neither a collection nor a dataobject."
             )
-        if self.dataobject_exists():
-            return self.dataobject.size
-        all_objs = _get_data_objects(self.session, self.collection)
-        return sum(size for _, _, size, _ in all_objs)
+        return max(size for size, in sizes)
+
+    @log_slow_operation
+    def disk_usage(self, depth: int = 0) -> dict[str, DiskUsage]:
+        """Compute the total size and number of data objects of the collection.
+
+        The sizes are aggregated on the server with GenQuery, so that only one row per
+        data object is retrieved. Data objects with multiple replicas are counted once,
+        with the size of their largest replica.
+
+        Parameters
+        ----------
+        depth:
+            Also compute the totals for the subcollections up to this depth, by default
+            only the totals of the collection itself are computed.
+
+        Returns
+        -------
+            Dictionary with the total size [bytes] and number of data objects (including all
+            subcollections) for each collection up to the depth, sorted by path.
+            For data objects it contains the size of the data object itself.
+
+        Raises
+        ------
+        DoesNotExistError:
+            When the path does not point to a data object or collection.
+
+        Examples
+        --------
+        >>> IrodsPath(session, "~").disk_usage()
+        {'/zone/home/user': DiskUsage(size=12345, count=10)}
+        >>> IrodsPath(session, "~").disk_usage(depth=1)
+        {'/zone/home/user': DiskUsage(size=12345, count=10),
+         '/zone/home/user/x': DiskUsage(size=345, count=4)}
+
+        """
+        base_path = str(self.absolute())
+        if not self.collection_exists():
+            if not self.dataobject_exists():
+                raise DoesNotExistError(f"Cannot compute disk usage of {self}, it does not exist.")
+            return {base_path: DiskUsage(self.size, 1)}
+        if depth == 0:
+            return _get_usage(self.session, base_path)
+
+        levels = _get_collection_levels(self.session, self.collection, depth)
+        usage = {path: DiskUsage(0, 0) for level in levels for path in level}
+        for coll_path, coll_usage in _get_usage(self.session, base_path, group=True).items():
+            if coll_path != base_path and not coll_path.startswith(base_path + "/"):
+                continue
+            rel_parts = PurePosixPath(coll_path).relative_to(base_path).parts
+            # Add the totals to all parent collections up to the maximum depth.
+            for i_part in range(min(depth, len(rel_parts)) + 1):
+                key = str(PurePosixPath(base_path, *rel_parts[:i_part]))
+                prev = usage.get(key, DiskUsage(0, 0))
+                usage[key] = DiskUsage(prev.size + coll_usage.size,
+                                       prev.count + coll_usage.count)
+        return dict(sorted(usage.items()))
 
     @property
+    @log_slow_operation
     def checksum(self) -> str:
         """Checksum of the data object.
 
@@ -671,9 +884,14 @@ class CachedIrodsPath(IrodsPath):
         return not self._is_dataobj
 
 
+@log_slow_operation
 def _get_data_objects(
     session, coll: irods.collection.iRODSCollection,
     depth: Optional[int] = None,
+    workers: int = 1,
+    partitions: Optional[list[tuple[str, bool]]] = None,
+    collections: Optional[list[str]] = None,
+    filters: Optional[list] = None,
 ) -> list[tuple[str, str, int, str]]:
     """Retrieve all data objects in a collection and all its subcollections.
 
@@ -684,7 +902,19 @@ def _get_data_objects(
     coll : irods.collection.iRODSCollection
         The collection to search for all data objects
     depth:
-        Depth of the data object search, only used for depth==1.
+        Depth of the data object search. If larger than 1, only the data objects in the
+        collections up to that depth are retrieved, without querying the rest of the subtree.
+    workers:
+        Number of concurrent queries for the partitions.
+    partitions:
+        Partitions of the subtree below the collection, see :func:`_partition_subtree`.
+        By default None, in which case the subtree is retrieved with a single query.
+        Ignored if a depth is given.
+    collections:
+        Collection paths that are less deep than depth, if they are already known. By default
+        they are retrieved level by level, see :func:`_get_collection_levels`.
+    filters:
+        Extra query conditions that the data objects should satisfy.
 
     Returns
     -------
@@ -692,32 +922,276 @@ def _get_data_objects(
         [(collection path, name, size, checksum)]
 
     """
+    columns = (icat.COLL_NAME, icat.DATA_NAME, DataObject.size, DataObject.checksum)
     # all objects in the collection
-    objs = [(obj.collection.path, obj.name, obj.size, obj.checksum) for obj in coll.data_objects]
+    if filters:
+        objs = _query_rows(session, columns, [icat.COLL_NAME == coll.path], filters)
+    else:
+        objs = [(obj.collection.path, obj.name, obj.size, obj.checksum)
+                for obj in coll.data_objects]
     if depth == 1:
         return objs
 
     # all objects in subcollections
-    data_query = session.irods_session.query(
-        icat.COLL_NAME, icat.DATA_NAME, DataObject.size, DataObject.checksum
-    )
-    data_query = data_query.filter(icat.LIKE(icat.COLL_NAME, coll.path + "/%"))
-    for res in data_query.get_results():
-        path, name, size, checksum = res.values()
-        objs.append((path, name, size, checksum))
-
+    if depth is not None:
+        if collections is None:
+            levels = _get_collection_levels(session, coll, depth - 1, workers)
+            collections = [path for level in levels for path in level]
+        sub_paths = [path for path in collections if path != coll.path]
+        conditions = [[cond] for cond in _in_conditions(icat.COLL_NAME, sub_paths)]
+    elif partitions is None:
+        conditions = [[icat.LIKE(icat.COLL_NAME, coll.path + "/%")]]
+    else:
+        conditions = [_partition_conditions(*part) for part in partitions]
+    for results in _map_queries(session, columns, conditions, workers, filters):
+        objs.extend(results)
     return objs
 
 
+@log_slow_operation
 def _get_subcoll_paths(session, coll: irods.collection.iRODSCollection,
-                       depth: Optional[int] = None) -> list:
+                       depth: Optional[int] = None, workers: int = 1,
+                       partitions: Optional[list[tuple[str, bool]]] = None) -> list:
     """Retrieve all sub collections in a sub tree starting at coll and returns their IrodsPaths."""
     if depth == 1:
         return [CachedIrodsPath(session, None, False, None, subcol.path)
                 for subcol in coll.subcollections]
+    if depth is not None:
+        levels = _get_collection_levels(session, coll, depth, workers)
+        return [CachedIrodsPath(session, None, False, None, p) for level in levels for p in level]
+
+    if partitions is None:
+        coll_paths = [coll.path]
+        conditions = [[icat.LIKE(icat.COLL_NAME, coll.path + "/%")]]
+    else:
+        coll_paths = [coll.path] + [path for path, _ in partitions]
+        conditions = [[icat.LIKE(icat.COLL_NAME, path + "/%")]
+                      for path, recursive in partitions if recursive]
+    for results in _map_queries(session, (icat.COLL_NAME,), conditions, workers):
+        coll_paths.extend(path for path, in results)
+    return [CachedIrodsPath(session, None, False, None, p) for p in coll_paths]
+
+
+def _get_usage(session, coll_path: str, group: bool = False) -> dict[str, DiskUsage]:
+    """Compute the total size and number of data objects in a subtree.
+
+    The maximum size of the replicas is computed on the server for each data object, so that
+    every data object is counted once. If group is True, the totals are computed for each
+    collection in the subtree separately, otherwise for the subtree as a whole.
+    """
+    usage: dict[str, DiskUsage] = {} if group else {coll_path: DiskUsage(0, 0)}
+    for cond in _partition_conditions(coll_path, True):
+        query = session.irods_session.query(icat.COLL_NAME, icat.DATA_NAME, icat.DATA_SIZE)
+        query = query.filter(cond).max(icat.DATA_SIZE)
+        for res in query.get_results():
+            path = res[icat.COLL_NAME] if group else coll_path
+            prev = usage.get(path, DiskUsage(0, 0))
+            usage[path] = DiskUsage(prev.size + int(res[icat.DATA_SIZE] or 0), prev.count + 1)
+    return usage
+
+
+def _like_pattern(part: str) -> str:
+    """Translate a shell-style pattern for a single path component to a LIKE pattern.
+
+    The LIKE pattern can match more than the original pattern, but never less.
+    """
+    like_pat = ""
+    i_char = 0
+    while i_char < len(part):
+        char = part[i_char]
+        if char == "*":
+            like_pat += "%"
+        elif char == "?":
+            like_pat += "_"
+        elif char == "[" and "]" in part[i_char + 2:]:
+            like_pat += "_"
+            i_char = part.index("]", i_char + 2)
+        else:
+            like_pat += char
+        i_char += 1
+    return like_pat
+
+
+def _glob_like_patterns(base_path: str, parts: list[str]) -> list[str]:
+    """Create the LIKE patterns for collections, one for each way that '**' can be matched."""
+    like_patterns = [base_path]
+    for part in parts:
+        if part == "**":
+            like_patterns += [like_pat + "/%" for like_pat in like_patterns]
+        else:
+            like_patterns = [like_pat + "/" + _like_pattern(part) for like_pat in like_patterns]
+    return sorted(set(like_patterns))
+
+
+def _glob_match(base_path: str, path: str, parts: list[str]) -> bool:
+    """Check whether the path matches the glob pattern relative to the base path."""
+    if path != base_path and not path.startswith(base_path.rstrip("/") + "/"):
+        return False
+    return _match_parts(PurePosixPath(path).relative_to(base_path).parts, parts)
+
+
+def _match_parts(path_parts: tuple[str, ...], pattern_parts: list[str]) -> bool:
+    if len(pattern_parts) == 0:
+        return len(path_parts) == 0
+    if pattern_parts[0] == "**":
+        return any(_match_parts(path_parts[i_part:], pattern_parts[1:])
+                   for i_part in range(len(path_parts) + 1))
+    return (len(path_parts) > 0 and fnmatch.fnmatchcase(path_parts[0], pattern_parts[0])
+            and _match_parts(path_parts[1:], pattern_parts[1:]))
+
+
+def _data_object_filters(min_size: Optional[int] = None, max_size: Optional[int] = None,
+                         modified_since: Optional[datetime] = None,
+                         has_checksum: Optional[bool] = None) -> list:
+    """Create query conditions for the data object filters of the walk."""
+    filters = []
+    if min_size is not None:
+        filters.append(icat.DATA_SIZE >= min_size)
+    if max_size is not None:
+        filters.append(icat.DATA_SIZE <= max_size)
+    if modified_since is not None:
+        filters.append(icat.DATA_MODIFY_TIME >= modified_since)
+    if has_checksum:
+        filters.append(icat.DATA_CHECKSUM != "")
+    return filters
+
+
+def _get_collection_levels(session, coll: irods.collection.iRODSCollection, depth: int,
+                           workers: int = 1) -> list[list[str]]:
+    """Retrieve the collection paths in a sub tree level by level up to a maximum depth.
+
+    Only the collections up to the maximum depth are queried, by selecting the collections
+    of which the parent is in the previous level.
+
+    Returns
+    -------
+        Lists of collection paths for each level, starting with [coll.path] at depth 0.
+
+    """
+    levels = [[coll.path]]
+    for _ in range(depth):
+        conditions = [[cond] for cond in _in_conditions(icat.COLL_PARENT_NAME, levels[-1])]
+        next_level = [path for results in _map_queries(session, (icat.COLL_NAME,), conditions,
+                                                       workers)
+                      for path, in results]
+        if len(next_level) == 0:
+            break
+        levels.append(sorted(next_level))
+    return levels
+
+
+def _in_conditions(column, values: list, chunk_size: int = IN_QUERY_CHUNK) -> list:
+    """Create conditions that select any of the values, with at most chunk_size values each."""
+    return [icat.IN(column, values[i: i + chunk_size]) for i in range(0, len(values), chunk_size)]
+
+
+def _map_queries(session, columns: tuple, conditions: list[list], workers: int,
+                 filters: Optional[list] = None) -> list:
+    """Run the queries for each list of conditions, concurrently if there are multiple workers."""
+    if workers <= 1 or len(conditions) <= 1:
+        return [_query_rows(session, columns, cond, filters) for cond in conditions]
+    with ThreadPoolExecutor(workers) as pool:
+        return list(pool.map(lambda cond: _query_rows(session, columns, cond, filters),
+                             conditions))
+
+
+def _query_rows(session, columns: tuple, conditions: list,
+                filters: Optional[list] = None) -> list[tuple]:
+    """Run one query for each of the conditions and combine the resulting rows.
+
+    The filters are added to each of the queries.
+    """
+    rows: list[tuple] = []
+    for cond in conditions:
+        query = session.irods_session.query(*columns).filter(cond, *(filters or []))
+        rows.extend(tuple(res.values()) for res in query.get_results())
+    return rows
 
-    coll_query = session.irods_session.query(icat.COLL_NAME)
-    coll_query = coll_query.filter(icat.LIKE(icat.COLL_NAME, coll.path + "/%"))
 
-    return [CachedIrodsPath(session, None, False, None, p) for r in coll_query.get_results()
-            for p in r.values()] + [CachedIrodsPath(session, None, False, None, coll.path)]
+def _data_object_rows(session, names: Iterable[str],
+                      columns: tuple = (icat.COLL_NAME, icat.DATA_NAME, icat.DATA_SIZE,
+                                        icat.DATA_CHECKSUM)) -> list[tuple]:
+    """Query data objects by their paths, with one query per chunk of parents and chunk of names.
+
+    The first two columns should be the collection and the name of the data object. Only rows
+    of the requested data objects are returned, one for each replica.
+    """
+    by_parent = defaultdict(set)
+    for name in names:
+        by_parent[str(PurePosixPath(name).parent)].add(PurePosixPath(name).name)
+    parents = sorted(by_parent)
+    rows: list[tuple] = []
+    for i_start in range(0, len(parents), IN_QUERY_CHUNK):
+        chunk = parents[i_start:i_start + IN_QUERY_CHUNK]
+        data_names = sorted(set().union(*(by_parent[parent] for parent in chunk)))
+        rows.extend(row for row in _query_rows(
+            session, columns, _in_conditions(icat.DATA_NAME, data_names),
+            filters=[icat.IN(icat.COLL_NAME, chunk)])
+            if row[1] in by_parent[row[0]])
+    return rows
+
+
+def _partition_conditions(coll_path: str, recursive: bool) -> list:
+    """Conditions to select the data objects in a partition of a subtree."""
+    if recursive:
+        return [icat.COLL_NAME == coll_path, icat.LIKE(icat.COLL_NAME, coll_path + "/%")]
+    return [icat.COLL_NAME == coll_path]
+
+
+def _count_data_objects(session, coll_path: str, recursive: bool) -> int:
+    """Count the (replicas of) data objects in a partition of a subtree."""
+    count = 0
+    for cond in _partition_conditions(coll_path, recursive):
+        query = session.irods_session.query(icat.DATA_ID).filter(cond).count(icat.DATA_ID)
+        count += int(query.one()[icat.DATA_ID])
+    return count
+
+
+@log_slow_operation
+def _partition_subtree(session, coll: irods.collection.iRODSCollection, workers: int,
+                       partition: str = "top") -> list[tuple[str, bool]]:
+    """Split the subtree below a collection into partitions that can be queried concurrently.
+
+    Parameters
+    ----------
+    session:
+        Session to query the subtree with.
+    coll:
+        Collection at the root of the subtree, which is not part of any partition.
+    workers:
+        Number of concurrent queries used to count the data objects in the partitions.
+    partition:
+        Either 'top' or 'adaptive', see :meth:`IrodsPath.walk`.
+
+    Returns
+    -------
+        List of partitions [(collection path, recursive)]. A recursive partition contains
+        the collection and all of its subcollections, otherwise it only contains the collection.
+
+    """
+    partitions = [(subcol.path, True) for subcol in coll.subcollections]
+    if partition == "top":
+        return partitions
+
+    counts: dict[tuple[str, bool], int] = {}
+    for _ in range(MAX_PARTITION_ROUNDS):
+        new_parts = [part for part in partitions if part not in counts]
+        with ThreadPoolExecutor(workers) as pool:
+            counts.update(zip(new_parts, pool.map(
+                lambda part: _count_data_objects(session, *part), new_parts)))
+        share = sum(counts[part] for part in partitions) / workers
+        split_parts: list[tuple[str, bool]] = []
+        for coll_path, recursive in partitions:
+            children = []
+            if recursive and counts[(coll_path, recursive)] > share:
+                children = _query_rows(session, (icat.COLL_NAME,),
+                                       [icat.COLL_PARENT_NAME == coll_path])
+            if len(children) == 0:
+                split_parts.append((coll_path, recursive))
+                continue
+            split_parts.append((coll_path, False))
+            split_parts.extend((child, True) for child, in sorted(children))
+        if split_parts == partitions:
+            break
+        partitions = split_parts
+    return partitions
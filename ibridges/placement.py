@@ -0,0 +1,134 @@
+"""Placement of uploads over multiple root resources.
+
+By default all data is uploaded to a single resource, or to the default resource of the
+server. If the iRODS server has multiple root resources on separate storage nodes, the
+uploads can be spread over these resources with a placement policy. The uploads are then
+run by parallel workers, so that the upload bandwidth scales with the number of storage
+backends.
+
+The following policies are available:
+
+- 'round-robin': Assign the resources in turn.
+- 'free-space': Assign the bytes to the resources in proportion to their free space.
+- 'least-in-flight': Assign the resource with the least bytes that are still being
+  uploaded, and if equal, the least bytes assigned in total.
+
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Optional
+
+from ibridges.resources import Resources
+from ibridges.session import Session
+
+PLACEMENT_POLICIES = ["round-robin", "free-space", "least-in-flight"]
+
+
+class ResourcePlacement():
+    """Assign a root resource to each upload according to a placement policy.
+
+    Parameters
+    ----------
+    policy:
+        One of 'round-robin', 'free-space' or 'least-in-flight'.
+    free_space:
+        Names of the resources to spread the uploads over with their free space in bytes.
+        The free space is only used by the 'free-space' policy, where resources without
+        known free space are only used if none of the resources report their free space.
+
+    Raises
+    ------
+    ValueError:
+        If the policy is unknown or there are no resources to place the uploads on.
+
+    """
+
+    def __init__(self, policy: str, free_space: dict[str, int]):
+        """Initialize the placement without any assigned uploads."""
+        if policy not in PLACEMENT_POLICIES:
+            raise ValueError(f"Unknown placement policy '{policy}', choose one of "
+                             f"{PLACEMENT_POLICIES}.")
+        if len(free_space) == 0:
+            raise ValueError("No resources available to place the uploads on.")
+        self.policy = policy
+        self.free_space = dict(free_space)
+        if policy == "free-space" and any(space > 0 for space in free_space.values()):
+            self.free_space = {name: space for name, space in free_space.items() if space > 0}
+        self.assigned = {resc_name: 0 for resc_name in self.free_space}
+        self.in_flight = {resc_name: 0 for resc_name in self.free_space}
+        self.n_assigned = {resc_name: 0 for resc_name in self.free_space}
+        self._n_total = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_session(cls, session: Session, policy: str,
+                     resources: Optional[list[str]] = None) -> ResourcePlacement:
+        """Create the placement for the root resources that are not down.
+
+        Parameters
+        ----------
+        session:
+            Session to get the root resources and their free space with.
+        policy:
+            One of 'round-robin', 'free-space' or 'least-in-flight'.
+        resources:
+            Names of the root resources to use, by default all root resources that are not down.
+
+        Returns
+        -------
+            The placement for the resources.
+
+        """
+        free_space = {
+            name: free for name, status, free, _ in Resources(session).root_resources
+            if status != "down" and (resources is None or name in resources)
+        }
+        return cls(policy, free_space)
+
+    def assign(self, size: int) -> str:
+        """Choose the resource for an upload and register it as in flight.
+
+        Parameters
+        ----------
+        size:
+            Size of the upload in bytes.
+
+        Returns
+        -------
+            Name of the resource to upload to.
+
+        """
+        with self._lock:
+            names = list(self.free_space)
+            if self.policy == "round-robin":
+                resc_name = names[self._n_total % len(names)]
+            elif self.policy == "free-space":
+                total_space = sum(self.free_space.values())
+                # Keep the assigned bytes proportional to the free space of each resource.
+                resc_name = min(names, key=lambda name: (
+                    (self.assigned[name] + size) / (self.free_space[name] or 1)
+                    if total_space > 0 else self.assigned[name] + size))
+            else:
+                resc_name = min(names, key=lambda name: (self.in_flight[name],
+                                                         self.assigned[name]))
+            self._n_total += 1
+            self.n_assigned[resc_name] += 1
+            self.assigned[resc_name] += size
+            self.in_flight[resc_name] += size
+        return resc_name
+
+    def release(self, resc_name: str, size: int):
+        """Register that an upload to the resource has finished.
+
+        Parameters
+        ----------
+        resc_name:
+            Name of the resource that was assigned to the upload.
+        size:
+            Size of the upload in bytes.
+
+        """
+        with self._lock:
+            self.in_flight[resc_name] -= size
@@ -0,0 +1,113 @@
+"""Selection of the replica to download data objects from.
+
+By default the iRODS server decides from which replica a data object is downloaded.
+If one of the storage nodes is slow or overloaded, all downloads can suffer, even if good
+replicas exist on other resources. With replica selection, the replicas of each data object
+are ranked on the client side and downloaded from the best one. If the download fails,
+the next replica is tried.
+
+Replicas are ranked as follows:
+
+- Only replicas with the 'good' status are used.
+- Replicas on the preferred resources come first, in the order of preference.
+- Other replicas are ordered by the throughput measured for their resource in earlier
+  downloads with the same session. Resources without measurements come first, so that
+  their throughput is measured as well.
+
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Iterable, Optional
+
+import ibridges.icat_columns as icat
+from ibridges.path import IrodsPath, _data_object_rows
+from ibridges.session import Session
+
+GOOD_REPLICA_STATUS = "1"
+THROUGHPUT_WEIGHT = 0.3  # Weight of a new measurement in the moving average of the throughput.
+
+
+class ReplicaSelector():
+    """Rank the good replicas of data objects for downloading.
+
+    Parameters
+    ----------
+    session:
+        Session to query the replicas with, which also stores the measured throughput
+        of the resources.
+    preferred_resources:
+        Names of the root resources to download from if they have a good replica,
+        in order of preference.
+
+    """
+
+    def __init__(self, session: Session, preferred_resources: Optional[list[str]] = None):
+        """Initialize without any known replicas."""
+        self.session = session
+        self.preferred_resources = [] if preferred_resources is None else preferred_resources
+        self.replicas: dict[str, list[str]] = {}
+
+    def fetch(self, ipaths: Iterable[IrodsPath]):
+        """Retrieve the good replicas for the data objects with one query per chunk of names.
+
+        Parameters
+        ----------
+        ipaths:
+            Paths to the data objects that will be downloaded.
+
+        """
+        rows = _data_object_rows(
+            self.session, {str(ipath) for ipath in ipaths},
+            (icat.COLL_NAME, icat.DATA_NAME, icat.DATA_REPL_STATUS, icat.DATA_RESC_HIER))
+        replicas: dict[str, list[str]] = defaultdict(list)
+        for coll_name, data_name, status, resc_hier in rows:
+            path = f"{coll_name}/{data_name}"
+            if str(status) == GOOD_REPLICA_STATUS:
+                resc_name = resc_hier.split(";")[0]
+                if resc_name not in replicas[path]:
+                    replicas[path].append(resc_name)
+        self.replicas.update(replicas)
+
+    def rank(self, ipath: IrodsPath) -> list[str]:
+        """Rank the root resources with a good replica of the data object.
+
+        Parameters
+        ----------
+        ipath:
+            Path to the data object, for which the replicas should have been fetched.
+
+        Returns
+        -------
+            Names of the root resources to try in order, can be empty if the data object
+            has no good replicas or they are unknown.
+
+        """
+        throughput = self.session.resource_throughput
+
+        def _key(resc_name):
+            if resc_name in self.preferred_resources:
+                return (0, self.preferred_resources.index(resc_name), 0.0)
+            return (1, 0, -throughput.get(resc_name, float("inf")))
+
+        return sorted(self.replicas.get(str(ipath), []), key=_key)
+
+    def measure(self, resc_name: str, throughput: Optional[float]):
+        """Update the measured throughput of a resource with a moving average.
+
+        Parameters
+        ----------
+        resc_name:
+            Name of the root resource that was downloaded from.
+        throughput:
+            Throughput of the download in bytes per second.
+
+        """
+        if throughput is None:
+            return
+        measured = self.session.resource_throughput
+        if resc_name in measured:
+            throughput = (1 - THROUGHPUT_WEIGHT) * measured[resc_name] + (
+                THROUGHPUT_WEIGHT * throughput)
+        measured[resc_name] = throughput
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import time
 from typing import Optional
 
 import irods.exception
@@ -9,6 +10,9 @@ import irods.resource
 
 from ibridges import icat_columns as icat
 from ibridges.session import Session
+from ibridges.slow_log import log_slow_operation
+
+RESOURCE_CACHE_TTL = 60  # Seconds that the resource tree is reused before it is fetched again.
 
 
 class Resources:
@@ -22,12 +26,17 @@ class Resources:
     ----------
     session : Session
         Instance of the Session class
+    cache_ttl : float
+        Number of seconds that the resource tree with its free space is cached.
 
     """
 
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, cache_ttl: float = RESOURCE_CACHE_TTL):
         """iRODS resource initialization."""  # noqa: D403
-        self._resources: Optional[dict] = None
+        self._resources: dict = {}
+        self._tree: Optional[dict] = None
+        self._fetch_time = 0.0
+        self.cache_ttl = cache_ttl
         self.session = session
 
     def get_resource(self, resc_name: str) -> irods.resource.iRODSResource:
@@ -67,17 +76,10 @@ class Resources:
             0 if no free space has been set in the whole resource tree starting at node resc_name.
 
         """
-        try:
-            resc = self.session.irods_session.resources.get(resc_name)
-        except irods.exception.ResourceDoesNotExist:
+        tree = self._resource_tree()
+        if resc_name not in tree:
             return -1
-        if resc.free_space is not None:
-            return int(resc.free_space)
-        children = self.get_resource_children(resc)
-        free_space = sum(
-            (int(child.free_space) for child in children if child.free_space is not None)
-        )
-        return free_space
+        return tree[resc_name]["free_space"]
 
     def get_resource_children(self, resc: irods.resource.iRODSResource) -> list:
         """Get all the children for the resource `resc`.
@@ -97,6 +99,7 @@ class Resources:
             children.extend(self.get_resource_children(child))
         return resc.children + children
 
+    @log_slow_operation
     def resources(self, update: bool = False) -> dict:
         """iRODS resources and their metadata.
 
@@ -115,29 +118,60 @@ class Resources:
               all its children.
 
         """  # noqa: D403
-        if self._resources is None or update:
-            query = self.session.irods_session.query(
-                icat.RESC_NAME, icat.RESC_PARENT, icat.RESC_STATUS, icat.RESC_CONTEXT
-            )
-            resc_list = []
-            for item in query.get_results():
-                name, parent, status, context = item.values()
-                if name == "bundleResc":
-                    continue
-                free_space = 0
-                if parent is None:
-                    free_space = self.get_free_space(name)
-                metadata = {
-                    "parent": parent,
-                    "status": status,
-                    "context": context,
-                    "free_space": free_space,
-                }
-                resc_list.append((name, metadata))
-            resc_dict = dict(sorted(resc_list, key=lambda item: str.casefold(item[0])))
-            self._resources = resc_dict
+        self._resource_tree(update)
         return self._resources
 
+    def _resource_tree(self, update: bool = False) -> dict:
+        """Get the cached resource tree, or fetch it if it is too old."""
+        if self._tree is None or update or time.monotonic() - self._fetch_time > self.cache_ttl:
+            self._tree = self._fetch_resource_tree()
+            self._fetch_time = time.monotonic()
+            resc_list = [
+                (name, {key: node[key] for key in ["parent", "status", "context", "free_space"]})
+                for name, node in self._tree.items() if name != "bundleResc"
+            ]
+            self._resources = dict(sorted(resc_list, key=lambda item: str.casefold(item[0])))
+        return self._tree
+
+    def _fetch_resource_tree(self) -> dict:
+        """Fetch all resources with a single query and compute their free space.
+
+        The free space of a resource without annotation is computed bottom-up from its children.
+        """
+        query = self.session.irods_session.query(
+            icat.RESC_ID, icat.RESC_NAME, icat.RESC_PARENT, icat.RESC_STATUS, icat.RESC_CONTEXT,
+            icat.RESC_FREE_SPACE
+        )
+        rows = [tuple(item.values()) for item in query.get_results()]
+        # Since iRODS 4.2 the parent is stored as the id of the resource, before as its name.
+        id_to_name = {str(resc_id): name for resc_id, name, *_ in rows}
+        tree = {}
+        for _, name, parent, status, context, free_space in rows:
+            tree[name] = {
+                "parent": parent,
+                "parent_name": id_to_name.get(str(parent), parent) if parent else None,
+                "status": status,
+                "context": context,
+                "annotated_free_space": _parse_free_space(free_space),
+                "children": [],
+            }
+        for name, node in tree.items():
+            if node["parent_name"] in tree:
+                tree[node["parent_name"]]["children"].append(name)
+
+        def _aggregate(name: str) -> int:
+            node = tree[name]
+            if "free_space" not in node:
+                if node["annotated_free_space"] is not None:
+                    node["free_space"] = node["annotated_free_space"]
+                else:
+                    node["free_space"] = sum(_aggregate(child) for child in node["children"])
+            return node["free_space"]
+
+        for name in tree:
+            _aggregate(name)
+        return tree
+
     @property
     def root_resources(self) -> list[tuple]:
         """Filter resources for all root resources.
@@ -150,8 +184,17 @@ class Resources:
         List  containing [(resource_name, status, free_space, context)]
 
         """
+        # Computed from the cached resource tree, so this does not query the server again.
         parents = [(key, val) for key, val in self.resources().items() if not val["parent"]]
         return [
             (resc[0], resc[1]["status"], resc[1]["free_space"], resc[1]["context"])
             for resc in parents
         ]
+
+
+def _parse_free_space(free_space) -> Optional[int]:
+    """Convert the annotated free space to an integer, or None if it is not set."""
+    try:
+        return int(free_space)
+    except (TypeError, ValueError):
+        return None
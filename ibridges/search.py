@@ -2,12 +2,14 @@
 
 from __future__ import annotations
 
-from collections import namedtuple
-from typing import List, Optional, Union
+from collections import defaultdict, namedtuple
+from typing import Iterable, List, Optional, Union
 
 from ibridges import icat_columns as icat
-from ibridges.path import CachedIrodsPath, IrodsPath
+from ibridges.path import CachedIrodsPath, IrodsPath, _in_conditions, _query_rows
 from ibridges.session import Session
+from ibridges.slow_log import log_slow_operation
+from ibridges.util import _detect_checksum
 
 META_COLS = {
     "collection": (icat.META_COLL_ATTR_NAME, icat.META_COLL_ATTR_VALUE, icat.META_COLL_ATTR_UNITS),
@@ -37,6 +39,7 @@ class MetaSearch(namedtuple("MetaSearch", ["key", "value", "units"], defaults=[.
         return super(MetaSearch, cls).__new__(cls, key, value, units)
 
 
+@log_slow_operation
 def search_data(  # pylint: disable=too-many-branches
     session: Session,
     path: Optional[Union[str, IrodsPath]] = None,
@@ -218,6 +221,82 @@ def search_data(  # pylint: disable=too-many-branches
     return ipath_results
 
 
+@log_slow_operation
+def search_checksums(
+    session: Session,
+    checksums: Iterable[str],
+    path: Optional[Union[str, IrodsPath]] = None,
+) -> dict[str, list[CachedIrodsPath]]:
+    """Search for data objects with any of the given checksums.
+
+    Contrary to :func:`search_data`, many checksums are looked up at once, with one query
+    per chunk of checksums. Wildcards are not supported.
+
+    Parameters
+    ----------
+    session:
+        Session to search with.
+    checksums:
+        Exact checksums of the data objects to look for, e.g. 'sha2:wW+wG+...'.
+    path:
+        IrodsPath to the collection to search in, including its subcollections.
+        By default the home collection is searched.
+
+    Returns
+    -------
+        Dictionary with the checksums that were found as keys and the data objects that have
+        that checksum as values. The CachedIrodsPaths contain the size and checksum.
+
+    Examples
+    --------
+    >>> search_checksums(session, ["sha2:wW+wG+JxwHmE1uXEvRJQxA2nEpVJLRY2bu1KqW1mqEQ="])
+    {'sha2:wW+wG+JxwHmE1uXEvRJQxA2nEpVJLRY2bu1KqW1mqEQ=': [IrodsPath(/, somefile.txt)]}
+
+    """
+    path = IrodsPath(session, session.home if path is None else path)
+    checksums = sorted(set(checksums))
+    columns = (icat.COLL_NAME, icat.DATA_NAME, icat.DATA_SIZE, icat.DATA_CHECKSUM)
+    rows = set()
+    for scope in [icat.COLL_NAME == str(path), icat.LIKE(icat.COLL_NAME, _postfix_wildcard(path))]:
+        rows.update(_query_rows(session, columns, _in_conditions(icat.DATA_CHECKSUM, checksums),
+                                filters=[scope]))
+    results: dict[str, list[CachedIrodsPath]] = defaultdict(list)
+    for coll_name, data_name, size, checksum in sorted(rows):
+        results[checksum].append(
+            CachedIrodsPath(session, size, True, checksum, coll_name, data_name))
+    return dict(results)
+
+
+def _checksum_type(session: Session,
+                   path: Optional[Union[str, IrodsPath]] = None) -> Optional[str]:
+    """Find the type of the checksums of the data objects in a collection.
+
+    The type is taken from the first data object with a checksum that is found, since
+    iRODS servers use the same checksum type for all data objects.
+
+    Parameters
+    ----------
+    session:
+        Session to search with.
+    path:
+        IrodsPath to the collection to search in, including its subcollections.
+        By default the home collection is searched.
+
+    Returns
+    -------
+        The type of the checksums, 'sha2' or 'md5', or None if no data object in the
+        collection has a checksum.
+
+    """
+    path = IrodsPath(session, session.home if path is None else path)
+    for scope in [icat.COLL_NAME == str(path), icat.LIKE(icat.COLL_NAME, _postfix_wildcard(path))]:
+        result = session.irods_session.query(icat.DATA_CHECKSUM).filter(
+            scope, icat.LIKE(icat.DATA_CHECKSUM, "%_")).first()
+        if result is not None:
+            return _detect_checksum(result[icat.DATA_CHECKSUM])
+    return None
+
+
 def _prefix_wildcard(pattern):
     if pattern.startswith("%"):
         return pattern
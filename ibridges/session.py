@@ -21,6 +21,7 @@ from irods.exception import (
 from irods.session import NonAnonymousLoginWithoutPassword, iRODSSession
 
 from ibridges import icat_columns as icat
+from ibridges.slow_log import _count_round_trips, get_slow_op_threshold
 from ibridges.util import open_irodsa
 
 APP_NAME = "ibridges"
@@ -50,6 +51,12 @@ class Session:  # pylint: disable=too-many-instance-attributes
         Override the home directory of irods. Otherwise attempt to retrive the value
         from the irods environment dictionary. If it is not there either, then use
         /{zone}/home/{username}.
+    slow_op_threshold:
+        Log all iBridges operations that take longer than this number of seconds
+        to the 'ibridges.slow_operations' logger, see :mod:`ibridges.slow_log`.
+        Only applies to this session; by default the threshold set with
+        :func:`ibridges.slow_log.set_slow_op_threshold` or the IBRIDGES_SLOW_OP_THRESHOLD
+        environment variable is used, and slow operations are not logged if neither is set.
 
     Raises
     ------
@@ -77,6 +84,7 @@ class Session:  # pylint: disable=too-many-instance-attributes
         password: Optional[str] = None,
         irods_home: Optional[str] = None,
         cwd: Optional[str] = None,
+        slow_op_threshold: Optional[float] = None,
     ):
         """Authenticate and connect to the iRODS server."""
         irods_env_path = None
@@ -99,6 +107,12 @@ class Session:  # pylint: disable=too-many-instance-attributes
         self._password = password
         self._irods_env: dict = irods_env
         self._irods_env_path = irods_env_path
+        # Throughput [bytes/s] of downloads per resource, used to select replicas.
+        self.resource_throughput: dict[str, float] = {}
+        # Checksum type of the server, sha2 or md5, updated when the server reports another type.
+        self.checksum_type = "sha2"
+        # Threshold [s] of the slow operation log of this session, None to use the default.
+        self.slow_op_threshold = None if slow_op_threshold is None else float(slow_op_threshold)
         self.irods_session = self.connect()
         if irods_home is not None:
             self.home = irods_home
@@ -246,11 +260,14 @@ class Session:  # pylint: disable=too-many-instance-attributes
         if self._password is None or self._password == "":
             # use cached password of .irodsA built into prc
             # print("Auth without password")
-            return self.authenticate_using_auth_file()
-
-        # irods environment and given password
-        # print("Auth with password")
-        return self.authenticate_using_password()
+            irods_session = self.authenticate_using_auth_file()
+        else:
+            # irods environment and given password
+            # print("Auth with password")
+            irods_session = self.authenticate_using_password()
+        if self.slow_op_threshold is not None or get_slow_op_threshold() is not None:
+            _count_round_trips(irods_session)
+        return irods_session
 
     def close(self):
         """Disconnect the iRODS session.
@@ -0,0 +1,151 @@
+"""Logging of slow iBridges operations.
+
+Operations that take longer than a configurable threshold are logged with their arguments,
+duration and the number of round trips to the iRODS server through the
+:code:`ibridges.slow_operations` logger. The threshold (in seconds) can be set for one session
+with the :code:`slow_op_threshold` argument of :class:`ibridges.session.Session`, or as the default
+of all sessions with :func:`set_slow_op_threshold` or the :code:`IBRIDGES_SLOW_OP_THRESHOLD`
+environment variable. By default slow operations are not logged. Round trips are only counted
+for sessions that were connected while a threshold was set.
+
+Examples
+--------
+>>> import logging
+>>> logging.basicConfig()
+>>> session = Session(irods_env_path, slow_op_threshold=0.5)
+>>> search_data(session, path_pattern="%.txt")
+WARNING:ibridges.slow_operations:Slow operation search_data(...) took 2.345s with 3 round trips.
+
+"""
+
+from __future__ import annotations
+
+import functools
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+SLOW_OP_ENV = "IBRIDGES_SLOW_OP_THRESHOLD"
+MAX_ARG_LENGTH = 200
+
+logger = logging.getLogger("ibridges.slow_operations")
+
+_round_trips = threading.local()
+
+
+def _threshold_from_env() -> Optional[float]:
+    threshold = os.environ.get(SLOW_OP_ENV, "")
+    if threshold == "":
+        return None
+    try:
+        return float(threshold)
+    except ValueError:
+        logger.warning("Ignoring %s=%s, it should be a number of seconds.", SLOW_OP_ENV, threshold)
+        return None
+
+
+_threshold: Optional[float] = _threshold_from_env()
+
+
+def set_slow_op_threshold(threshold: Optional[float]):
+    """Set the default threshold above which operations are logged.
+
+    Sessions that were created with a :code:`slow_op_threshold` use their own threshold.
+
+    Parameters
+    ----------
+    threshold:
+        Duration in seconds, None disables the slow operation log.
+
+    """
+    global _threshold  # pylint: disable=global-statement
+    _threshold = None if threshold is None else float(threshold)
+
+
+def get_slow_op_threshold() -> Optional[float]:
+    """Get the default threshold of the slow operation log in seconds."""
+    return _threshold
+
+
+def _count_round_trips(irods_session):
+    """Count the messages that are sent to the iRODS server over the connections of a session.
+
+    Only the connections of this python-irodsclient session are instrumented, so that other
+    users of the python-irodsclient in the same process are not affected. Messages are only
+    counted while an operation decorated with :func:`log_slow_operation` runs in the thread.
+    """
+    pool = irods_session.pool
+    if pool is None or getattr(pool, "_ibridges_counted", False):
+        return
+    get_connection = pool.get_connection
+
+    @functools.wraps(get_connection)
+    def _get_connection(*args, **kwargs):
+        conn = get_connection(*args, **kwargs)
+        if not getattr(conn, "_ibridges_counted", False):
+            send = conn.send
+
+            @functools.wraps(send)
+            def _counting_send(*send_args, **send_kwargs):
+                if getattr(_round_trips, "active", 0) > 0:
+                    _round_trips.count = _round_trip_count() + 1
+                return send(*send_args, **send_kwargs)
+
+            conn.send = _counting_send
+            conn._ibridges_counted = True  # pylint: disable=protected-access
+        return conn
+
+    pool.get_connection = _get_connection
+    pool._ibridges_counted = True  # pylint: disable=protected-access
+
+
+def _round_trip_count() -> int:
+    return getattr(_round_trips, "count", 0)
+
+
+def _operation_threshold(args: tuple, kwargs: dict) -> Optional[float]:
+    """Get the threshold of the session an operation is called with, or else the default."""
+    for arg in (*args, *kwargs.values()):
+        session = arg if hasattr(arg, "slow_op_threshold") else getattr(arg, "session", None)
+        threshold = getattr(session, "slow_op_threshold", None)
+        if threshold is not None:
+            return threshold
+    return _threshold
+
+
+def _format_args(args: tuple, kwargs: dict) -> str:
+    all_args = [repr(arg) for arg in args] + [f"{key}={val!r}" for key, val in kwargs.items()]
+    arg_str = ", ".join(all_args)
+    if len(arg_str) > MAX_ARG_LENGTH:
+        return arg_str[:MAX_ARG_LENGTH] + "..."
+    return arg_str
+
+
+def log_slow_operation(func):
+    """Log calls of the decorated function that exceed the slow operation threshold.
+
+    The threshold is that of the session the function is called with, directly or through
+    an argument with a session such as an :class:`ibridges.path.IrodsPath`, and otherwise
+    the default threshold. The number of round trips only includes the messages sent from
+    the calling thread, over connections of iBridges sessions.
+    """
+    @functools.wraps(func)
+    def _wrapper(*args, **kwargs):
+        threshold = _operation_threshold(args, kwargs)
+        if threshold is None:
+            return func(*args, **kwargs)
+        start_trips = _round_trip_count()
+        start = time.perf_counter()
+        _round_trips.active = getattr(_round_trips, "active", 0) + 1
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _round_trips.active -= 1
+            duration = time.perf_counter() - start
+            if duration >= threshold:
+                logger.warning("Slow operation %s(%s) took %.3fs with %d round trips.",
+                               func.__qualname__, _format_args(args, kwargs), duration,
+                               _round_trip_count() - start_trips)
+    return _wrapper
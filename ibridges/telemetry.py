@@ -0,0 +1,241 @@
+"""Per-transfer telemetry for upload and download operations.
+
+Every data transfer executed through :meth:`ibridges.executor.Operations.execute` is recorded
+in a :class:`TransferReport`. The report can be written to disk as JSON Lines or CSV for
+further analysis, and as a Prometheus textfile for the node exporter.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Union
+
+RECORD_FIELDS = [
+    "direction",
+    "source",
+    "destination",
+    "size",
+    "start",
+    "end",
+    "duration",
+    "throughput",
+    "ttfb",
+    "retries",
+    "error",
+    "worker",
+    "resource",
+]
+
+
+class TransferRecord():  # pylint: disable=too-many-instance-attributes
+    """Telemetry of the transfer of a single file or data object.
+
+    Parameters
+    ----------
+    direction:
+        One of 'upload', 'download', 'copy' or 'register'.
+    source:
+        Local path or iRODS path that is the source of the transfer.
+    destination:
+        Local path or iRODS path that is the destination of the transfer.
+    size:
+        Size of the file or data object in bytes.
+
+    """
+
+    def __init__(self, direction: str, source, destination, size: int):
+        """Start recording the transfer."""
+        self.direction = direction
+        self.source = str(source)
+        self.destination = str(destination)
+        self.size = size
+        self.start = time.time()
+        self.end: Optional[float] = None
+        self.first_byte: Optional[float] = None
+        self.retries = 0
+        self.error: Optional[str] = None
+        self.worker = threading.current_thread().name
+        self.resource: Optional[str] = None
+
+    def update(self, n_bytes: int):  # pylint: disable=unused-argument
+        """Register progress of the transfer, used to determine the time to first byte."""
+        if self.first_byte is None:
+            self.first_byte = time.time()
+
+    def finish(self, error: Optional[str] = None):
+        """Stop recording the transfer, optionally with the error that occurred."""
+        self.end = time.time()
+        if error is not None:
+            self.error = error
+
+    @property
+    def duration(self) -> Optional[float]:
+        """Duration of the transfer in seconds."""
+        if self.end is None:
+            return None
+        return self.end - self.start
+
+    @property
+    def ttfb(self) -> Optional[float]:
+        """Time to first byte in seconds, None if no progress was reported."""
+        if self.first_byte is None:
+            return None
+        return self.first_byte - self.start
+
+    @property
+    def throughput(self) -> Optional[float]:
+        """Throughput in bytes per second, None for failed or unfinished transfers."""
+        if self.error is not None or not self.duration:
+            return None
+        return self.size / self.duration
+
+    def to_dict(self) -> dict:
+        """Convert the record to a dictionary with all fields of the report."""
+        return {field: getattr(self, field) for field in RECORD_FIELDS}
+
+
+class TransferReport():
+    """Collection of transfer records with aggregate statistics.
+
+    Examples
+    --------
+    >>> ops = upload(session, "some_directory", ipath)
+    >>> ops.report.summary()
+    {'upload': {'files': 10, 'errors': 0, 'bytes': 12345, 'throughput_p50': ...}}
+    >>> ops.report.write("transfer.jsonl")
+
+    """
+
+    def __init__(self):
+        """Initialize an empty report."""
+        self.records: list[TransferRecord] = []
+        self._lock = threading.Lock()
+
+    def start(self, direction: str, source, destination, size: int) -> TransferRecord:
+        """Start a new transfer record and add it to the report."""
+        record = TransferRecord(direction, source, destination, size)
+        with self._lock:
+            self.records.append(record)
+        return record
+
+    def summary(self) -> dict:
+        """Compute aggregate statistics per direction.
+
+        Returns
+        -------
+            Dictionary with for each direction the number of files, errors and bytes
+            transferred, and the 50th and 95th percentile of the throughput [bytes/s]
+            and the time to first byte [s].
+
+        """
+        summary: dict = {}
+        for direction in sorted(set(rec.direction for rec in self.records)):
+            records = [rec for rec in self.records if rec.direction == direction]
+            throughput = [rec.throughput for rec in records if rec.throughput is not None]
+            ttfb = [rec.ttfb for rec in records if rec.ttfb is not None and rec.error is None]
+            summary[direction] = {
+                "files": len(records),
+                "errors": sum(rec.error is not None for rec in records),
+                "bytes": sum(rec.size for rec in records if rec.error is None),
+                "throughput_p50": percentile(throughput, 50),
+                "throughput_p95": percentile(throughput, 95),
+                "ttfb_p50": percentile(ttfb, 50),
+                "ttfb_p95": percentile(ttfb, 95),
+            }
+        return summary
+
+    def write(self, report_fp: Union[str, Path]):
+        """Write all transfer records to a file.
+
+        Parameters
+        ----------
+        report_fp:
+            File to write the records to. If the suffix is '.csv', the records are
+            written in CSV format, otherwise as JSON Lines.
+
+        """
+        with open(report_fp, "w", encoding="utf-8", newline="") as handle:
+            if Path(report_fp).suffix.lower() == ".csv":
+                writer = csv.DictWriter(handle, fieldnames=RECORD_FIELDS)
+                writer.writeheader()
+                for rec in self.records:
+                    writer.writerow(rec.to_dict())
+            else:
+                for rec in self.records:
+                    handle.write(json.dumps(rec.to_dict()) + "\n")
+
+    def write_prometheus(self, prom_fp: Union[str, Path]):
+        """Write the aggregate statistics as a Prometheus textfile.
+
+        The file is written atomically, so that the node exporter never reads
+        a partially written file.
+
+        Parameters
+        ----------
+        prom_fp:
+            Destination file, which should have the '.prom' suffix for the node exporter.
+
+        """
+        metrics = {
+            "files": ("Number of transferred files in the last run.", "files"),
+            "errors": ("Number of failed transfers in the last run.", "errors"),
+            "bytes": ("Number of bytes transferred in the last run.", "bytes"),
+        }
+        quantile_metrics = {
+            "throughput_bytes_per_second": "Throughput of single transfers in the last run.",
+            "time_to_first_byte_seconds": "Time to first byte of single transfers in the last run.",
+        }
+        summary = self.summary()
+        lines = []
+        for name, (help_str, key) in metrics.items():
+            lines.append(f"# HELP ibridges_transfer_{name} {help_str}")
+            lines.append(f"# TYPE ibridges_transfer_{name} gauge")
+            for direction, stats in summary.items():
+                lines.append(f'ibridges_transfer_{name}{{direction="{direction}"}} {stats[key]}')
+        for (name, help_str), key in zip(quantile_metrics.items(), ["throughput", "ttfb"]):
+            lines.append(f"# HELP ibridges_transfer_{name} {help_str}")
+            lines.append(f"# TYPE ibridges_transfer_{name} gauge")
+            for direction, stats in summary.items():
+                for quantile in ["50", "95"]:
+                    value = stats[f"{key}_p{quantile}"]
+                    if value is not None:
+                        lines.append(f'ibridges_transfer_{name}{{direction="{direction}",'
+                                     f'quantile="0.{quantile}"}} {value}')
+        lines.append("# HELP ibridges_transfer_last_run_timestamp_seconds "
+                     "Time at which the last run finished.")
+        lines.append("# TYPE ibridges_transfer_last_run_timestamp_seconds gauge")
+        lines.append(f"ibridges_transfer_last_run_timestamp_seconds {time.time()}")
+
+        temp_fp = Path(str(prom_fp) + ".tmp")
+        with open(temp_fp, "w", encoding="utf-8") as handle:
+            handle.write("\n".join(lines) + "\n")
+        os.replace(temp_fp, prom_fp)
+
+
+def percentile(values: list[float], perc: float) -> Optional[float]:
+    """Compute the percentile of a list of values with linear interpolation.
+
+    Parameters
+    ----------
+    values:
+        Values to compute the percentile for.
+    perc:
+        Percentile between 0 and 100.
+
+    Returns
+    -------
+        The percentile, or None if there are no values.
+
+    """
+    if len(values) == 0:
+        return None
+    sorted_values = sorted(values)
+    pos = (len(sorted_values) - 1) * perc / 100
+    low = int(pos)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (pos - low)
@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
+import time
 from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime
 from typing import Iterable, Optional, Union
 
@@ -10,10 +12,12 @@ import irods.ticket
 from irods.models import TicketQuery
 
 import ibridges.icat_columns as icat
-from ibridges.path import IrodsPath
+from ibridges.path import IrodsPath, _in_conditions, _query_rows
 from ibridges.session import Session
+from ibridges.slow_log import log_slow_operation
 
 TicketData = namedtuple("TicketData", ["name", "type", "path", "expiration_date"])
+TICKET_CACHE_TTL = 30  # Seconds that the list of tickets is reused before it is fetched again.
 
 
 class Tickets:
@@ -27,12 +31,18 @@ class Tickets:
     ----------
     session:
         Session connecting to the iRODS server.
+    cache_ttl:
+        Number of seconds that the tickets are cached for :code:`all_ticket_strings`,
+        :code:`get_ticket` and :code:`clear`. Tickets created or deleted with this object are
+        always taken into account, tickets changed elsewhere after at most this time.
 
     """  # noqa: D403
 
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, cache_ttl: float = TICKET_CACHE_TTL):
         """Initialize for ticket operations."""
         self.session = session
+        self.cache_ttl = cache_ttl
+        self._fetch_time: Optional[float] = None
         self._all_tickets = self.fetch_tickets()
 
     def create_ticket(
@@ -68,6 +78,53 @@ class Tickets:
             (str, bool)
 
         """
+        try:
+            return self._create_ticket(irods_path, ticket_type, expiry_date)
+        finally:
+            self._fetch_time = None
+
+    def create_tickets(
+        self,
+        irods_paths: Iterable[Union[str, IrodsPath]],
+        ticket_type: str = "read",
+        expiry_date: Optional[Union[str, datetime, date]] = None,
+        workers: int = 4,
+    ) -> list[tuple]:
+        """Create iRODS tickets for multiple collections or data objects concurrently.
+
+        Parameters
+        ----------
+        irods_paths:
+            Collection or data object paths to create a ticket for.
+        ticket_type, optional:
+            read or write, default read
+        expiry_date, optional:
+            Expiration date as a datetime, date or string in the form strftime('%Y-%m-%d.%H:%M:%S').
+        workers, optional:
+            Number of tickets that are created at the same time, by default 4.
+
+        Raises
+        ------
+        TypeError:
+            If the expiry_date has the wrong type.
+        ValueError:
+            If the expiration date cannot be set for whatever reason.
+
+        Returns
+        -------
+            Name of ticket and if expiration string successfully set for each of the paths,
+            in the same order.
+
+        """
+        try:
+            with ThreadPoolExecutor(max(workers, 1)) as pool:
+                return list(pool.map(
+                    lambda ipath: self._create_ticket(ipath, ticket_type, expiry_date),
+                    irods_paths))
+        finally:
+            self._fetch_time = None
+
+    def _create_ticket(self, irods_path, ticket_type, expiry_date) -> tuple:
         ticket = irods.ticket.Ticket(self.session.irods_session)
         ticket.issue(ticket_type, str(irods_path))
         expiration_set = False
@@ -84,9 +141,8 @@ class Tickets:
             try:
                 expiration_set = ticket.modify("expire", expiry_date) == ticket
             except Exception as error:
-                self.delete_ticket(ticket)
+                ticket.delete()
                 raise ValueError("Could not set expiration date") from error
-        self.fetch_tickets()
         return ticket.ticket, expiration_set
 
     def __iter__(self) -> Iterable[TicketData]:
@@ -96,7 +152,12 @@ class Tickets:
     @property
     def all_ticket_strings(self) -> list[str]:
         """Get the names of all tickets."""
-        return [tick_data.name for tick_data in self._all_tickets]
+        return [tick_data.name for tick_data in self._cached_tickets()]
+
+    def _cached_tickets(self) -> list[TicketData]:
+        if self._fetch_time is None or time.monotonic() - self._fetch_time > self.cache_ttl:
+            return self.fetch_tickets()
+        return self._all_tickets
 
     def get_ticket(self, ticket_str: str) -> irods.ticket.Ticket:
         """Obtain a ticket using its string identifier.
@@ -142,12 +203,45 @@ class Tickets:
         """
         if isinstance(ticket, str):
             ticket = self.get_ticket(ticket)
-        if ticket.string in self.all_ticket_strings:
-            ticket.delete()
-            self.fetch_tickets()
-        elif check:
-            raise KeyError(f"Cannot delete ticket: ticket '{ticket}' does not exist (anymore).")
+        self.delete_tickets([ticket], check=check, workers=1)
+
+    def delete_tickets(self, tickets: Iterable[Union[str, irods.ticket.Ticket]],
+                       check: bool = False, workers: int = 4):
+        """Delete multiple iRODS tickets concurrently.
+
+        Parameters
+        ----------
+        tickets:
+            Tickets or ticket string identifiers to be deleted.
+        check:
+            Whether to check whether the tickets actually exist.
+        workers, optional:
+            Number of tickets that are deleted at the same time, by default 4.
+
+        Raises
+        ------
+        KeyError:
+            If check == True and one of the tickets does not exist.
 
+        """
+        existing = set(self.all_ticket_strings)
+        to_delete = []
+        for ticket in tickets:
+            ticket_str = ticket if isinstance(ticket, str) else ticket.string
+            if ticket_str in existing:
+                to_delete.append(irods.ticket.Ticket(self.session.irods_session,
+                                                     ticket=ticket_str))
+            elif check:
+                raise KeyError(f"Cannot delete ticket: ticket '{ticket}' does not exist (anymore).")
+        if len(to_delete) == 0:
+            return
+        try:
+            with ThreadPoolExecutor(max(min(workers, len(to_delete)), 1)) as pool:
+                list(pool.map(lambda ticket: ticket.delete(), to_delete))
+        finally:
+            self._fetch_time = None
+
+    @log_slow_operation
     def fetch_tickets(self) -> list[TicketData]:
         """Retrieve all tickets and their metadata belonging to the user.
 
@@ -163,32 +257,39 @@ class Tickets:
 
         """
         user = self.session.username
-        self._all_tickets = []
-        for row in self.session.irods_session.query(TicketQuery.Ticket).filter(
+        rows = list(self.session.irods_session.query(TicketQuery.Ticket).filter(
             TicketQuery.Owner.name == user
-        ):
-            time = row[TicketQuery.Ticket.expiry_ts]
-            time_stamp = datetime.fromtimestamp(int(time)) if time else ""
+        ))
+        id_paths = self._ids_to_paths([str(row[TicketQuery.Ticket.object_id]) for row in rows])
+        self._all_tickets = []
+        for row in rows:
+            expiry = row[TicketQuery.Ticket.expiry_ts]
+            time_stamp = datetime.fromtimestamp(int(expiry)) if expiry else ""
             self._all_tickets.append(
                 TicketData(
                     row[TicketQuery.Ticket.string],
                     row[TicketQuery.Ticket.type],
                     IrodsPath(self.session,
-                              self._id_to_path(str(row[TicketQuery.Ticket.object_id]))),
+                              id_paths.get(str(row[TicketQuery.Ticket.object_id]), "")),
                     time_stamp,
                 )
             )
+        self._fetch_time = time.monotonic()
         return self._all_tickets
 
-    def clear(self):
+    def clear(self, workers: int = 4):
         """Delete all tickets.
 
         This revokes all access to data objects and collections that was
         granted through these tickets.
+
+        Parameters
+        ----------
+        workers, optional:
+            Number of tickets that are deleted at the same time, by default 4.
+
         """
-        for tick_data in self.fetch_tickets():
-            self.delete_ticket(tick_data.name)
-        self.fetch_tickets()
+        self.delete_tickets(self.all_ticket_strings, workers=workers)
 
     def _id_to_path(self, itemid: str) -> str:
         """Get an iRODS path from a given an iRODS item id.
@@ -209,15 +310,28 @@ class Tickets:
             returns '' if the identifier does not exist any longer
 
         """
-        data_query = self.session.irods_session.query(icat.COLL_NAME, icat.DATA_NAME)
-        data_query = data_query.filter(icat.DATA_ID == itemid)
-
-        if len(list(data_query)) > 0:
-            res = next(data_query.get_results())
-            return list(res.values())[0] + "/" + list(res.values())[1]
-        coll_query = self.session.irods_session.query(icat.COLL_NAME)
-        coll_query = coll_query.filter(icat.COLL_ID == itemid)
-        if len(list(coll_query)) > 0:
-            res = next(coll_query.get_results())
-            return list(res.values())[0]
-        return ""
+        return self._ids_to_paths([itemid]).get(itemid, "")
+
+    def _ids_to_paths(self, itemids: list[str]) -> dict[str, str]:
+        """Get the iRODS paths for iRODS item ids with as few queries as possible.
+
+        The ids are first looked up as data objects and the remaining ones as
+        collections, each with queries for up to IN_QUERY_CHUNK ids at a time.
+        Ids that do not exist any longer are left out.
+        """
+        itemids = sorted(set(itemids))
+        if len(itemids) == 0:
+            return {}
+        id_paths = {
+            str(data_id): f"{coll_name}/{data_name}"
+            for data_id, coll_name, data_name in _query_rows(
+                self.session, (icat.DATA_ID, icat.COLL_NAME, icat.DATA_NAME),
+                _in_conditions(icat.DATA_ID, itemids))
+        }
+        coll_ids = [itemid for itemid in itemids if itemid not in id_paths]
+        if len(coll_ids) > 0:
+            id_paths.update(
+                (str(coll_id), coll_name) for coll_id, coll_name in _query_rows(
+                    self.session, (icat.COLL_ID, icat.COLL_NAME),
+                    _in_conditions(icat.COLL_ID, coll_ids)))
+        return id_paths
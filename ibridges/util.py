@@ -4,11 +4,13 @@ from __future__ import annotations
 
 import base64
 import contextlib
+import mmap
 import os
+import threading
 from collections.abc import Sequence
 from hashlib import md5, sha256
 from pathlib import Path
-from typing import Union
+from typing import Optional, Union
 
 import irods
 
@@ -16,6 +18,8 @@ from ibridges.path import IrodsPath
 
 DEFAULT_IENV_PATH = Path.home() / ".irods" / "irods_environment.json"
 DEFAULT_IRODSA_PATH = Path.home() / ".irods" / ".irodsA"
+# Operation type of a put, which triggers the put policies (acPostProcForPut) on the server.
+PUT_OPR = 1
 
 try:
     from importlib_metadata import entry_points
@@ -157,7 +161,151 @@ def find_environment_provider(env_providers: list, server_name: str) -> object:
     )
 
 
-def calc_checksum(filepath: Union[Path, str, IrodsPath], checksum_type="sha2"):
+CHECKSUM_BUFFER_SIZE = 1024**2
+CHECKSUM_CACHE_SIZE = 100000
+CHECKSUM_TYPES = ("sha2", "md5")
+
+
+class ChecksumCache():
+    """Checksums of local files that were computed before.
+
+    A checksum is only reused if the size and modification time of the file have not changed
+    since it was computed. The cache is shared by all threads, and the oldest checksums are
+    forgotten when it is full. The cache also remembers which checksum types are in use, so
+    that all of them can be computed when a file is read.
+
+    Parameters
+    ----------
+    max_size:
+        Maximum number of checksums to remember.
+
+    """
+
+    def __init__(self, max_size: int = CHECKSUM_CACHE_SIZE):
+        """Initialize an empty cache."""
+        self.max_size = max_size
+        self._checksums: dict[tuple[str, str], tuple[int, int, str]] = {}
+        self._types: set[str] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def checksum_types(self) -> list[str]:
+        """Types of the checksums that were stored, sorted by name."""
+        with self._lock:
+            return sorted(self._types)
+
+    def get(self, path: Union[str, Path], checksum_type: str = "sha2") -> Optional[str]:
+        """Get the checksum of a local file if it is known and the file has not changed.
+
+        Parameters
+        ----------
+        path:
+            Path to the local file.
+        checksum_type:
+            Type of the checksum, sha2 or md5.
+
+        Returns
+        -------
+            The checksum, or None if it is not in the cache or the file has changed.
+
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        with self._lock:
+            entry = self._checksums.get((os.path.abspath(path), checksum_type))
+        if entry is None or entry[:2] != (stat.st_size, stat.st_mtime_ns):
+            return None
+        return entry[2]
+
+    def store(self, path: Union[str, Path], checksum: str,
+              stat: Optional[os.stat_result] = None):
+        """Remember the checksum of a local file.
+
+        Parameters
+        ----------
+        path:
+            Path to the local file.
+        checksum:
+            Checksum of the file, in the format of :func:`calc_checksum`.
+        stat:
+            Status of the file when the checksum was computed, by default the current status.
+
+        """
+        stat = os.stat(path) if stat is None else stat
+        key = (os.path.abspath(path), _detect_checksum(checksum))
+        with self._lock:
+            self._types.add(key[1])
+            self._checksums.pop(key, None)
+            while len(self._checksums) >= self.max_size > 0:
+                self._checksums.pop(next(iter(self._checksums)))
+            self._checksums[key] = (stat.st_size, stat.st_mtime_ns, checksum)
+
+    def clear(self):
+        """Forget all checksums."""
+        with self._lock:
+            self._checksums.clear()
+            self._types.clear()
+
+
+CHECKSUM_CACHE = ChecksumCache()
+
+
+class HashingTee():
+    """File object that computes the checksum of all data read from or written to it.
+
+    This is used to compute the checksum of a local file while it is transferred,
+    so that the file does not need to be read a second time to verify the transfer.
+
+    Parameters
+    ----------
+    fileobj:
+        File object to read from or write to.
+    checksum_type:
+        Checksum type to calculate, sha2 or md5.
+
+    Examples
+    --------
+    >>> with open("some_file.txt", "rb") as handle:
+    >>>     tee = HashingTee(handle)
+    >>>     data = tee.read()
+    >>> tee.checksum
+    'sha2:XGiECYZOtUfP9lnCGyZaBBkBGLaJJw1p6eoc0GxLeKU='
+
+    """
+
+    def __init__(self, fileobj, checksum_type: str = "sha2"):
+        """Wrap the file object with an empty hash."""
+        self.fileobj = fileobj
+        self.checksum_type = checksum_type
+        self._hash = _new_hash(checksum_type)
+
+    def read(self, size: int = -1) -> bytes:
+        """Read from the file object and add the data to the checksum."""
+        data = self.fileobj.read(size)
+        self._hash.update(data)
+        return data
+
+    def readinto(self, buffer) -> int:
+        """Read into a buffer and add the data to the checksum."""
+        n_read = self.fileobj.readinto(buffer)
+        self._hash.update(memoryview(buffer)[:n_read])
+        return n_read
+
+    def write(self, data) -> int:
+        """Write to the file object and add the data to the checksum."""
+        self._hash.update(data)
+        return self.fileobj.write(data)
+
+    @property
+    def checksum(self) -> str:
+        """Checksum of the data so far, in the format of :func:`calc_checksum`."""
+        return _format_checksum(self._hash, self.checksum_type)
+
+
+def calc_checksum(filepath: Union[Path, str, IrodsPath], checksum_type="sha2",
+                  use_cache: bool = True):
     """Calculate the checksum for an iRODS dataobject or local file.
 
     Parameters
@@ -168,6 +316,12 @@ def calc_checksum(filepath: Union[Path, str, IrodsPath], checksum_type="sha2"):
     checksum_type:
         Checksum type to calculate, only sha2 and md5 are currently supported.
         Ignored for IrodsPath's, since that is configured by the server.
+    use_cache:
+        Whether to reuse the checksum of a local file that was computed before, for
+        example during its transfer, if the file has not changed since. If the file
+        has to be read, the checksums of the other types that are in the cache are computed
+        in the same pass, so that comparisons with servers that use another checksum type
+        do not read the file again.
 
     Returns
     -------
@@ -176,14 +330,101 @@ def calc_checksum(filepath: Union[Path, str, IrodsPath], checksum_type="sha2"):
     """
     if isinstance(filepath, IrodsPath):
         return filepath.checksum
-    if checksum_type == "sha2":
-        f_hash = sha256()
-    else:
-        f_hash = md5()
-    memv = memoryview(bytearray(128 * 1024))
+    if not use_cache:
+        return calc_checksums(filepath, (checksum_type,), use_cache=False)[checksum_type]
+    checksum = CHECKSUM_CACHE.get(filepath, checksum_type)
+    if checksum is not None:
+        return checksum
+    checksum_types = [checksum_type] + [other for other in CHECKSUM_CACHE.checksum_types
+                                        if other != checksum_type]
+    return calc_checksums(filepath, checksum_types)[checksum_type]
+
+
+def calc_checksums(filepath: Union[Path, str], checksum_types: Sequence[str] = CHECKSUM_TYPES,
+                   use_cache: bool = True) -> dict[str, str]:
+    """Calculate several checksums of a local file, reading the file only once.
+
+    This is useful when a file is compared with data objects on servers that use different
+    checksum types. All computed checksums are cached, so that later calls to
+    :func:`calc_checksum` with any of the types do not read the file again.
+
+    Parameters
+    ----------
+    filepath:
+        Local path to compute the checksums for.
+    checksum_types:
+        Checksum types to calculate, sha2 and/or md5.
+    use_cache:
+        Whether to reuse checksums that were computed before, if the file has not changed since.
+
+    Returns
+    -------
+        Dictionary with the checksum for each type, in the format of :func:`calc_checksum`.
+
+    Examples
+    --------
+    >>> calc_checksums("some_file.txt")
+    {'sha2': 'sha2:ungWv48Bz+pBQUDeXa4iI7ADYaOWF3qctBD/YfIAFa0=',
+     'md5': '900150983cd24fb0d6963f7d28e17f72'}
+
+    """
+    checksums = {}
+    if use_cache:
+        for checksum_type in checksum_types:
+            checksum = CHECKSUM_CACHE.get(filepath, checksum_type)
+            if checksum is not None:
+                checksums[checksum_type] = checksum
+    missing = [checksum_type for checksum_type in checksum_types
+               if checksum_type not in checksums]
+    if not missing:
+        return checksums
+    hashes = [_new_hash(checksum_type) for checksum_type in missing]
     with open(filepath, "rb", buffering=0) as file:
-        for item in iter(lambda: file.readinto(memv), 0):
-            f_hash.update(memv[:item])
+        stat = os.fstat(file.fileno())
+        for chunk in _read_chunks(file, stat.st_size):
+            for f_hash in hashes:
+                f_hash.update(chunk)
+    for checksum_type, f_hash in zip(missing, hashes):
+        checksums[checksum_type] = _format_checksum(f_hash, checksum_type)
+        CHECKSUM_CACHE.store(filepath, checksums[checksum_type], stat)
+    return checksums
+
+
+_BUFFERS = threading.local()
+
+
+def _read_chunks(file, size: int):
+    """Yield the content of a file in chunks of at most CHECKSUM_BUFFER_SIZE bytes.
+
+    Files larger than the buffer are memory mapped, which avoids copying the data. Otherwise,
+    or if the file cannot be mapped, the data is read into a buffer that is reused by the
+    calculations in the same thread. The chunks are only valid until the next one is yielded.
+    """
+    if size > CHECKSUM_BUFFER_SIZE:
+        try:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            mapped = None
+        if mapped is not None:
+            with mapped, memoryview(mapped) as mapped_view:
+                for start in range(0, len(mapped_view), CHECKSUM_BUFFER_SIZE):
+                    with mapped_view[start:start + CHECKSUM_BUFFER_SIZE] as chunk:
+                        yield chunk
+            return
+    memv = getattr(_BUFFERS, "memv", None)
+    if memv is None:
+        memv = _BUFFERS.memv = memoryview(bytearray(CHECKSUM_BUFFER_SIZE))
+    for item in iter(lambda: file.readinto(memv), 0):
+        yield memv[:item]
+
+
+def _new_hash(checksum_type: str):
+    if checksum_type == "sha2":
+        return sha256()
+    return md5()
+
+
+def _format_checksum(f_hash, checksum_type: str) -> str:
     if checksum_type == "md5":
         return f"{f_hash.hexdigest()}"
     return f"sha2:{str(base64.b64encode(f_hash.digest()), encoding='utf-8')}"
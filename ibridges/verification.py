@@ -0,0 +1,221 @@
+"""Verification that a local copy matches the data on the iRODS server.
+
+A dry run of :func:`ibridges.data_operations.sync` compares the files one at a time. To verify
+a large local copy, :func:`verify` instead retrieves the sizes and checksums of all data objects
+in the subtree with a single query, scans the local directory tree with parallel workers,
+and only computes the checksums of files of which the size matches, also in parallel.
+The result lists all differences in a machine-readable form.
+"""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path, PurePosixPath
+from typing import Optional, Union
+
+from ibridges import icat_columns as icat
+from ibridges.exception import DoesNotExistError
+from ibridges.path import IrodsPath, _partition_conditions, _query_rows
+from ibridges.util import _detect_checksum, calc_checksum
+
+NUM_THREADS = 4
+
+
+class VerificationResult():
+    """Differences between a local directory or file and an iRODS collection or data object.
+
+    Paths are relative to the verified directory and collection, in POSIX format.
+
+    Attributes
+    ----------
+    missing:
+        Data objects without a local file.
+    extra:
+        Local files without a data object.
+    size_mismatch:
+        Paths with the local size and the size of the data object, if they differ.
+    checksum_mismatch:
+        Paths with the local checksum and the checksum of the data object, if they differ.
+    matched:
+        Number of files that are equal to their data object.
+
+    """
+
+    def __init__(self):
+        """Initialize without any differences."""
+        self.missing: list[str] = []
+        self.extra: list[str] = []
+        self.size_mismatch: list[tuple[str, int, int]] = []
+        self.checksum_mismatch: list[tuple[str, str, str]] = []
+        self.matched = 0
+
+    @property
+    def ok(self) -> bool:
+        """Whether the local copy is equal to the data on the server."""
+        return (len(self.missing) + len(self.extra) + len(self.size_mismatch)
+                + len(self.checksum_mismatch)) == 0
+
+    def differences(self) -> list[dict]:
+        """List all differences, one dictionary for each path.
+
+        Returns
+        -------
+            Dictionaries with the 'status' ('missing', 'extra', 'size_mismatch' or
+            'checksum_mismatch') and 'path', and for mismatches the 'local' and 'remote'
+            size or checksum.
+
+        """
+        diffs: list[dict] = [{"status": "missing", "path": path} for path in self.missing]
+        diffs.extend({"status": "extra", "path": path} for path in self.extra)
+        diffs.extend({"status": "size_mismatch", "path": path, "local": local, "remote": remote}
+                     for path, local, remote in self.size_mismatch)
+        diffs.extend({"status": "checksum_mismatch", "path": path, "local": local,
+                      "remote": remote} for path, local, remote in self.checksum_mismatch)
+        return diffs
+
+    def to_dict(self) -> dict:
+        """Convert the result to a dictionary that can be written as JSON."""
+        return {"ok": self.ok, "matched": self.matched, "differences": self.differences()}
+
+
+def verify(
+    local_path: Union[str, Path],
+    irods_path: IrodsPath,
+    workers: int = NUM_THREADS,
+    compute_missing: bool = True,
+) -> VerificationResult:
+    """Verify that a local directory or file is equal to an iRODS collection or data object.
+
+    The local directory corresponds to the collection itself, so that the files in the
+    directory are compared with the data objects in the collection.
+
+    Parameters
+    ----------
+    local_path:
+        Local directory or file to verify.
+    irods_path:
+        Collection or data object to compare with.
+    workers:
+        Number of parallel workers to scan the local directory tree and compute checksums.
+    compute_missing:
+        Compute the checksums of data objects that do not have one on the server.
+        Otherwise, such data objects are compared only by size.
+
+    Returns
+    -------
+        The differences between the local copy and the data on the server.
+
+    Raises
+    ------
+    DoesNotExistError:
+        If the irods_path does not exist.
+    FileNotFoundError:
+        If the local_path does not exist.
+
+    Examples
+    --------
+    >>> result = verify("some_local_dir", IrodsPath(session, "~/some_collection"), workers=8)
+    >>> result.ok
+    True
+
+    """
+    local_path = Path(local_path)
+    if not local_path.exists():
+        raise FileNotFoundError(f"Cannot verify {local_path}: file or directory does not exist.")
+    base_path, remote = _remote_objects(irods_path)
+    if local_path.is_dir():
+        local = _scan_local(local_path, workers)
+    else:
+        local = {irods_path.name: local_path.stat().st_size}
+
+    def _local_file(rel_path: str) -> Path:
+        if local_path.is_dir():
+            return local_path.joinpath(*PurePosixPath(rel_path).parts)
+        return local_path
+
+    result = VerificationResult()
+    result.missing = sorted(set(remote) - set(local))
+    result.extra = sorted(set(local) - set(remote))
+    compared = []
+    for rel_path in sorted(set(local) & set(remote)):
+        remote_size, remote_checksum = remote[rel_path]
+        if local[rel_path] != remote_size:
+            result.size_mismatch.append((rel_path, local[rel_path], remote_size))
+        else:
+            compared.append((rel_path, remote_checksum))
+
+    def _compare(rel_path: str, remote_checksum: Optional[str]) -> Optional[tuple[str, str]]:
+        if not remote_checksum:
+            if not compute_missing:
+                return None
+            remote_checksum = irods_path.session.irods_session.data_objects.chksum(
+                str(base_path.joinpath(*PurePosixPath(rel_path).parts)))
+        local_checksum = calc_checksum(_local_file(rel_path),
+                                       checksum_type=_detect_checksum(remote_checksum))
+        if local_checksum != remote_checksum:
+            return local_checksum, remote_checksum
+        return None
+
+    with ThreadPoolExecutor(max(workers, 1)) as pool:
+        mismatches = list(pool.map(_compare, *zip(*compared))) if compared else []
+    for (rel_path, _), mismatch in zip(compared, mismatches):
+        if mismatch is None:
+            result.matched += 1
+        else:
+            result.checksum_mismatch.append((rel_path, *mismatch))
+    return result
+
+
+def _remote_objects(irods_path: IrodsPath
+                    ) -> tuple[IrodsPath, dict[str, tuple[int, Optional[str]]]]:
+    """Get the sizes and checksums of the data objects, relative to the returned base path."""
+    if irods_path.dataobject_exists():
+        conditions = [icat.COLL_NAME == str(irods_path.parent)]
+        filters = [icat.DATA_NAME == irods_path.name]
+        base_path = irods_path.parent
+    elif irods_path.collection_exists():
+        conditions = _partition_conditions(str(irods_path), True)
+        filters = None
+        base_path = irods_path
+    else:
+        raise DoesNotExistError(f"Data object or collection not found: '{irods_path}'")
+    remote: dict[str, tuple[int, Optional[str]]] = {}
+    for coll_name, data_name, size, checksum in _query_rows(
+            irods_path.session, (icat.COLL_NAME, icat.DATA_NAME, icat.DATA_SIZE,
+                                 icat.DATA_CHECKSUM), conditions, filters):
+        rel_path = PurePosixPath(coll_name, data_name).relative_to(str(base_path)).as_posix()
+        prev_checksum = remote[rel_path][1] if rel_path in remote else None
+        remote[rel_path] = (int(size), prev_checksum or checksum or None)
+    return base_path, remote
+
+
+def _scan_local(root: Path, workers: int) -> dict[str, int]:
+    """Get the sizes of all files in a directory tree, scanning subdirectories in parallel.
+
+    Symbolic links are ignored, as they are for transfers.
+    """
+    sizes: dict[str, int] = {}
+    subdirs = []
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_symlink():
+                continue
+            if entry.is_dir():
+                subdirs.append(Path(entry.path))
+            elif entry.is_file():
+                sizes[entry.name] = entry.stat().st_size
+
+    def _scan(subdir: Path) -> dict[str, int]:
+        sub_sizes = {}
+        for dirpath, _, filenames in os.walk(subdir):
+            for filename in filenames:
+                lpath = Path(dirpath, filename)
+                if not lpath.is_symlink():
+                    sub_sizes[lpath.relative_to(root).as_posix()] = lpath.stat().st_size
+        return sub_sizes
+
+    with ThreadPoolExecutor(max(workers, 1)) as pool:
+        for sub_sizes in pool.map(_scan, subdirs):
+            sizes.update(sub_sizes)
+    return sizes
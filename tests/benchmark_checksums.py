@@ -0,0 +1,58 @@
+"""Benchmark the throughput of local checksum calculations.
+
+Compares the single-digest 128 KiB readinto loop that was used before with
+:func:`ibridges.util.calc_checksums`, for one and for both checksum types.
+Run with: python tests/benchmark_checksums.py [size in MiB]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from ibridges.util import _format_checksum, _new_hash, calc_checksums
+
+
+def readinto_loop(filepath, checksum_type):
+    f_hash = _new_hash(checksum_type)
+    memv = memoryview(bytearray(128 * 1024))
+    with open(filepath, "rb", buffering=0) as file:
+        for item in iter(lambda: file.readinto(memv), 0):
+            f_hash.update(memv[:item])
+    return _format_checksum(f_hash, checksum_type)
+
+
+def throughput(func, size, repeat=3):
+    best = min(_timed(func) for _ in range(repeat))
+    return size / best / 1e6
+
+
+def _timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main(size_mb=256):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        lpath = Path(tmp_dir, "data.bin")
+        with open(lpath, "wb") as handle:
+            for _ in range(size_mb):
+                handle.write(os.urandom(1024**2))
+        size = lpath.stat().st_size
+        assert calc_checksums(lpath, use_cache=False) == {
+            "sha2": readinto_loop(lpath, "sha2"), "md5": readinto_loop(lpath, "md5")}
+        cases = {
+            "readinto 128 KiB, sha2": lambda: readinto_loop(lpath, "sha2"),
+            "calc_checksums, sha2": lambda: calc_checksums(lpath, ["sha2"], use_cache=False),
+            "readinto 128 KiB, sha2 + md5": lambda: (readinto_loop(lpath, "sha2"),
+                                                     readinto_loop(lpath, "md5")),
+            "calc_checksums, sha2 + md5": lambda: calc_checksums(lpath, use_cache=False),
+        }
+        for name, func in cases.items():
+            print(f"{name:30} {throughput(func, size):8.0f} MB/s")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,75 @@
+"""Fake session and queries shared by the unit tests, which do not need an iRODS server."""
+
+import pytest
+
+import ibridges.path
+from ibridges import bulk, data_operations, search, tickets, verification
+
+QUERY_MODULES = [ibridges.path, bulk, data_operations, search, tickets, verification]
+
+
+class FakeDataObjects():
+    """Data objects of which the checksums are computed by the server."""
+
+    def __init__(self):
+        self.checksum = "sha2:new"
+        self.computed = []
+
+    def chksum(self, path):
+        self.computed.append(path)
+        return self.checksum
+
+
+class FakeIrodsSession():
+    def __init__(self):
+        self.data_objects = FakeDataObjects()
+
+
+class FakeSession():
+    """Session of a user with the home collection /zone/home/user."""
+
+    username = "user"
+    cwd = "/zone/home/user"
+    home = "/zone/home/user"
+
+    def __init__(self):
+        self.irods_session = FakeIrodsSession()
+        self.resource_throughput = {}
+
+    def close(self):
+        pass
+
+
+class FakeQuery():
+    """Replaces the general queries, recording them and returning the rows of the test.
+
+    The rows are either a list that is returned for every query with conditions, or a
+    function of the columns, one condition and the filters, which is called for each condition.
+    """
+
+    def __init__(self):
+        self.queries = []
+        self.rows = []
+
+    def __call__(self, session, columns, conditions, filters=None):
+        self.queries.append((columns, conditions, filters))
+        if not callable(self.rows):
+            return list(self.rows) if conditions else []
+        return [row for cond in conditions for row in self.rows(columns, cond, filters)]
+
+    @property
+    def n_conditions(self):
+        return sum(len(conditions) for _, conditions, _ in self.queries)
+
+
+@pytest.fixture
+def session():
+    return FakeSession()
+
+
+@pytest.fixture
+def fake_query(monkeypatch):
+    query = FakeQuery()
+    for module in QUERY_MODULES:
+        monkeypatch.setattr(module, "_query_rows", query)
+    return query
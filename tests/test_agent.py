@@ -0,0 +1,78 @@
+import socket
+import tempfile
+import threading
+from pathlib import Path
+
+import pytest
+
+from ibridges.cli import agent
+from ibridges.cli.agent import Agent, run_in_agent
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Needs Unix sockets")
+
+
+def test_agent_commands():
+    from ibridges.cli.__main__ import BUILTIN_COMMANDS
+
+    for name, location in agent.AGENT_COMMANDS.items():
+        assert BUILTIN_COMMANDS[name] == location
+
+
+def test_agent(monkeypatch, capsys, session):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        socket_path = Path(tmpdir, "agent.sock")
+        # The agent is started in the background if it is not running.
+        started = []
+        monkeypatch.setattr(agent, "start_agent", started.append)
+        assert run_in_agent(["pwd"], socket_path) is None
+        assert started == [socket_path]
+
+        server = Agent(socket_path, idle_timeout=10)
+        monkeypatch.setattr(server, "_get_session", lambda: session)
+        thread = threading.Thread(target=server.serve)
+        thread.start()
+        try:
+            while not socket_path.exists():
+                thread.join(0.01)
+            assert run_in_agent(["pwd"], socket_path) == 0
+            assert capsys.readouterr().out == "/zone/home/user\n"
+            assert run_in_agent(["pwd", "--unknown"], socket_path) == 2
+            assert "unrecognized arguments" in capsys.readouterr().err
+
+            # Commands that change state or need input are always run locally.
+            assert run_in_agent(["rm", "/zone/home/user/x"], socket_path) is None
+        finally:
+            agent._request({"stop": True}, socket_path)
+            thread.join()
+        assert not socket_path.exists()
+
+
+def test_agent_command_error(monkeypatch, capsys, session):
+    from ibridges.cli.navigation import CliPwd
+
+    def _run_shell(session, parser, args):
+        raise KeyError("broken")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        socket_path = Path(tmpdir, "agent.sock")
+        server = Agent(socket_path, idle_timeout=10)
+        monkeypatch.setattr(server, "_get_session", lambda: session)
+        thread = threading.Thread(target=server.serve)
+        thread.start()
+        try:
+            while not socket_path.exists():
+                thread.join(0.01)
+            with monkeypatch.context() as patch:
+                patch.setattr(CliPwd, "run_shell", staticmethod(_run_shell))
+                assert run_in_agent(["pwd"], socket_path) == 1
+            assert "KeyError: 'broken'" in capsys.readouterr().err
+
+            # A client that sends an invalid request does not stop the agent either.
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.connect(str(socket_path))
+                sock.sendall(b"not json\n")
+            assert run_in_agent(["pwd"], socket_path) == 0
+            assert capsys.readouterr().out == "/zone/home/user\n"
+        finally:
+            agent._request({"stop": True}, socket_path)
+            thread.join()
@@ -0,0 +1,201 @@
+import argparse
+import io
+import tarfile
+from datetime import datetime, timezone
+from pathlib import PurePosixPath
+from types import SimpleNamespace
+
+import irods.keywords as kw
+import pytest
+
+from ibridges.cli.data_operations import CliUpload
+from ibridges.data_operations import _ArchiveWriter, upload_archive
+from ibridges.exception import ObjectTransferFailedError
+from ibridges.path import IrodsPath
+from ibridges.util import PUT_OPR, HashingTee
+
+MODIFY_TIME = datetime(2024, 5, 1, tzinfo=timezone.utc)
+
+
+class FakePath():
+    def __init__(self, path, content=None):
+        self.path = PurePosixPath(path)
+        self.content = content
+        self.n_lookups = 0
+
+    def collection_exists(self):
+        self.n_lookups += 1
+        return self.content is None
+
+    @property
+    def size(self):
+        self.n_lookups += 1
+        return len(self.content)
+
+    def relative_to(self, other):
+        return self.path.relative_to(str(other))
+
+    @property
+    def dataobject(self):
+        return SimpleNamespace(modify_time=MODIFY_TIME, open=lambda mode: self.open(mode))
+
+    @property
+    def collection(self):
+        return SimpleNamespace(modify_time=MODIFY_TIME)
+
+    def open(self, mode):
+        return io.BytesIO(self.content)
+
+
+class ShortPath(FakePath):
+    """Data object of which the replica that is read is shorter than the reported size."""
+
+    @property
+    def size(self):
+        return len(self.content) + 10
+
+
+def test_archive_writer():
+    ipaths = [FakePath("/zone/coll"), FakePath("/zone/coll/a.txt", b"a" * 10),
+              FakePath("/zone/coll/sub"), FakePath("/zone/coll/sub/b.txt", b"b" * 30),
+              FakePath("/zone/coll/sub/c.txt", b"c" * 100), FakePath("/zone/coll/d.txt", b"")]
+    fileobj = io.BytesIO()
+    with tarfile.open(fileobj=fileobj, mode="w|") as tar:
+        with _ArchiveWriter(tar, "/zone", workers=2, buffer_size=50, on_error="fail") as writer:
+            for ipath in ipaths:
+                writer.add(ipath)
+                assert writer.in_memory <= 50
+            writer.flush()
+    assert writer.n_objects == 4
+
+    fileobj.seek(0)
+    with tarfile.open(fileobj=fileobj, mode="r") as tar:
+        assert tar.getnames() == ["coll", "coll/a.txt", "coll/sub", "coll/sub/b.txt",
+                                  "coll/sub/c.txt", "coll/d.txt"]
+        assert tar.extractfile("coll/sub/c.txt").read() == b"c" * 100
+        assert tar.getmember("coll/sub").isdir()
+        assert all(member.mtime == MODIFY_TIME.timestamp() for member in tar.getmembers())
+    # The type and size of each path are only looked up once.
+    assert all(ipath.n_lookups <= 2 for ipath in ipaths)
+
+
+def test_archive_writer_collections():
+    fileobj = io.BytesIO()
+    with tarfile.open(fileobj=fileobj, mode="w|") as tar:
+        with _ArchiveWriter(tar, "/zone", workers=2, buffer_size=50, on_error="fail") as writer:
+            for i_coll in range(3):
+                writer.add(FakePath(f"/zone/coll_{i_coll}"))
+                writer.add(FakePath(f"/zone/coll_{i_coll}/a.txt", b"a"))
+            # Collections do not stop the data objects from being read ahead.
+            assert len(writer.pending) == 6
+            writer.flush()
+    fileobj.seek(0)
+    with tarfile.open(fileobj=fileobj, mode="r") as tar:
+        assert tar.getnames() == ["coll_0", "coll_0/a.txt", "coll_1", "coll_1/a.txt",
+                                  "coll_2", "coll_2/a.txt"]
+
+
+def test_archive_writer_errors():
+    # A shorter replica that is read ahead is added with its actual size.
+    fileobj = io.BytesIO()
+    with tarfile.open(fileobj=fileobj, mode="w|") as tar:
+        with _ArchiveWriter(tar, "/zone", workers=2, buffer_size=50, on_error="skip") as writer:
+            writer.add(ShortPath("/zone/a.txt", b"a" * 10))
+            writer.flush()
+    fileobj.seek(0)
+    with tarfile.open(fileobj=fileobj, mode="r") as tar:
+        assert tar.extractfile("a.txt").read() == b"a" * 10
+
+    # A streamed data object cannot be skipped once its header is written.
+    with tarfile.open(fileobj=io.BytesIO(), mode="w|") as tar:
+        with _ArchiveWriter(tar, "/zone", workers=2, buffer_size=50, on_error="skip") as writer:
+            with pytest.raises(ObjectTransferFailedError, match="incomplete"):
+                writer.add(ShortPath("/zone/b.txt", b"b" * 100))
+
+
+class FakeDataObjects():
+    def __init__(self, checksum_type="sha2"):
+        self.written = {}
+        self.checksum_type = checksum_type
+
+    def open(self, path, mode, **options):
+        assert mode == "w"
+        # The put policies of the server are triggered.
+        assert options[kw.OPR_TYPE_KW] == PUT_OPR
+        written = self.written
+
+        class _Handle(io.BytesIO):
+            def __exit__(self, *args):
+                written[path] = self.getvalue()
+                super().__exit__(*args)
+
+        return _Handle()
+
+    def chksum(self, path):
+        tee = HashingTee(io.BytesIO(self.written[path]), self.checksum_type)
+        tee.read()
+        return tee.checksum
+
+
+def _tar_bytes(members):
+    fileobj = io.BytesIO()
+    with tarfile.open(fileobj=fileobj, mode="w:gz") as tar:
+        for name, content in members.items():
+            info = tarfile.TarInfo(name)
+            if content is None:
+                info.type = tarfile.DIRTYPE
+                tar.addfile(info)
+            else:
+                info.size = len(content)
+                tar.addfile(info, io.BytesIO(content))
+    fileobj.seek(0)
+    return fileobj
+
+
+def test_upload_archive(monkeypatch, session):
+    session.irods_session.data_objects = FakeDataObjects()
+    created = []
+    monkeypatch.setattr(IrodsPath, "collection_exists", lambda self: False)
+    monkeypatch.setattr(IrodsPath, "create_collection", lambda self: created.append(str(self)))
+    members = {"run": None, "run/a.txt": b"a" * 10, "run/sub/b.txt": b"b" * 100,
+               "run/c.txt": b"c" * 20}
+    n_objects = upload_archive(_tar_bytes(members), IrodsPath(session, "~/coll"),
+                               buffer_size=50, progress_bar=False)
+    assert n_objects == 3
+    assert session.irods_session.data_objects.written == {
+        f"/zone/home/user/coll/{name}": content for name, content in members.items() if content}
+    assert created == ["/zone/home/user/coll/run", "/zone/home/user/coll/run/sub"]
+
+    with pytest.raises(ValueError):
+        upload_archive(_tar_bytes({"../outside.txt": b"x"}), IrodsPath(session, "~/coll"),
+                       progress_bar=False)
+
+
+def test_upload_archive_existing(monkeypatch, fake_query, session):
+    session.irods_session.data_objects = FakeDataObjects("md5")
+    monkeypatch.setattr(IrodsPath, "collection_exists", lambda self: True)
+    # Only the collections in which members appear are listed.
+    fake_query.rows = [("a.txt", )]
+    members = {"a.txt": b"a" * 10, "b.txt": b"b" * 100}
+    with pytest.warns(UserWarning, match="already exists"):
+        assert upload_archive(_tar_bytes(members), IrodsPath(session, "~/coll"), buffer_size=50,
+                              on_error="warn", progress_bar=False) == 1
+    (_, conditions, _), = fake_query.queries
+    assert conditions[0].value == "/zone/home/user/coll"
+    assert list(session.irods_session.data_objects.written) == ["/zone/home/user/coll/b.txt"]
+
+    # The checksums registered on the server are compared with those of the members.
+    session.irods_session.data_objects.chksum = lambda path: "sha2:other"
+    with pytest.raises(ObjectTransferFailedError, match="differs"):
+        upload_archive(_tar_bytes(members), IrodsPath(session, "~/coll"), overwrite=True,
+                       progress_bar=False)
+
+
+def test_upload_from_tar_options(monkeypatch, capsys, session):
+    monkeypatch.setattr(IrodsPath, "collection_exists", lambda self: True)
+    parser = CliUpload.get_parser(argparse.ArgumentParser)
+    args = parser.parse_args(["run.tar", "irods:coll", "--from-tar", "--dry-run",
+                              "--verify", "none"])
+    with pytest.raises(SystemExit):
+        CliUpload.run_shell(session, parser, args)
+    assert "Cannot use --dry-run, --verify together with --from-tar" in capsys.readouterr().err
@@ -0,0 +1,72 @@
+import irods.exception
+import pytest
+
+import ibridges.icat_columns as icat
+from ibridges import bulk
+from ibridges.path import CachedIrodsPath, IrodsPath
+
+COLLECTIONS = {"/zone/home/user/coll", "/zone/home/user/coll/sub"}
+DATA_OBJECTS = {("/zone/home/user/coll", f"file_{i}.txt") for i in range(60)}
+
+
+def test_resolve(fake_query, session):
+    def _rows(columns, cond, filters):
+        assert cond.op == "in" and len(cond.value) <= 50
+        if columns == (icat.COLL_NAME, ):
+            return [(name, ) for name in COLLECTIONS if name in cond.value]
+        coll_names = filters[0].value
+        return [(coll_name, data_name, 10, "sha2:x") for coll_name, data_name in DATA_OBJECTS
+                if coll_name in coll_names and data_name in cond.value]
+
+    fake_query.rows = _rows
+    ipaths = [IrodsPath(session, "coll", f"file_{i}.txt") for i in range(70)]
+    ipaths += [IrodsPath(session, "coll"), IrodsPath(session, "coll/sub"),
+               CachedIrodsPath(session, 5, True, None, "/zone/home/user/cached.txt")]
+    resolved = bulk.resolve(ipaths)
+    # Two queries for the collections and two for the data objects.
+    assert fake_query.n_conditions == 4
+    assert all(res.dataobject_exists() and res.size == 10 for res in resolved[:60])
+    assert resolved[60:70] == [None] * 10
+    assert resolved[70].collection_exists() and resolved[71].collection_exists()
+    assert resolved[72] is ipaths[72]
+    assert bulk.resolve([]) == []
+
+
+def test_compute_checksums(fake_query, session):
+    coll = CachedIrodsPath(session, None, False, None, "/zone/home/user/coll")
+    cached = CachedIrodsPath(session, 5, True, None, "/zone/home/user/cached.txt")
+    # Two replicas of the first data object, of which one has a checksum.
+    fake_query.rows = [("/zone/home/user/coll", "a.txt", 1, ""),
+                       ("/zone/home/user/coll", "a.txt", 1, "sha2:a"),
+                       ("/zone/home/user/coll/sub", "b.txt", 1, "")]
+    checksums = bulk.compute_checksums([coll, cached], progress_bar=False)
+    assert sorted(session.irods_session.data_objects.computed) == [
+        "/zone/home/user/cached.txt", "/zone/home/user/coll/sub/b.txt"]
+    assert checksums == {"/zone/home/user/coll/a.txt": "sha2:a",
+                         "/zone/home/user/coll/sub/b.txt": "sha2:new",
+                         "/zone/home/user/cached.txt": "sha2:new"}
+    assert cached.checksum == "sha2:new"
+    assert bulk.compute_checksums([]) == {}
+
+
+def test_remove_stops_on_error(session):
+    class FakeDataObjects():
+        removed = []
+
+        def unlink(self, path, force=False):
+            if path.endswith("file_1.txt"):
+                raise irods.exception.CAT_NO_ACCESS_PERMISSION()
+            self.removed.append(path)
+
+    session.irods_session.data_objects = FakeDataObjects()
+    ipaths = [CachedIrodsPath(session, 1, True, None, f"/zone/home/user/file_{i}.txt")
+              for i in range(5)]
+    with pytest.raises(PermissionError):
+        bulk.remove(ipaths, workers=1, progress_bar=False)
+    # The removals after the failed one are not started.
+    assert FakeDataObjects.removed == ["/zone/home/user/file_0.txt"]
+
+    FakeDataObjects.removed.clear()
+    with pytest.warns(UserWarning):
+        assert bulk.remove(ipaths, workers=1, on_error="warn", progress_bar=False) == 4
+    assert len(FakeDataObjects.removed) == 4
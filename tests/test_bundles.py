@@ -0,0 +1,83 @@
+import io
+from pathlib import Path
+
+import irods.keywords as kw
+import pytest
+
+from ibridges import bundles, executor
+from ibridges.bundles import Bundle, _rule_string, plan_bundles
+from ibridges.exception import FileTransferFailedError
+from ibridges.executor import Operations
+from ibridges.path import CachedIrodsPath, IrodsPath
+from ibridges.util import PUT_OPR, calc_checksum
+
+
+def test_plan_bundles(session):
+    uploads, sizes = [], []
+    for i_file in range(10):
+        uploads.append((Path(f"data/sub_{i_file % 2}/file_{i_file}.txt"),
+                        CachedIrodsPath(session, None, False, None,
+                                        f"/zone/home/user/data/sub_{i_file % 2}/file_{i_file}.txt")))
+        sizes.append(100 * i_file)
+    # Existing data objects are not bundled, since the extraction cannot overwrite them.
+    uploads[1] = (uploads[1][0], CachedIrodsPath(session, 100, True, None, str(uploads[1][1])))
+
+    bundles, remaining = plan_bundles(uploads, sizes, threshold=500, max_size=450, max_files=2)
+    assert remaining == [1, 5, 6, 7, 8, 9]
+    assert [[lpath.name for lpath, _, _ in bundle.members] for bundle in bundles] == [
+        ["file_0.txt", "file_2.txt"], ["file_3.txt"], ["file_4.txt"]]
+    assert all(str(bundle.root) == "/zone/home/user/data" for bundle in bundles)
+
+    bundles, remaining = plan_bundles(uploads, sizes, threshold=1)
+    assert bundles == [] and remaining == list(range(10))
+
+
+def test_rule_string():
+    assert _rule_string('/zone/a "b"') == '"/zone/a \\"b\\""'
+
+
+def test_bundle_upload(monkeypatch, session, tmp_path):
+    opened = []
+
+    class FakeDataObjects():
+        def open(self, path, mode, **options):
+            opened.append(options)
+            return io.BytesIO()
+
+    session.irods_session.data_objects = FakeDataObjects()
+    monkeypatch.setattr(bundles, "execute_rule", lambda session, rule, params, body: ("", ""))
+    monkeypatch.setattr(IrodsPath, "remove", lambda self, force, missing_ok: None)
+    (tmp_path / "a.txt").write_bytes(b"a")
+    bundle = Bundle(IrodsPath(session, "/zone/home/user/data"))
+    bundle.add(tmp_path / "a.txt", IrodsPath(session, "/zone/home/user/data/a.txt"), 1)
+    assert bundle.upload(session, "resc")
+    # The put policies of the server are triggered for the bundle.
+    assert opened == [{kw.OPR_TYPE_KW: PUT_OPR, kw.DEST_RESC_NAME_KW: "resc"}]
+
+
+def test_verify_bundle(monkeypatch, session, tmp_path):
+    bundle = Bundle(IrodsPath(session, "/zone/home/user/data"))
+    for name in ["a.txt", "b.txt", "c.txt"]:
+        (tmp_path / name).write_bytes(name.encode())
+        bundle.add(tmp_path / name, IrodsPath(session, "/zone/home/user/data", name), 5)
+    monkeypatch.setattr(executor, "_remote_checksums", lambda session, ipaths: {
+        "/zone/home/user/data/a.txt": calc_checksum(tmp_path / "a.txt")})
+    computed = []
+
+    def _chksum(path):
+        computed.append(path)
+        if path.endswith("c.txt"):
+            raise OSError("c.txt cannot be read")
+        return "sha2:other"
+
+    session.irods_session.data_objects.chksum = _chksum
+    with pytest.warns(UserWarning) as record:
+        failed = Operations()._verify_bundle(session, bundle, "warn")
+    messages = sorted(str(warning.message) for warning in record)
+    assert messages[0].startswith("Cannot compute the checksum of /zone/home/user/data/c.txt")
+    assert messages[1].endswith("data/b.txt after extracting the bundle, uploading again.")
+    # The checksums of the extracted files are registered on the server.
+    assert sorted(computed) == ["/zone/home/user/data/b.txt", "/zone/home/user/data/c.txt"]
+    assert [lpath.name for (lpath, _), _ in failed] == ["b.txt", "c.txt"]
+    with pytest.raises(FileTransferFailedError):
+        Operations()._verify_bundle(session, bundle, "fail")
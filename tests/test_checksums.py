@@ -0,0 +1,120 @@
+import base64
+import io
+import os
+from hashlib import md5, sha256
+from types import SimpleNamespace
+
+import ibridges.util
+from ibridges.executor import _verify_checksum
+from ibridges.util import (
+    CHECKSUM_CACHE,
+    ChecksumCache,
+    HashingTee,
+    calc_checksum,
+    calc_checksums,
+)
+
+
+def test_hashing_tee(tmp_path):
+    data = b"some data to transfer" * 1000
+    (tmp_path / "source.txt").write_bytes(data)
+    for checksum_type in ["sha2", "md5"]:
+        with open(tmp_path / "source.txt", "rb") as handle:
+            tee = HashingTee(handle, checksum_type)
+            assert tee.read(100) + tee.read() == data
+        assert tee.checksum == calc_checksum(tmp_path / "source.txt", checksum_type,
+                                             use_cache=False)
+
+        buffer = bytearray(64)
+        tee = HashingTee(io.BytesIO(data), checksum_type)
+        while tee.readinto(buffer):
+            pass
+        assert tee.checksum == calc_checksum(tmp_path / "source.txt", checksum_type,
+                                             use_cache=False)
+
+        with open(tmp_path / "dest.txt", "wb") as handle:
+            tee = HashingTee(handle, checksum_type)
+            tee.write(data)
+        assert tee.checksum == calc_checksum(tmp_path / "dest.txt", checksum_type,
+                                             use_cache=False)
+
+
+def test_checksum_cache(tmp_path):
+    CHECKSUM_CACHE.clear()
+    lpath = tmp_path / "file.txt"
+    lpath.write_bytes(b"abc")
+    checksum = calc_checksum(lpath)
+    assert CHECKSUM_CACHE.get(lpath) == checksum
+    assert CHECKSUM_CACHE.get(lpath, "md5") is None
+
+    # The cache is used as long as the size and modification time are the same.
+    CHECKSUM_CACHE.store(lpath, "sha2:cached")
+    assert calc_checksum(lpath) == "sha2:cached"
+    assert calc_checksum(lpath, use_cache=False) == checksum
+
+    lpath.write_bytes(b"abcd")
+    os.utime(lpath, ns=(0, 0))
+    assert CHECKSUM_CACHE.get(lpath) is None
+    assert calc_checksum(lpath) != checksum
+
+    cache = ChecksumCache(max_size=2)
+    for i_file in range(3):
+        (tmp_path / f"{i_file}.txt").write_bytes(b"x")
+        cache.store(tmp_path / f"{i_file}.txt", f"sha2:{i_file}")
+    assert cache.get(tmp_path / "0.txt") is None
+    assert cache.get(tmp_path / "2.txt") == "sha2:2"
+    cache.clear()
+    assert cache.get(tmp_path / "2.txt") is None
+
+
+def test_calc_checksums(tmp_path, monkeypatch):
+    # Small buffer, so that the larger file is memory mapped and read in multiple chunks.
+    monkeypatch.setattr(ibridges.util, "CHECKSUM_BUFFER_SIZE", 16)
+    for data in [b"", b"abc", b"some data to hash" * 100]:
+        lpath = tmp_path / "file.txt"
+        lpath.write_bytes(data)
+        checksums = calc_checksums(lpath, use_cache=False)
+        assert checksums["sha2"] == f"sha2:{base64.b64encode(sha256(data).digest()).decode()}"
+        assert checksums["md5"] == md5(data).hexdigest()
+
+    # Both checksums are cached after one pass, and only missing types are computed.
+    CHECKSUM_CACHE.store(lpath, "sha2:cached")
+    assert calc_checksums(lpath) == {"sha2": "sha2:cached", "md5": md5(data).hexdigest()}
+    assert calc_checksum(lpath, "md5") == md5(data).hexdigest()
+
+
+def test_shared_digests(tmp_path, monkeypatch):
+    CHECKSUM_CACHE.clear()
+    (tmp_path / "a.txt").write_bytes(b"a")
+    (tmp_path / "b.txt").write_bytes(b"b")
+    calc_checksum(tmp_path / "a.txt", "md5")
+    assert CHECKSUM_CACHE.checksum_types == ["md5"]
+
+    # Once both types are in use, reading a file computes both checksums.
+    reads = []
+    orig_calc_checksums = ibridges.util.calc_checksums
+    monkeypatch.setattr(ibridges.util, "calc_checksums", lambda path, types, **kwargs:
+                        reads.append(list(types)) or orig_calc_checksums(path, types, **kwargs))
+    calc_checksum(tmp_path / "b.txt", "sha2")
+    assert calc_checksum(tmp_path / "b.txt", "md5") == md5(b"b").hexdigest()
+    assert reads == [["sha2", "md5"]]
+
+
+def test_verify_checksum(tmp_path):
+    lpath = tmp_path / "file.txt"
+    lpath.write_bytes(b"abc")
+    session = SimpleNamespace(checksum_type="sha2")
+    md5_path = SimpleNamespace(checksum=md5(b"abc").hexdigest())
+
+    # The checksum of the transfer has a different type than the server uses.
+    assert _verify_checksum(session, md5_path, lpath, calc_checksum(lpath)) is None
+    assert session.checksum_type == "md5"
+    assert "differs" in _verify_checksum(session, SimpleNamespace(checksum=md5(b"x").hexdigest()),
+                                         lpath, calc_checksum(lpath))
+
+    # Without a checksum of the transfer, for large files, the local checksum is computed.
+    CHECKSUM_CACHE.clear()
+    assert _verify_checksum(session, md5_path, lpath, None) is None
+    assert "differs" in _verify_checksum(session, SimpleNamespace(checksum="sha2:other"),
+                                         lpath, None)
+    assert session.checksum_type == "sha2"
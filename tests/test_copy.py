@@ -0,0 +1,62 @@
+import pytest
+
+from ibridges.data_operations import _copy_sync_operations
+from ibridges.exception import DataObjectExistsError
+from ibridges.path import CachedIrodsPath, IrodsPath
+
+LISTINGS = {
+    "/zone/home/user/src": [
+        ("", None, None), ("a.txt", 10, "sha2:a"), ("b.txt", 10, "sha2:b"), ("sub", None, None),
+        ("sub/c.txt", 5, "sha2:c"), ("empty", None, None),
+    ],
+    "/zone/home/user/dest": [
+        ("", None, None), ("a.txt", 10, "sha2:a"), ("b.txt", 10, "sha2:other"),
+    ],
+}
+
+
+def _walk(self, depth=None):
+    for rel_path, size, checksum in LISTINGS[str(self)]:
+        path = f"{self}/{rel_path}" if rel_path else str(self)
+        yield CachedIrodsPath(self.session, size, size is not None, checksum, path)
+
+
+@pytest.fixture(autouse=True)
+def fake_walk(monkeypatch):
+    monkeypatch.setattr(IrodsPath, "walk", _walk)
+
+
+def test_copy_sync_operations(session):
+    source = IrodsPath(session, "/zone/home/user/src")
+    dest = IrodsPath(session, "/zone/home/user/dest")
+    ops = _copy_sync_operations(source, dest, overwrite=True)
+    assert [(str(isrc), str(idest)) for isrc, idest in ops.copy] == [
+        ("/zone/home/user/src/b.txt", "/zone/home/user/dest/b.txt"),
+        ("/zone/home/user/src/sub/c.txt", "/zone/home/user/dest/sub/c.txt"),
+    ]
+    assert ops.copy_unchanged == 1
+    assert ops.create_collection == {"/zone/home/user/dest/sub", "/zone/home/user/dest/empty"}
+    assert len(ops.copy_collections) == 3
+
+    ops = _copy_sync_operations(source, dest, overwrite=True, copy_empty_folders=False)
+    assert ops.create_collection == {"/zone/home/user/dest/sub"}
+
+    with pytest.raises(DataObjectExistsError):
+        _copy_sync_operations(source, dest, overwrite=False)
+
+
+def test_copy_missing_checksums(monkeypatch, session):
+    monkeypatch.setitem(LISTINGS, "/zone/home/user/src", [
+        ("", None, None), ("a.txt", 10, None), ("b.txt", 10, None), ("c.txt", 5, None),
+    ])
+    monkeypatch.setitem(LISTINGS, "/zone/home/user/dest", [
+        ("", None, None), ("a.txt", 10, "sha2:new"), ("b.txt", 10, None), ("c.txt", 6, None),
+    ])
+    source = IrodsPath(session, "/zone/home/user/src")
+    dest = IrodsPath(session, "/zone/home/user/dest")
+    ops = _copy_sync_operations(source, dest, overwrite=True)
+    # Only the data objects of the same size are compared, with their checksums computed at once.
+    assert sorted(session.irods_session.data_objects.computed) == [
+        "/zone/home/user/dest/b.txt", "/zone/home/user/src/a.txt", "/zone/home/user/src/b.txt"]
+    assert ops.copy_unchanged == 2
+    assert [str(isrc) for isrc, _ in ops.copy] == ["/zone/home/user/src/c.txt"]
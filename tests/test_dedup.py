@@ -0,0 +1,61 @@
+from pathlib import Path
+
+import pytest
+
+from ibridges import data_operations
+from ibridges.data_operations import _dedup_operations
+from ibridges.executor import Operations
+from ibridges.path import CachedIrodsPath, IrodsPath
+from ibridges.util import calc_checksum
+
+
+def test_dedup_operations(monkeypatch, tmp_path, session):
+    contents = {"a.txt": b"same", "b.txt": b"same", "c.txt": b"new", "d.txt": b"old",
+                "e.txt": b""}
+    ops = Operations()
+    for name, content in contents.items():
+        (tmp_path / name).write_bytes(content)
+        ops.add_upload(tmp_path / name, IrodsPath(session, "/zone/home/user/coll", name))
+    existing = CachedIrodsPath(session, 3, True, calc_checksum(tmp_path / "d.txt"),
+                               "/zone/home/user/other/d.txt")
+    searched = []
+
+    def _search_checksums(session, checksums, path=None):
+        searched.append((sorted(checksums), path))
+        return {existing.checksum: [existing]}
+
+    monkeypatch.setattr(data_operations, "search_checksums", _search_checksums)
+    monkeypatch.setattr(data_operations, "_checksum_type", lambda session, path: "sha2")
+    _dedup_operations(ops, session, False)
+    assert len(ops.upload) == 5 and len(searched) == 0
+
+    _dedup_operations(ops, session, "/zone/home/user/other")
+    assert searched[0][1] == "/zone/home/user/other"
+    # Empty files are not looked up.
+    assert calc_checksum(tmp_path / "e.txt") not in searched[0][0]
+    assert [Path(lpath).name for lpath, _ in ops.upload] == ["a.txt", "c.txt", "e.txt"]
+    assert [(str(isource), str(idest)) for isource, idest in ops.copy] == [
+        ("/zone/home/user/coll/a.txt", "/zone/home/user/coll/b.txt"),
+        ("/zone/home/user/other/d.txt", "/zone/home/user/coll/d.txt"),
+    ]
+
+
+def test_dedup_checksum_type(monkeypatch, tmp_path, session):
+    ops = Operations()
+    (tmp_path / "a.txt").write_bytes(b"content")
+    ops.add_upload(tmp_path / "a.txt", IrodsPath(session, "/zone/home/user/coll/a.txt"))
+    searched = []
+    monkeypatch.setattr(data_operations, "search_checksums",
+                        lambda session, checksums, path=None: searched.extend(checksums) or {})
+
+    # Without any checksums on the server, the files are not hashed at all.
+    monkeypatch.setattr(data_operations, "_checksum_type", lambda session, path: None)
+    with pytest.warns(UserWarning, match="Cannot deduplicate"):
+        _dedup_operations(ops, session, True)
+    assert searched == [] and len(ops.upload) == 1
+
+    # On md5 zones, md5 checksums are looked up.
+    monkeypatch.setattr(data_operations, "_checksum_type", lambda session, path: "md5")
+    _dedup_operations(ops, session, True)
+    assert searched == [calc_checksum(tmp_path / "a.txt", "md5")]
+    assert session.checksum_type == "md5"
@@ -0,0 +1,79 @@
+import warnings
+
+import pytest
+
+from ibridges import executor
+from ibridges.exception import FileTransferFailedError, ObjectTransferFailedError
+from ibridges.executor import Operations
+from ibridges.path import IrodsPath
+from ibridges.util import calc_checksum
+
+
+def test_execute_verify(monkeypatch, tmp_path, session):
+    session.irods_session.data_objects.checksum = "sha2:different"
+    ops = Operations()
+    for name in ["a.txt", "b.txt"]:
+        (tmp_path / name).write_bytes(name.encode())
+        ops.unverified.append(("upload", tmp_path / name,
+                               IrodsPath(session, "/zone/home/user/coll", name)))
+    monkeypatch.setattr(executor, "_remote_checksums", lambda session, ipaths: {
+        "/zone/home/user/coll/a.txt": calc_checksum(tmp_path / "a.txt")})
+    retried = []
+    monkeypatch.setattr(executor, "_obj_put", lambda session, lpath, ipath, **kwargs:
+                        retried.append(lpath.name) or 1)
+
+    with pytest.warns(UserWarning, match="b.txt"):
+        assert ops.execute_verify(session, on_error="warn") == (1, 1)
+    # Only the missing checksum is computed on the server, and only the mismatch is retried.
+    assert session.irods_session.data_objects.computed == ["/zone/home/user/coll/b.txt"]
+    assert retried == ["b.txt"]
+    assert ops.unverified == []
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        assert ops.execute_verify(session) == (0, 0)
+
+
+def test_execute_verify_errors(monkeypatch, tmp_path, session):
+    ops = Operations()
+    (tmp_path / "a.txt").write_bytes(b"a")
+    entries = [("upload", tmp_path / "a.txt", IrodsPath(session, "/zone/home/user/a.txt")),
+               ("download", tmp_path / "missing.txt", IrodsPath(session, "/zone/home/user/b.txt"))]
+    monkeypatch.setattr(executor, "_remote_checksums", lambda session, ipaths: {
+        str(ipath): "sha2:remote" for _, _, ipath in entries})
+    retried = []
+    monkeypatch.setattr(executor, "_obj_put", lambda session, lpath, ipath, **kwargs:
+                        retried.append(lpath.name) or 1)
+    monkeypatch.setattr(executor, "_obj_get", lambda session, ipath, lpath, **kwargs:
+                        retried.append(lpath.name) or 1)
+
+    # With on_error="fail", differences and errors are raised instead of transferring again.
+    ops.unverified = [entries[0]]
+    with pytest.raises(FileTransferFailedError, match="differ"):
+        ops.execute_verify(session)
+    ops.unverified = [entries[1]]
+    with pytest.raises(ObjectTransferFailedError, match="Cannot verify"):
+        ops.execute_verify(session)
+
+    # A local file that cannot be read is not a checksum mismatch, and is not transferred again.
+    ops.unverified = list(entries)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        assert ops.execute_verify(session, on_error="skip") == (0, 1)
+    assert retried == ["a.txt"]
+
+
+def test_remote_checksums(fake_query, session):
+    # Other data objects in the same collection are not requested.
+    fake_query.rows = [("/zone/home/user/coll", "a.txt", "sha2:a"),
+                       ("/zone/home/user/coll", "other.txt", "sha2:other")]
+    ipaths = [IrodsPath(session, "/zone/home/user/coll/a.txt")]
+    assert executor._remote_checksums(session, ipaths) == {"/zone/home/user/coll/a.txt": "sha2:a"}
+    (_, conditions, filters), = fake_query.queries
+    assert conditions[0].value == ["a.txt"]
+    assert filters[0].value == ["/zone/home/user/coll"]
+
+
+def test_verify_policy(session):
+    with pytest.raises(ValueError):
+        Operations().execute(session, verify="later", print_summary=False)
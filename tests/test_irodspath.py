@@ -1,8 +1,11 @@
+import re
 from pathlib import PurePosixPath
 
 from pytest import mark
 
+import ibridges.icat_columns as icat
 from ibridges import IrodsPath
+from ibridges.path import DiskUsage, _get_usage, _glob_like_patterns, _glob_match, _like_pattern
 
 
 class MockIrodsSession:
@@ -61,3 +64,72 @@ def test_absolute_path(input, abs_path, name, parent):
 def test_join_path(path, to_join, result):
     irods_path = IrodsPath(MockIrodsSession(), path)
     assert str(irods_path.joinpath(*to_join)._path) == result
+
+
+@mark.parametrize(
+    "pattern,path,match",
+    [
+        ("*.txt", "x.txt", True),
+        ("*.txt", "sub/x.txt", False),
+        ("**/*.txt", "x.txt", True),
+        ("**/*.txt", "sub/deeper/x.txt", True),
+        ("**/raw/*.h5", "raw/a.h5", True),
+        ("**/raw/*.h5", "exp/raw/a.h5", True),
+        ("**/raw/*.h5", "exp/raw_x/a.h5", False),
+        ("f[0-2]?.nc", "f1a.nc", True),
+        ("f[0-2]?.nc", "f3a.nc", False),
+    ])
+def test_glob_match(pattern, path, match):
+    base_path = "/testzone/home/testuser"
+    parts = pattern.split("/")
+    assert _glob_match(base_path, base_path + "/" + path, parts) == match
+    assert _glob_match(base_path, "/testzone/home/other/" + path, parts) is False
+    # The LIKE pattern should never exclude a match.
+    if match:
+        like_patterns = [like_pat + "/" + _like_pattern(parts[-1])
+                         for like_pat in _glob_like_patterns(base_path, parts[:-1])]
+        like_regexes = [like_pat.replace("%", ".*").replace("_", ".") for like_pat in like_patterns]
+        assert any(re.fullmatch(regex, base_path + "/" + path) for regex in like_regexes)
+
+
+# Two replicas of a.txt and b.txt, as returned by the server for each replica.
+REPLICAS = [("/zone/home/user/coll", "a.txt", 10), ("/zone/home/user/coll", "a.txt", 10),
+            ("/zone/home/user/coll/sub", "b.txt", 5), ("/zone/home/user/coll/sub", "b.txt", 5),
+            ("/zone/home/user/coll/sub", "c.txt", 1)]
+
+
+class FakeUsageQuery:
+    def __init__(self):
+        self.cond = None
+        self.per_object = False
+
+    def filter(self, cond):
+        self.cond = cond
+        return self
+
+    def max(self, column):
+        assert column is icat.DATA_SIZE
+        self.per_object = True
+        return self
+
+    def get_results(self):
+        if self.cond.op == "=":
+            rows = [row for row in REPLICAS if row[0] == self.cond.value]
+        else:
+            rows = [row for row in REPLICAS if row[0].startswith(self.cond.value[:-1])]
+        if self.per_object:
+            # The server groups the rows by the columns that are not aggregated.
+            rows = sorted(set(rows))
+        return [{icat.COLL_NAME: coll_name, icat.DATA_NAME: data_name, icat.DATA_SIZE: str(size)}
+                for coll_name, data_name, size in rows]
+
+
+def test_usage_replicas(monkeypatch, session):
+    session.irods_session.query = lambda *columns: FakeUsageQuery()
+    # Each data object is counted once, not once for every replica.
+    assert _get_usage(session, "/zone/home/user/coll") == {
+        "/zone/home/user/coll": DiskUsage(16, 3)}
+    assert _get_usage(session, "/zone/home/user/coll", group=True) == {
+        "/zone/home/user/coll": DiskUsage(10, 1), "/zone/home/user/coll/sub": DiskUsage(6, 2)}
+    monkeypatch.setattr(IrodsPath, "collection_exists", lambda self: True)
+    assert IrodsPath(session, "/zone/home/user/coll").size == 16
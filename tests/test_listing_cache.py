@@ -0,0 +1,63 @@
+import threading
+import time
+
+from ibridges.cli import shell
+from ibridges.cli.shell import ListingCache
+
+
+def test_listing_cache(monkeypatch):
+    release = threading.Event()
+    calls = []
+
+    def _list_collection(session, coll_path):
+        calls.append(coll_path)
+        release.wait()
+        if coll_path == "/zone/home/user":
+            return {"sub": True, "x.txt": False}
+        return {}
+
+    monkeypatch.setattr(shell, "_list_collection", _list_collection)
+    cache = ListingCache(None, ttl=100, timeout=0.001)
+    try:
+        # The listing is not available yet, so completion should not wait for it.
+        start = time.perf_counter()
+        assert cache.get("/zone/home/user") is None
+        assert time.perf_counter() - start < 0.5
+
+        release.set()
+        cache.timeout = 5
+        assert cache.get("/zone/home/user") == {"sub": True, "x.txt": False}
+        assert cache.get("/zone/home/user") == {"sub": True, "x.txt": False}
+        assert calls.count("/zone/home/user") == 1
+
+        cache.prefetch("/zone/home/user", children=True)
+        assert cache.get("/zone/home/user/sub") == {}
+        cache.invalidate()
+        assert cache.get("/zone/home/user") == {"sub": True, "x.txt": False}
+        assert calls.count("/zone/home/user") == 2
+    finally:
+        cache.close()
+
+
+def test_invalidate_during_fetch(monkeypatch):
+    started = threading.Event()
+    release = threading.Event()
+    listings = iter([{"old.txt": False}, {"new.txt": False}])
+
+    def _list_collection(session, coll_path):
+        started.set()
+        release.wait()
+        return next(listings)
+
+    monkeypatch.setattr(shell, "_list_collection", _list_collection)
+    cache = ListingCache(None, ttl=100, timeout=0.001)
+    try:
+        cache.prefetch("/zone/home/user")
+        assert started.wait(5)
+        # A mutating command runs while the listing is retrieved.
+        cache.invalidate()
+        release.set()
+        cache.timeout = 5
+        assert cache.get("/zone/home/user") == {"new.txt": False}
+    finally:
+        cache.close()
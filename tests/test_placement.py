@@ -0,0 +1,65 @@
+import threading
+
+import pytest
+
+from ibridges import executor
+from ibridges.executor import Operations
+from ibridges.path import IrodsPath
+from ibridges.placement import ResourcePlacement
+
+
+def test_round_robin():
+    placement = ResourcePlacement("round-robin", {"resc1": 0, "resc2": 0, "resc3": 0})
+    assert [placement.assign(10) for _ in range(4)] == ["resc1", "resc2", "resc3", "resc1"]
+
+
+def test_free_space():
+    placement = ResourcePlacement("free-space", {"big": 3000, "small": 1000, "unknown": 0})
+    for _ in range(40):
+        resc_name = placement.assign(100)
+        placement.release(resc_name, 100)
+    assert placement.assigned == {"big": 3000, "small": 1000}
+
+    # Without any free space information, all resources are used equally.
+    placement = ResourcePlacement("free-space", {"resc1": 0, "resc2": 0})
+    assert sorted(placement.assign(10) for _ in range(2)) == ["resc1", "resc2"]
+
+
+def test_least_in_flight():
+    placement = ResourcePlacement("least-in-flight", {"resc1": 0, "resc2": 0})
+    assert placement.assign(1000) == "resc1"
+    assert placement.assign(10) == "resc2"
+    assert placement.assign(10) == "resc2"
+    placement.release("resc1", 1000)
+    assert placement.assign(10) == "resc1"
+    assert placement.n_assigned == {"resc1": 2, "resc2": 2}
+
+
+def test_placement_errors():
+    with pytest.raises(ValueError):
+        ResourcePlacement("random", {"resc1": 0})
+    with pytest.raises(ValueError):
+        ResourcePlacement("round-robin", {})
+
+
+def test_parallel_uploads(monkeypatch, session, tmp_path):
+    placement = ResourcePlacement("least-in-flight", {"resc1": 0, "resc2": 0})
+    monkeypatch.setattr(ResourcePlacement, "from_session", lambda session, policy: placement)
+    # The uploads only finish when both are in flight at the same time.
+    barrier = threading.Barrier(2, timeout=10)
+    in_flight = []
+
+    def _obj_put(session, lpath, ipath, resc_name, **kwargs):
+        in_flight.append(dict(placement.in_flight))
+        barrier.wait()
+        return 1
+
+    monkeypatch.setattr(executor, "_obj_put", _obj_put)
+    ops = Operations(placement="least-in-flight")
+    ops.upload_workers = 2
+    for name in ["a.txt", "b.txt"]:
+        ops.add_upload(tmp_path / name, IrodsPath(session, "/zone/home/user", name))
+    assert ops.execute_upload(session, None, sizes=[10, 10], verify="none") == 2
+    assert ops.upload_resources == {"resc1": 1, "resc2": 1}
+    assert {"resc1": 10, "resc2": 10} in in_flight
+    assert placement.in_flight == {"resc1": 0, "resc2": 0}
@@ -0,0 +1,27 @@
+from pathlib import Path
+
+from ibridges import data_operations
+from ibridges.data_operations import register
+from ibridges.executor import Operations
+
+
+def test_register_server_path(monkeypatch, tmp_path):
+    (tmp_path / "sub").mkdir()
+    lpaths = [tmp_path / "a.txt", tmp_path / "sub" / "b.txt"]
+
+    def _upload(local_path, irods_path, **kwargs):
+        assert kwargs["dry_run"]
+        ops = Operations()
+        for lpath in lpaths:
+            ops.add_upload(lpath, f"/zone/home/user/{tmp_path.name}/{lpath.name}")
+        return ops
+
+    monkeypatch.setattr(data_operations, "upload", _upload)
+    ops = register(tmp_path, None, dry_run=True, checksum=True, workers=8)
+    assert ops.upload == []
+    assert [server_path for _, server_path, _ in ops.register] == [str(p) for p in lpaths]
+    assert ops.register_checksum and ops.register_workers == 8
+
+    ops = register(tmp_path, None, server_path="/mnt/shared", dry_run=True)
+    assert [server_path for _, server_path, _ in ops.register] == [
+        "/mnt/shared/a.txt", str(Path("/mnt/shared/sub/b.txt"))]
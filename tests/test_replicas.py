@@ -0,0 +1,62 @@
+from pathlib import Path
+
+import pytest
+
+from ibridges import executor
+from ibridges.exception import ObjectTransferFailedError
+from ibridges.executor import Operations
+from ibridges.path import IrodsPath
+from ibridges.replicas import ReplicaSelector
+
+ROWS = [
+    ("/zone/home/user", "a.txt", 1, "resc1;leaf1"),
+    ("/zone/home/user", "a.txt", 1, "resc2;leaf2"),
+    ("/zone/home/user", "a.txt", 0, "resc3;leaf3"),
+    ("/zone/home/user", "a.txt", 1, "resc3;leaf4"),
+    ("/zone/home/user", "other.txt", 1, "resc1;leaf1"),
+]
+
+
+@pytest.fixture
+def selector(fake_query, session):
+    fake_query.rows = ROWS
+    selector = ReplicaSelector(session, preferred_resources=["resc2"])
+    selector.fetch([IrodsPath(session, "/zone/home/user/a.txt")])
+    # Only the requested data object is queried, not the whole collection.
+    (_, conditions, filters), = fake_query.queries
+    assert conditions[0].value == ["a.txt"]
+    assert filters[0].value == ["/zone/home/user"]
+    return selector
+
+
+def test_rank(selector):
+    ipath = IrodsPath(selector.session, "/zone/home/user/a.txt")
+    assert selector.rank(ipath) == ["resc2", "resc1", "resc3"]
+    selector.measure("resc1", 100)
+    selector.measure("resc3", 1000)
+    assert selector.rank(ipath) == ["resc2", "resc3", "resc1"]
+    selector.measure("resc3", 0)
+    assert selector.session.resource_throughput["resc3"] == pytest.approx(700)
+    assert selector.rank(IrodsPath(selector.session, "/zone/home/user/other.txt")) == []
+
+
+def test_failover(selector, monkeypatch):
+    tried = []
+
+    def _obj_get(session, ipath, lpath, on_error, resc_name, record, **kwargs):
+        tried.append((resc_name, on_error))
+        if resc_name != "resc3":
+            raise ObjectTransferFailedError(f"Cannot download from {resc_name}")
+        record.finish()
+        return 1
+
+    monkeypatch.setattr(executor, "_obj_get", _obj_get)
+    ops = Operations()
+    ipath = IrodsPath(selector.session, "/zone/home/user/a.txt")
+    record = ops.report.start("download", ipath, Path("a.txt"), 10)
+    assert ops._get_with_failover(selector.session, selector, ipath, Path("a.txt"), "warn",
+                                  None, record) == 1
+    assert tried == [("resc2", "fail"), ("resc1", "fail"), ("resc3", "warn")]
+    assert record.retries == 2
+    assert record.resource == "resc3"
+    assert record.error is None
@@ -0,0 +1,56 @@
+import pytest
+
+from ibridges.resources import Resources
+
+# id, name, parent, status, context, free_space
+ROWS = [
+    ("10", "demoResc", "", "up", "", "1000"),
+    ("11", "replResc", "", None, "", ""),
+    ("12", "leaf1", "11", None, "", "300"),
+    ("13", "passResc", "11", None, "", None),
+    ("14", "leaf2", "13", None, "", "200"),
+    ("15", "bundleResc", "", None, "", ""),
+]
+
+
+class FakeQuery():
+    def __init__(self, rows):
+        self.rows = rows
+
+    def get_results(self):
+        keys = ["id", "name", "parent", "status", "context", "free_space"]
+        return [dict(zip(keys, row)) for row in self.rows]
+
+
+class FakeResourceSession():
+    def __init__(self, rows):
+        self.rows = rows
+        self.n_queries = 0
+
+    def query(self, *columns):
+        self.n_queries += 1
+        return FakeQuery(self.rows)
+
+
+@pytest.mark.parametrize("parent_names", [False, True])
+def test_resource_tree(parent_names, session):
+    rows = ROWS
+    if parent_names:
+        # Before iRODS 4.2 the parent was stored by name instead of by id.
+        names = {row[0]: row[1] for row in ROWS}
+        rows = [(row[0], row[1], names.get(row[2], row[2]), *row[3:]) for row in ROWS]
+    session.irods_session = FakeResourceSession(rows)
+    resources = Resources(session)
+    assert resources.get_free_space("replResc") == 500
+    assert resources.get_free_space("passResc") == 200
+    assert resources.get_free_space("demoResc") == 1000
+    assert resources.get_free_space("unknown") == -1
+    assert list(resources.resources()) == ["demoResc", "leaf1", "leaf2", "passResc", "replResc"]
+    assert resources.root_resources == [("demoResc", "up", 1000, ""), ("replResc", None, 500, "")]
+    assert session.irods_session.n_queries == 1
+
+    resources.resources(update=True)
+    assert session.irods_session.n_queries == 2
+    resources.cache_ttl = -1
+    resources.get_free_space("demoResc")
+    assert session.irods_session.n_queries == 3
@@ -0,0 +1,124 @@
+import logging
+from types import SimpleNamespace
+
+import irods.connection
+
+from ibridges import slow_log
+from ibridges.path import IrodsPath
+from ibridges.session import Session
+from ibridges.slow_log import get_slow_op_threshold, log_slow_operation, set_slow_op_threshold
+
+
+@log_slow_operation
+def _operation(ipath, depth=None):
+    return ipath
+
+
+def test_slow_log(caplog):
+    old_threshold = get_slow_op_threshold()
+    try:
+        set_slow_op_threshold(None)
+        with caplog.at_level(logging.WARNING, logger="ibridges.slow_operations"):
+            assert _operation("some/path") == "some/path"
+        assert len(caplog.records) == 0
+
+        set_slow_op_threshold(0)
+        with caplog.at_level(logging.WARNING, logger="ibridges.slow_operations"):
+            _operation("some/path", depth=2)
+        assert len(caplog.records) == 1
+        message = caplog.records[0].getMessage()
+        assert "_operation('some/path', depth=2)" in message
+        assert "0 round trips" in message
+    finally:
+        set_slow_op_threshold(old_threshold)
+
+
+def test_session_threshold(caplog, session):
+    old_threshold = get_slow_op_threshold()
+    try:
+        set_slow_op_threshold(None)
+        session.slow_op_threshold = 0
+        with caplog.at_level(logging.WARNING, logger="ibridges.slow_operations"):
+            _operation(IrodsPath(session, "some/path"))
+            _operation("some/path")
+        # Only the operation with the session is logged, the default is not changed.
+        assert len(caplog.records) == 1
+        assert get_slow_op_threshold() is None
+
+        set_slow_op_threshold(0)
+        session.slow_op_threshold = 1000
+        caplog.clear()
+        with caplog.at_level(logging.WARNING, logger="ibridges.slow_operations"):
+            _operation(session, "some/path")
+        assert len(caplog.records) == 0
+    finally:
+        set_slow_op_threshold(old_threshold)
+
+
+def test_count_round_trips_with_threshold(monkeypatch):
+    class FakePool():
+        def get_connection(self):
+            return None
+
+    def _connect(slow_op_threshold):
+        session = Session.__new__(Session)
+        session._irods_env = {"irods_user_name": "user"}
+        session._password = None
+        session.slow_op_threshold = slow_op_threshold
+        irods_session = SimpleNamespace(pool=FakePool())
+        monkeypatch.setattr(session, "network_check", lambda host, port: True)
+        monkeypatch.setattr(session, "authenticate_using_auth_file", lambda: irods_session)
+        return session.connect()
+
+    old_threshold = get_slow_op_threshold()
+    try:
+        set_slow_op_threshold(None)
+        assert not hasattr(_connect(None).pool, "_ibridges_counted")
+        assert _connect(0.5).pool._ibridges_counted
+        set_slow_op_threshold(0.5)
+        assert _connect(None).pool._ibridges_counted
+    finally:
+        set_slow_op_threshold(old_threshold)
+
+
+def test_threshold_from_env(monkeypatch):
+    monkeypatch.setenv(slow_log.SLOW_OP_ENV, "1.5")
+    assert slow_log._threshold_from_env() == 1.5
+    monkeypatch.setenv(slow_log.SLOW_OP_ENV, "")
+    assert slow_log._threshold_from_env() is None
+    monkeypatch.setenv(slow_log.SLOW_OP_ENV, "slow")
+    assert slow_log._threshold_from_env() is None
+
+
+def test_count_round_trips(caplog):
+    class FakeConnection():
+        def send(self, message):
+            return message
+
+    class FakePool():
+        def get_connection(self):
+            return FakeConnection()
+
+    irods_session = SimpleNamespace(pool=FakePool())
+    slow_log._count_round_trips(irods_session)
+    slow_log._count_round_trips(irods_session)
+
+    @log_slow_operation
+    def _send_messages(n_messages):
+        for _ in range(n_messages):
+            irods_session.pool.get_connection().send("message")
+
+    old_threshold = get_slow_op_threshold()
+    try:
+        set_slow_op_threshold(0)
+        with caplog.at_level(logging.WARNING, logger="ibridges.slow_operations"):
+            _send_messages(3)
+        assert "3 round trips" in caplog.records[0].getMessage()
+        # Messages outside of decorated operations are not counted.
+        count = slow_log._round_trip_count()
+        irods_session.pool.get_connection().send("message")
+        assert slow_log._round_trip_count() == count
+    finally:
+        set_slow_op_threshold(old_threshold)
+    # The python-irodsclient itself is not patched.
+    assert irods.connection.Connection.send.__module__ == "irods.connection"
@@ -0,0 +1,57 @@
+import json
+import subprocess
+import sys
+
+from pytest import mark
+
+from ibridges.cli.__main__ import BUILTIN_COMMANDS, load_command
+
+# Modules that are only needed once the server is contacted or data is transferred.
+HEAVY_MODULES = ["irods", "tqdm", "ibridges.executor", "ibridges.data_operations"]
+
+
+def _imported_modules(statement):
+    code = f"{statement}; import json, sys; print(json.dumps(sorted(sys.modules)))"
+    ret = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                         check=True)
+    return set(json.loads(ret.stdout.splitlines()[-1]))
+
+
+def _import_times(statement):
+    ret = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                         capture_output=True, text=True, check=True)
+    import_times = {}
+    for line in ret.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        import_times[module.strip()] = int(cumulative)
+    return import_times
+
+
+def test_builtin_commands():
+    from ibridges.cli.other import CLI_BULTIN_COMMANDS
+    from ibridges.cli.shell import ALL_BUILTIN_COMMANDS
+
+    all_names = {name: command_class for command_class in ALL_BUILTIN_COMMANDS + CLI_BULTIN_COMMANDS
+                 for name in command_class.names}
+    assert set(all_names) == set(BUILTIN_COMMANDS)
+    for name, location in BUILTIN_COMMANDS.items():
+        assert load_command(location) is all_names[name]
+
+
+@mark.parametrize("statement", ["import ibridges", "import ibridges.cli.__main__"])
+def test_lazy_imports(statement, record_property):
+    modules = _imported_modules(statement)
+    for heavy_module in HEAVY_MODULES:
+        assert heavy_module not in modules
+    # The import time is only reported, since it depends on the load of the machine.
+    record_property("import_time_us", _import_times(statement)[statement.split()[-1]])
+
+
+def test_command_import():
+    modules = _imported_modules("from ibridges.cli.__main__ import BUILTIN_COMMANDS, load_command;"
+                                "load_command(BUILTIN_COMMANDS['ls'])")
+    assert "ibridges.cli.shell" not in modules
+    assert "ibridges.data_operations" not in modules
+    assert "tqdm" not in modules
@@ -0,0 +1,67 @@
+import csv
+import json
+
+from pytest import mark
+
+from ibridges.telemetry import TransferReport, percentile
+
+
+@mark.parametrize(
+    "values,perc,result",
+    [
+        ([], 50, None),
+        ([3.0], 95, 3.0),
+        ([1.0, 2.0, 3.0], 50, 2.0),
+        ([4.0, 1.0, 3.0, 2.0], 50, 2.5),
+        ([float(i) for i in range(101)], 95, 95.0),
+    ]
+)
+def test_percentile(values, perc, result):
+    assert percentile(values, perc) == result
+
+
+def _create_report():
+    report = TransferReport()
+    for i_rec in range(4):
+        record = report.start("upload", f"file_{i_rec}.txt", f"/zone/home/obj_{i_rec}", 1000)
+        record.update(100)
+        record.first_byte = record.start + 0.1
+        record.finish()
+        record.end = record.start + i_rec + 1
+    record = report.start("download", "/zone/home/obj_0", "file_0.txt", 1000)
+    record.finish(error="Cannot write to file_0.txt.")
+    return report
+
+
+def test_summary():
+    summary = _create_report().summary()
+    assert summary["upload"]["files"] == 4
+    assert summary["upload"]["errors"] == 0
+    assert summary["upload"]["bytes"] == 4000
+    assert summary["upload"]["throughput_p50"] == (500 + 1000 / 3) / 2
+    assert abs(summary["upload"]["ttfb_p95"] - 0.1) < 1e-6
+    assert summary["download"]["errors"] == 1
+    assert summary["download"]["throughput_p50"] is None
+
+
+def test_write(tmp_path):
+    report = _create_report()
+    report.write(tmp_path / "report.jsonl")
+    with open(tmp_path / "report.jsonl", "r", encoding="utf-8") as handle:
+        records = [json.loads(line) for line in handle]
+    assert len(records) == 5
+    assert records[-1]["error"] == "Cannot write to file_0.txt."
+
+    report.write(tmp_path / "report.csv")
+    with open(tmp_path / "report.csv", "r", encoding="utf-8") as handle:
+        rows = list(csv.DictReader(handle))
+    assert len(rows) == 5
+    assert rows[0]["direction"] == "upload"
+
+
+def test_write_prometheus(tmp_path):
+    _create_report().write_prometheus(tmp_path / "ibridges.prom")
+    content = (tmp_path / "ibridges.prom").read_text(encoding="utf-8")
+    assert 'ibridges_transfer_files{direction="upload"} 4' in content
+    assert 'quantile="0.95"' in content
+    assert not (tmp_path / "ibridges.prom.tmp").exists()
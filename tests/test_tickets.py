@@ -0,0 +1,58 @@
+from irods.models import TicketQuery
+
+import ibridges.icat_columns as icat
+from ibridges.tickets import Tickets
+
+DATA_OBJECTS = {str(i): ("/zone/home/user/coll", f"file_{i}.txt") for i in range(120)}
+COLLECTIONS = {"1000": "/zone/home/user/coll", "1001": "/zone/home/user/other"}
+
+
+class FakeTicketSession():
+    def __init__(self, object_ids):
+        self.object_ids = object_ids
+        self.n_queries = 0
+
+    def query(self, *columns):
+        assert columns == (TicketQuery.Ticket,)
+        return self
+
+    def filter(self, *conditions):
+        self.n_queries += 1
+        return [{TicketQuery.Ticket.string: f"ticket_{obj_id}", TicketQuery.Ticket.type: "read",
+                 TicketQuery.Ticket.object_id: int(obj_id), TicketQuery.Ticket.expiry_ts: ""}
+                for obj_id in self.object_ids]
+
+
+def _rows(columns, cond, filters):
+    assert cond.op == "in" and len(cond.value) <= 50
+    if columns[0] is icat.DATA_ID:
+        return [(int(itemid), *DATA_OBJECTS[itemid]) for itemid in cond.value
+                if itemid in DATA_OBJECTS]
+    return [(int(itemid), COLLECTIONS[itemid]) for itemid in cond.value if itemid in COLLECTIONS]
+
+
+def test_fetch_tickets(fake_query, session):
+    fake_query.rows = _rows
+    object_ids = list(DATA_OBJECTS) + list(COLLECTIONS) + ["2000"]
+    session.irods_session = FakeTicketSession(object_ids)
+
+    def n_queries():
+        return session.irods_session.n_queries + fake_query.n_conditions
+
+    all_tickets = Tickets(session)
+
+    # One query for the tickets, three for the data objects and one for the collections.
+    assert n_queries() == 5
+    paths = {tick_data.name: str(tick_data.path) for tick_data in all_tickets.fetch_tickets()}
+    assert paths["ticket_7"] == "/zone/home/user/coll/file_7.txt"
+    assert paths["ticket_1001"] == "/zone/home/user/other"
+    assert len(paths) == len(object_ids)
+
+    # The ticket strings are cached.
+    n_cached = n_queries()
+    assert len(all_tickets.all_ticket_strings) == len(object_ids)
+    all_tickets.get_ticket("ticket_3")
+    assert n_queries() == n_cached
+    all_tickets.cache_ttl = -1
+    assert len(all_tickets.all_ticket_strings) == len(object_ids)
+    assert n_queries() > n_cached
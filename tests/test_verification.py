@@ -0,0 +1,43 @@
+import os
+from pathlib import Path
+
+from ibridges import verification
+from ibridges.path import CachedIrodsPath
+from ibridges.util import calc_checksum
+
+
+def test_verify(fake_query, session, tmp_path):
+    files = {"same.txt": b"same", "changed.txt": b"abcd", "resized.txt": b"abc",
+             "extra.txt": b"", "sub/no_checksum.txt": Path(__file__).read_bytes()}
+    for rel_path, content in files.items():
+        (tmp_path / rel_path).parent.mkdir(exist_ok=True)
+        (tmp_path / rel_path).write_bytes(content)
+    # Symbolic links are ignored.
+    os.symlink(tmp_path / "same.txt", tmp_path / "sub" / "link.txt")
+    remote = [("/zone/home/user/coll", "same.txt", "4", ""),
+              ("/zone/home/user/coll", "same.txt", "4", calc_checksum(tmp_path / "same.txt")),
+              ("/zone/home/user/coll", "changed.txt", "4", "sha2:other"),
+              ("/zone/home/user/coll", "resized.txt", "10", "sha2:resized"),
+              ("/zone/home/user/coll", "missing.txt", "1", "sha2:missing"),
+              ("/zone/home/user/coll/sub", "no_checksum.txt", str(len(files["sub/no_checksum.txt"])),
+               "")]
+    fake_query.rows = remote
+    session.irods_session.data_objects.checksum = calc_checksum(__file__)
+    coll = CachedIrodsPath(session, None, False, None, "/zone/home/user/coll")
+    result = verification.verify(tmp_path, coll, workers=2)
+    assert len(fake_query.queries) == 1
+    assert session.irods_session.data_objects.computed == [
+        "/zone/home/user/coll/sub/no_checksum.txt"]
+    assert result.missing == ["missing.txt"]
+    assert result.extra == ["extra.txt"]
+    assert result.size_mismatch == [("resized.txt", 3, 10)]
+    assert [path for path, _, _ in result.checksum_mismatch] == ["changed.txt"]
+    assert result.matched == 2
+    assert not result.ok
+    assert [diff["status"] for diff in result.to_dict()["differences"]] == [
+        "missing", "extra", "size_mismatch", "checksum_mismatch"]
+
+    dataobj = CachedIrodsPath(session, 4, True, None, "/zone/home/user/coll/same.txt")
+    fake_query.rows = remote[:2]
+    result = verification.verify(tmp_path / "same.txt", dataobj)
+    assert result.ok and result.matched == 1